@@ -93,38 +93,157 @@ d = { 'settings': { 'branch': 'master',
                                                                                                      'spannerlib/ast_node_types.py'),
                                            'spannerlib.ast_node_types.get_term_list_string': ( 'ast_node_types.html#get_term_list_string',
                                                                                                'spannerlib/ast_node_types.py')},
-            'spannerlib.engine': { 'spannerlib.engine.SqliteEngine': ('engine.html#sqliteengine', 'spannerlib/engine.py'),
+            'spannerlib.columnar_engine': { 'spannerlib.columnar_engine.ColumnarEngine': ( 'columnar_engine.html#columnarengine',
+                                                                                           'spannerlib/columnar_engine.py'),
+                                            'spannerlib.columnar_engine.ColumnarEngine.__init__': ( 'columnar_engine.html#columnarengine.__init__',
+                                                                                                    'spannerlib/columnar_engine.py'),
+                                            'spannerlib.columnar_engine.ColumnarEngine._create_dataframe': ( 'columnar_engine.html#columnarengine._create_dataframe',
+                                                                                                             'spannerlib/columnar_engine.py'),
+                                            'spannerlib.columnar_engine.ColumnarEngine._get_sort_key': ( 'columnar_engine.html#columnarengine._get_sort_key',
+                                                                                                         'spannerlib/columnar_engine.py'),
+                                            'spannerlib.columnar_engine.ColumnarEngine._is_in': ( 'columnar_engine.html#columnarengine._is_in',
+                                                                                                  'spannerlib/columnar_engine.py'),
+                                            'spannerlib.columnar_engine.ColumnarEngine._remove_duplicates': ( 'columnar_engine.html#columnarengine._remove_duplicates',
+                                                                                                              'spannerlib/columnar_engine.py'),
+                                            'spannerlib.columnar_engine._add_table': ( 'columnar_engine.html#_add_table',
+                                                                                       'spannerlib/columnar_engine.py'),
+                                            'spannerlib.columnar_engine._convert_relation_term_to_string_or_int': ( 'columnar_engine.html#_convert_relation_term_to_string_or_int',
+                                                                                                                    'spannerlib/columnar_engine.py'),
+                                            'spannerlib.columnar_engine._create_unique_relation': ( 'columnar_engine.html#_create_unique_relation',
+                                                                                                    'spannerlib/columnar_engine.py'),
+                                            'spannerlib.columnar_engine._decode_table': ( 'columnar_engine.html#_decode_table',
+                                                                                          'spannerlib/columnar_engine.py'),
+                                            'spannerlib.columnar_engine._encode_term': ( 'columnar_engine.html#_encode_term',
+                                                                                         'spannerlib/columnar_engine.py'),
+                                            'spannerlib.columnar_engine._get_free_var_table': ( 'columnar_engine.html#_get_free_var_table',
+                                                                                                'spannerlib/columnar_engine.py'),
+                                            'spannerlib.columnar_engine._get_table': ( 'columnar_engine.html#_get_table',
+                                                                                       'spannerlib/columnar_engine.py'),
+                                            'spannerlib.columnar_engine._sort_table': ( 'columnar_engine.html#_sort_table',
+                                                                                        'spannerlib/columnar_engine.py'),
+                                            'spannerlib.columnar_engine.add_fact': ( 'columnar_engine.html#add_fact',
+                                                                                     'spannerlib/columnar_engine.py'),
+                                            'spannerlib.columnar_engine.add_facts': ('columnar_engine.html#add_facts', 'spannerlib/columnar_engine.py'),
+                                            'spannerlib.columnar_engine.clear_relation': ( 'columnar_engine.html#clear_relation',
+                                                                                           'spannerlib/columnar_engine.py'),
+                                            'spannerlib.columnar_engine.declare_relation_table': ( 'columnar_engine.html#declare_relation_table',
+                                                                                                   'spannerlib/columnar_engine.py'),
+                                            'spannerlib.columnar_engine.delete_relation': ( 'columnar_engine.html#delete_relation',
+                                                                                            'spannerlib/columnar_engine.py'),
+                                            'spannerlib.columnar_engine.get_table_len': ( 'columnar_engine.html#get_table_len',
+                                                                                          'spannerlib/columnar_engine.py'),
+                                            'spannerlib.columnar_engine.insert_relation': ( 'columnar_engine.html#insert_relation',
+                                                                                            'spannerlib/columnar_engine.py'),
+                                            'spannerlib.columnar_engine.is_table_exists': ( 'columnar_engine.html#is_table_exists',
+                                                                                            'spannerlib/columnar_engine.py'),
+                                            'spannerlib.columnar_engine.operator_copy': ( 'columnar_engine.html#operator_copy',
+                                                                                          'spannerlib/columnar_engine.py'),
+                                            'spannerlib.columnar_engine.operator_difference': ( 'columnar_engine.html#operator_difference',
+                                                                                                'spannerlib/columnar_engine.py'),
+                                            'spannerlib.columnar_engine.operator_intersection': ( 'columnar_engine.html#operator_intersection',
+                                                                                                  'spannerlib/columnar_engine.py'),
+                                            'spannerlib.columnar_engine.operator_join': ( 'columnar_engine.html#operator_join',
+                                                                                          'spannerlib/columnar_engine.py'),
+                                            'spannerlib.columnar_engine.operator_project': ( 'columnar_engine.html#operator_project',
+                                                                                             'spannerlib/columnar_engine.py'),
+                                            'spannerlib.columnar_engine.operator_select': ( 'columnar_engine.html#operator_select',
+                                                                                            'spannerlib/columnar_engine.py'),
+                                            'spannerlib.columnar_engine.operator_union': ( 'columnar_engine.html#operator_union',
+                                                                                           'spannerlib/columnar_engine.py'),
+                                            'spannerlib.columnar_engine.query': ( 'columnar_engine.html#query',
+                                                                                  'spannerlib/columnar_engine.py'),
+                                            'spannerlib.columnar_engine.remove_fact': ( 'columnar_engine.html#remove_fact',
+                                                                                        'spannerlib/columnar_engine.py'),
+                                            'spannerlib.columnar_engine.remove_table': ( 'columnar_engine.html#remove_table',
+                                                                                         'spannerlib/columnar_engine.py'),
+                                            'spannerlib.columnar_engine.remove_tables': ( 'columnar_engine.html#remove_tables',
+                                                                                          'spannerlib/columnar_engine.py')},
+            'spannerlib.document_store': { 'spannerlib.document_store.Document': ('document_store.html#document', 'spannerlib/document_store.py'),
+                                           'spannerlib.document_store.Document.__deepcopy__': ('document_store.html#document.__deepcopy__', 'spannerlib/document_store.py'),
+                                           'spannerlib.document_store.Document.__eq__': ('document_store.html#document.__eq__', 'spannerlib/document_store.py'),
+                                           'spannerlib.document_store.Document.__hash__': ('document_store.html#document.__hash__', 'spannerlib/document_store.py'),
+                                           'spannerlib.document_store.Document.__init__': ('document_store.html#document.__init__', 'spannerlib/document_store.py'),
+                                           'spannerlib.document_store.Document.__repr__': ('document_store.html#document.__repr__', 'spannerlib/document_store.py'),
+                                           'spannerlib.document_store.Document.__str__': ('document_store.html#document.__str__', 'spannerlib/document_store.py'),
+                                           'spannerlib.document_store.Document.text': ('document_store.html#document.text', 'spannerlib/document_store.py'),
+                                           'spannerlib.document_store.DocumentStore': ('document_store.html#documentstore', 'spannerlib/document_store.py'),
+                                           'spannerlib.document_store.DocumentStore.__contains__': ('document_store.html#documentstore.__contains__', 'spannerlib/document_store.py'),
+                                           'spannerlib.document_store.DocumentStore.__init__': ('document_store.html#documentstore.__init__', 'spannerlib/document_store.py'),
+                                           'spannerlib.document_store.DocumentStore.__len__': ('document_store.html#documentstore.__len__', 'spannerlib/document_store.py'),
+                                           'spannerlib.document_store.DocumentStore._cache_decoded': ('document_store.html#documentstore._cache_decoded', 'spannerlib/document_store.py'),
+                                           'spannerlib.document_store.DocumentStore._get_reference': ('document_store.html#documentstore._get_reference', 'spannerlib/document_store.py'),
+                                           'spannerlib.document_store.DocumentStore._release': ('document_store.html#documentstore._release', 'spannerlib/document_store.py'),
+                                           'spannerlib.document_store.DocumentStore.add': ('document_store.html#documentstore.add', 'spannerlib/document_store.py'),
+                                           'spannerlib.document_store.DocumentStore.close': ('document_store.html#documentstore.close', 'spannerlib/document_store.py'),
+                                           'spannerlib.document_store.DocumentStore.collect': ('document_store.html#documentstore.collect', 'spannerlib/document_store.py'),
+                                           'spannerlib.document_store.DocumentStore.get': ('document_store.html#documentstore.get', 'spannerlib/document_store.py'),
+                                           'spannerlib.document_store.DocumentStore.get_id': ('document_store.html#documentstore.get_id', 'spannerlib/document_store.py'),
+                                           'spannerlib.document_store.DocumentStore.is_document': ('document_store.html#documentstore.is_document', 'spannerlib/document_store.py'),
+                                           'spannerlib.document_store.DocumentStore.is_id': ('document_store.html#documentstore.is_id', 'spannerlib/document_store.py'),
+                                           'spannerlib.document_store.DocumentStore.read_file': ('document_store.html#documentstore.read_file', 'spannerlib/document_store.py')},
+            'spannerlib.engine': { 'spannerlib.engine.QueryCursor': ('engine.html#querycursor', 'spannerlib/engine.py'),
+                                   'spannerlib.engine.QueryCursor.__del__': ('engine.html#querycursor.__del__', 'spannerlib/engine.py'),
+                                   'spannerlib.engine.QueryCursor.__enter__': ('engine.html#querycursor.__enter__', 'spannerlib/engine.py'),
+                                   'spannerlib.engine.QueryCursor.__exit__': ('engine.html#querycursor.__exit__', 'spannerlib/engine.py'),
+                                   'spannerlib.engine.QueryCursor.__init__': ('engine.html#querycursor.__init__', 'spannerlib/engine.py'),
+                                   'spannerlib.engine.QueryCursor.__iter__': ('engine.html#querycursor.__iter__', 'spannerlib/engine.py'),
+                                   'spannerlib.engine.QueryCursor.__next__': ('engine.html#querycursor.__next__', 'spannerlib/engine.py'),
+                                   'spannerlib.engine.QueryCursor.batches': ('engine.html#querycursor.batches', 'spannerlib/engine.py'),
+                                   'spannerlib.engine.QueryCursor.close': ('engine.html#querycursor.close', 'spannerlib/engine.py'),
+                                   'spannerlib.engine.QueryCursor.fetchmany': ('engine.html#querycursor.fetchmany', 'spannerlib/engine.py'),
+                                   'spannerlib.engine.SqliteEngine': ('engine.html#sqliteengine', 'spannerlib/engine.py'),
                                    'spannerlib.engine.SqliteEngine.__del__': ('engine.html#sqliteengine.__del__', 'spannerlib/engine.py'),
                                    'spannerlib.engine.SqliteEngine.__init__': ('engine.html#sqliteengine.__init__', 'spannerlib/engine.py'),
-                                   'spannerlib.engine.SqliteEngine._assert_ie_output_properly_typed': ( 'engine.html#sqliteengine._assert_ie_output_properly_typed',
-                                                                                                        'spannerlib/engine.py'),
-                                   'spannerlib.engine.SqliteEngine._convert_strings_to_spans_in_query_result': ( 'engine.html#sqliteengine._convert_strings_to_spans_in_query_result',
-                                                                                                                 'spannerlib/engine.py'),
+                                   'spannerlib.engine.SqliteEngine._convert_blobs_to_spans_in_query_result': ('engine.html#sqliteengine._convert_blobs_to_spans_in_query_result', 'spannerlib/engine.py'),
+                                   'spannerlib.engine.SqliteEngine._convert_document_ids_in_query_result': ('engine.html#sqliteengine._convert_document_ids_in_query_result', 'spannerlib/engine.py'),
                                    'spannerlib.engine.SqliteEngine._datatype_to_sql_type': ( 'engine.html#sqliteengine._datatype_to_sql_type',
                                                                                              'spannerlib/engine.py'),
                                    'spannerlib.engine.SqliteEngine._get_db_filename': ( 'engine.html#sqliteengine._get_db_filename',
                                                                                         'spannerlib/engine.py'),
                                    'spannerlib.engine.SqliteEngine._get_free_variable_indexes': ( 'engine.html#sqliteengine._get_free_variable_indexes',
                                                                                                   'spannerlib/engine.py'),
+                                   'spannerlib.engine.SqliteEngine._pack_span': ('engine.html#sqliteengine._pack_span', 'spannerlib/engine.py'),
+                                   'spannerlib.engine._compile_sql_template': ('engine.html#_compile_sql_template', 'spannerlib/engine.py'),
+                                   'spannerlib.engine._convert_relation_term_to_sql_parameter': ('engine.html#_convert_relation_term_to_sql_parameter', 'spannerlib/engine.py'),
                                    'spannerlib.engine._convert_relation_term_to_string_or_int': ( 'engine.html#_convert_relation_term_to_string_or_int',
                                                                                                   'spannerlib/engine.py'),
+                                   'spannerlib.engine._create_deferred_relation': ( 'engine.html#_create_deferred_relation',
+                                                                                    'spannerlib/engine.py'),
+                                   'spannerlib.engine._create_index': ('engine.html#_create_index', 'spannerlib/engine.py'),
+                                   'spannerlib.engine._create_query_relations': ('engine.html#_create_query_relations', 'spannerlib/engine.py'),
                                    'spannerlib.engine._create_unique_relation': ( 'engine.html#_create_unique_relation',
                                                                                   'spannerlib/engine.py'),
                                    'spannerlib.engine._get_all_relation_tuples': ( 'engine.html#_get_all_relation_tuples',
                                                                                    'spannerlib/engine.py'),
                                    'spannerlib.engine._get_col_name': ('engine.html#_get_col_name', 'spannerlib/engine.py'),
+                                   'spannerlib.engine._get_insert_statement': ('engine.html#_get_insert_statement', 'spannerlib/engine.py'),
+                                   'spannerlib.engine._get_relation_parameters': ('engine.html#_get_relation_parameters', 'spannerlib/engine.py'),
+                                   'spannerlib.engine._get_relation_source': ('engine.html#_get_relation_source', 'spannerlib/engine.py'),
+                                   'spannerlib.engine._get_source_tables': ('engine.html#_get_source_tables', 'spannerlib/engine.py'),
+                                   'spannerlib.engine._get_unique_relation_name': ( 'engine.html#_get_unique_relation_name',
+                                                                                    'spannerlib/engine.py'),
+                                   'spannerlib.engine._render_sql_template': ('engine.html#_render_sql_template', 'spannerlib/engine.py'),
                                    'spannerlib.engine._run_sql': ('engine.html#_run_sql', 'spannerlib/engine.py'),
                                    'spannerlib.engine._run_sql_from_jinja_template': ( 'engine.html#_run_sql_from_jinja_template',
                                                                                        'spannerlib/engine.py'),
+                                   'spannerlib.engine._to_hashable': ('engine.html#_to_hashable', 'spannerlib/engine.py'),
+                                   'spannerlib.engine._use_columns': ('engine.html#_use_columns', 'spannerlib/engine.py'),
                                    'spannerlib.engine.add_fact': ('engine.html#add_fact', 'spannerlib/engine.py'),
+                                   'spannerlib.engine.add_facts': ('engine.html#add_facts', 'spannerlib/engine.py'),
                                    'spannerlib.engine.clear_relation': ('engine.html#clear_relation', 'spannerlib/engine.py'),
+                                   'spannerlib.engine.collect_documents': ('engine.html#collect_documents', 'spannerlib/engine.py'),
                                    'spannerlib.engine.compute_ie_relation': ('engine.html#compute_ie_relation', 'spannerlib/engine.py'),
                                    'spannerlib.engine.declare_relation_table': ( 'engine.html#declare_relation_table',
                                                                                  'spannerlib/engine.py'),
+                                   'spannerlib.engine.delete_relation': ('engine.html#delete_relation', 'spannerlib/engine.py'),
                                    'spannerlib.engine.get_table_len': ('engine.html#get_table_len', 'spannerlib/engine.py'),
+                                   'spannerlib.engine.insert_relation': ('engine.html#insert_relation', 'spannerlib/engine.py'),
                                    'spannerlib.engine.is_table_exists': ('engine.html#is_table_exists', 'spannerlib/engine.py'),
+                                   'spannerlib.engine.iter_query': ('engine.html#iter_query', 'spannerlib/engine.py'),
                                    'spannerlib.engine.log_function_call': ('engine.html#log_function_call', 'spannerlib/engine.py'),
                                    'spannerlib.engine.operator_copy': ('engine.html#operator_copy', 'spannerlib/engine.py'),
+                                   'spannerlib.engine.operator_difference': ('engine.html#operator_difference', 'spannerlib/engine.py'),
+                                   'spannerlib.engine.operator_intersection': ('engine.html#operator_intersection', 'spannerlib/engine.py'),
                                    'spannerlib.engine.operator_join': ('engine.html#operator_join', 'spannerlib/engine.py'),
                                    'spannerlib.engine.operator_project': ('engine.html#operator_project', 'spannerlib/engine.py'),
                                    'spannerlib.engine.operator_select': ('engine.html#operator_select', 'spannerlib/engine.py'),
@@ -137,22 +256,41 @@ d = { 'settings': { 'branch': 'master',
                                    'spannerlib.engine.spannerlogEngineBase': ('engine.html#spannerlogenginebase', 'spannerlib/engine.py'),
                                    'spannerlib.engine.spannerlogEngineBase.__init__': ( 'engine.html#spannerlogenginebase.__init__',
                                                                                         'spannerlib/engine.py'),
+                                   'spannerlib.engine.spannerlogEngineBase._assert_ie_output_properly_typed': ( 'engine.html#spannerlogenginebase._assert_ie_output_properly_typed',
+                                                                                                                'spannerlib/engine.py'),
                                    'spannerlib.engine.spannerlogEngineBase._convert_relation_term_to_string_or_int': ( 'engine.html#spannerlogenginebase._convert_relation_term_to_string_or_int',
                                                                                                                        'spannerlib/engine.py'),
+                                   'spannerlib.engine.spannerlogEngineBase._create_unique_relation': ( 'engine.html#spannerlogenginebase._create_unique_relation',
+                                                                                                       'spannerlib/engine.py'),
                                    'spannerlib.engine.spannerlogEngineBase.add_fact': ( 'engine.html#spannerlogenginebase.add_fact',
                                                                                         'spannerlib/engine.py'),
+                                   'spannerlib.engine.spannerlogEngineBase.add_facts': ('engine.html#spannerlogenginebase.add_facts', 'spannerlib/engine.py'),
+                                   'spannerlib.engine.spannerlogEngineBase.assert_no_open_cursor': ('engine.html#spannerlogenginebase.assert_no_open_cursor', 'spannerlib/engine.py'),
                                    'spannerlib.engine.spannerlogEngineBase.clear_relation': ( 'engine.html#spannerlogenginebase.clear_relation',
                                                                                               'spannerlib/engine.py'),
                                    'spannerlib.engine.spannerlogEngineBase.clear_tables': ( 'engine.html#spannerlogenginebase.clear_tables',
                                                                                             'spannerlib/engine.py'),
+                                   'spannerlib.engine.spannerlogEngineBase.collect_documents': ('engine.html#spannerlogenginebase.collect_documents', 'spannerlib/engine.py'),
                                    'spannerlib.engine.spannerlogEngineBase.compute_ie_relation': ( 'engine.html#spannerlogenginebase.compute_ie_relation',
                                                                                                    'spannerlib/engine.py'),
                                    'spannerlib.engine.spannerlogEngineBase.declare_relation_table': ( 'engine.html#spannerlogenginebase.declare_relation_table',
                                                                                                       'spannerlib/engine.py'),
+                                   'spannerlib.engine.spannerlogEngineBase.delete_relation': ( 'engine.html#spannerlogenginebase.delete_relation',
+                                                                                               'spannerlib/engine.py'),
                                    'spannerlib.engine.spannerlogEngineBase.get_table_len': ( 'engine.html#spannerlogenginebase.get_table_len',
                                                                                              'spannerlib/engine.py'),
+                                   'spannerlib.engine.spannerlogEngineBase.insert_relation': ( 'engine.html#spannerlogenginebase.insert_relation',
+                                                                                               'spannerlib/engine.py'),
+                                   'spannerlib.engine.spannerlogEngineBase.is_table_exists': ( 'engine.html#spannerlogenginebase.is_table_exists',
+                                                                                               'spannerlib/engine.py'),
+                                   'spannerlib.engine.spannerlogEngineBase.iter_query': ('engine.html#spannerlogenginebase.iter_query', 'spannerlib/engine.py'),
+                                   'spannerlib.engine.spannerlogEngineBase.open_cursor': ('engine.html#spannerlogenginebase.open_cursor', 'spannerlib/engine.py'),
                                    'spannerlib.engine.spannerlogEngineBase.operator_copy': ( 'engine.html#spannerlogenginebase.operator_copy',
                                                                                              'spannerlib/engine.py'),
+                                   'spannerlib.engine.spannerlogEngineBase.operator_difference': ( 'engine.html#spannerlogenginebase.operator_difference',
+                                                                                                   'spannerlib/engine.py'),
+                                   'spannerlib.engine.spannerlogEngineBase.operator_intersection': ( 'engine.html#spannerlogenginebase.operator_intersection',
+                                                                                                     'spannerlib/engine.py'),
                                    'spannerlib.engine.spannerlogEngineBase.operator_join': ( 'engine.html#spannerlogenginebase.operator_join',
                                                                                              'spannerlib/engine.py'),
                                    'spannerlib.engine.spannerlogEngineBase.operator_project': ( 'engine.html#spannerlogenginebase.operator_project',
@@ -165,10 +303,25 @@ d = { 'settings': { 'branch': 'master',
                                                                                      'spannerlib/engine.py'),
                                    'spannerlib.engine.spannerlogEngineBase.remove_fact': ( 'engine.html#spannerlogenginebase.remove_fact',
                                                                                            'spannerlib/engine.py'),
+                                   'spannerlib.engine.spannerlogEngineBase.remove_table': ( 'engine.html#spannerlogenginebase.remove_table',
+                                                                                            'spannerlib/engine.py'),
                                    'spannerlib.engine.spannerlogEngineBase.remove_tables': ( 'engine.html#spannerlogenginebase.remove_tables',
                                                                                              'spannerlib/engine.py'),
                                    'spannerlib.engine.table_to_dataframe': ('engine.html#table_to_dataframe', 'spannerlib/engine.py')},
-            'spannerlib.execution': {'spannerlib.execution.naive_execution': ('execution.html#naive_execution', 'spannerlib/execution.py')},
+            'spannerlib.execution': { 'spannerlib.execution._compute_node': ('execution.html#_compute_node', 'spannerlib/execution.py'),
+                                      'spannerlib.execution._compute_rule_body': ( 'execution.html#_compute_rule_body',
+                                                                                   'spannerlib/execution.py'),
+                                      'spannerlib.execution._compute_rule_strata': ('execution.html#_compute_rule_strata', 'spannerlib/execution.py'),
+                                      'spannerlib.execution._execute_parse_graph': ( 'execution.html#_execute_parse_graph',
+                                                                                     'spannerlib/execution.py'),
+                                      'spannerlib.execution._get_get_rel_nodes': ( 'execution.html#_get_get_rel_nodes',
+                                                                                   'spannerlib/execution.py'),
+                                      'spannerlib.execution._query_with_magic_sets': ('execution.html#_query_with_magic_sets', 'spannerlib/execution.py'),
+                                      'spannerlib.execution._rewrite_query_with_magic_sets': ('execution.html#_rewrite_query_with_magic_sets', 'spannerlib/execution.py'),
+                                      'spannerlib.execution._update_fact': ('execution.html#_update_fact', 'spannerlib/execution.py'),
+                                      'spannerlib.execution.naive_execution': ('execution.html#naive_execution', 'spannerlib/execution.py'),
+                                      'spannerlib.execution.semi_naive_execution': ( 'execution.html#semi_naive_execution',
+                                                                                     'spannerlib/execution.py')},
             'spannerlib.expected_grammar': {},
             'spannerlib.general_utils': { 'spannerlib.general_utils.check_properly_typed_relation': ( 'general_utils.html#check_properly_typed_relation',
                                                                                                       'spannerlib/general_utils.py'),
@@ -203,14 +356,19 @@ d = { 'settings': { 'branch': 'master',
                                                                                    'spannerlib/graphs.py'),
                                    'spannerlib.graphs.DependencyGraph.__str__': ( 'graphs.html#dependencygraph.__str__',
                                                                                   'spannerlib/graphs.py'),
+                                   'spannerlib.graphs.DependencyGraph._add_condensation_edge': ('graphs.html#dependencygraph._add_condensation_edge', 'spannerlib/graphs.py'),
+                                   'spannerlib.graphs.DependencyGraph._add_condensation_node': ('graphs.html#dependencygraph._add_condensation_node', 'spannerlib/graphs.py'),
                                    'spannerlib.graphs.DependencyGraph._add_relation': ( 'graphs.html#dependencygraph._add_relation',
                                                                                         'spannerlib/graphs.py'),
+                                   'spannerlib.graphs.DependencyGraph._get_condensation': ('graphs.html#dependencygraph._get_condensation', 'spannerlib/graphs.py'),
                                    'spannerlib.graphs.DependencyGraph._get_node_string': ( 'graphs.html#dependencygraph._get_node_string',
                                                                                            'spannerlib/graphs.py'),
+                                   'spannerlib.graphs.DependencyGraph._invalidate_condensation': ('graphs.html#dependencygraph._invalidate_condensation', 'spannerlib/graphs.py'),
                                    'spannerlib.graphs.DependencyGraph.add_dependencies': ( 'graphs.html#dependencygraph.add_dependencies',
                                                                                            'spannerlib/graphs.py'),
                                    'spannerlib.graphs.DependencyGraph.get_mutually_recursive_relations': ( 'graphs.html#dependencygraph.get_mutually_recursive_relations',
                                                                                                            'spannerlib/graphs.py'),
+                                   'spannerlib.graphs.DependencyGraph.get_strata': ('graphs.html#dependencygraph.get_strata', 'spannerlib/graphs.py'),
                                    'spannerlib.graphs.DependencyGraph.is_dependent': ( 'graphs.html#dependencygraph.is_dependent',
                                                                                        'spannerlib/graphs.py'),
                                    'spannerlib.graphs.DependencyGraph.is_relation_in_use': ( 'graphs.html#dependencygraph.is_relation_in_use',
@@ -284,6 +442,8 @@ d = { 'settings': { 'branch': 'master',
                                                                                   'spannerlib/graphs.py'),
                                    'spannerlib.graphs.NetxStateGraph.add_node': ( 'graphs.html#netxstategraph.add_node',
                                                                                   'spannerlib/graphs.py'),
+                                   'spannerlib.graphs.NetxStateGraph.mark_ancestors_not_computed': ( 'graphs.html#netxstategraph.mark_ancestors_not_computed',
+                                                                                                     'spannerlib/graphs.py'),
                                    'spannerlib.graphs.TermGraph': ('graphs.html#termgraph', 'spannerlib/graphs.py'),
                                    'spannerlib.graphs.TermGraph.__init__': ('graphs.html#termgraph.__init__', 'spannerlib/graphs.py'),
                                    'spannerlib.graphs.TermGraph._compute_bounding_graph': ( 'graphs.html#termgraph._compute_bounding_graph',
@@ -298,8 +458,14 @@ d = { 'settings': { 'branch': 'master',
                                                                                       'spannerlib/graphs.py'),
                                    'spannerlib.graphs.TermGraphBase.add_rule_to_term_graph': ( 'graphs.html#termgraphbase.add_rule_to_term_graph',
                                                                                                'spannerlib/graphs.py'),
+                                   'spannerlib.graphs.TermGraphBase.get_dependent_relations': ( 'graphs.html#termgraphbase.get_dependent_relations',
+                                                                                                'spannerlib/graphs.py'),
                                    'spannerlib.graphs.TermGraphBase.get_mutually_recursive_relations': ( 'graphs.html#termgraphbase.get_mutually_recursive_relations',
                                                                                                          'spannerlib/graphs.py'),
+                                   'spannerlib.graphs.TermGraphBase.get_rules': ('graphs.html#termgraphbase.get_rules', 'spannerlib/graphs.py'),
+                                   'spannerlib.graphs.TermGraphBase.get_strata': ('graphs.html#termgraphbase.get_strata', 'spannerlib/graphs.py'),
+                                   'spannerlib.graphs.TermGraphBase.invalidate_relation': ( 'graphs.html#termgraphbase.invalidate_relation',
+                                                                                            'spannerlib/graphs.py'),
                                    'spannerlib.graphs.TermGraphBase.print_all_rules': ( 'graphs.html#termgraphbase.print_all_rules',
                                                                                         'spannerlib/graphs.py'),
                                    'spannerlib.graphs.TermGraphBase.remove_rule': ( 'graphs.html#termgraphbase.remove_rule',
@@ -320,51 +486,125 @@ d = { 'settings': { 'branch': 'master',
                                                                                                'spannerlib/ie_func/json_path.py'),
                                               'spannerlib.ie_func.json_path.parse_match': ( 'ie_func/json_path.html#parse_match',
                                                                                             'spannerlib/ie_func/json_path.py')},
-            'spannerlib.ie_func.nlp': { 'spannerlib.ie_func.nlp._install_nlp': ( 'ie_func/nlp.html#_install_nlp',
+            'spannerlib.ie_func.lexicon': { 'spannerlib.ie_func.lexicon.Lexicon': ('ie_func/lexicon.html#lexicon', 'spannerlib/ie_func/lexicon.py'),
+                                            'spannerlib.ie_func.lexicon.Lexicon.__init__': ('ie_func/lexicon.html#lexicon.__init__', 'spannerlib/ie_func/lexicon.py'),
+                                            'spannerlib.ie_func.lexicon.Lexicon.__repr__': ('ie_func/lexicon.html#lexicon.__repr__', 'spannerlib/ie_func/lexicon.py'),
+                                            'spannerlib.ie_func.lexicon.Lexicon._add_failure_links': ('ie_func/lexicon.html#lexicon._add_failure_links', 'spannerlib/ie_func/lexicon.py'),
+                                            'spannerlib.ie_func.lexicon.Lexicon._add_term': ('ie_func/lexicon.html#lexicon._add_term', 'spannerlib/ie_func/lexicon.py'),
+                                            'spannerlib.ie_func.lexicon.Lexicon._fold': ('ie_func/lexicon.html#lexicon._fold', 'spannerlib/ie_func/lexicon.py'),
+                                            'spannerlib.ie_func.lexicon.Lexicon.find': ('ie_func/lexicon.html#lexicon.find', 'spannerlib/ie_func/lexicon.py'),
+                                            'spannerlib.ie_func.lexicon._is_whole_word': ('ie_func/lexicon.html#_is_whole_word', 'spannerlib/ie_func/lexicon.py'),
+                                            'spannerlib.ie_func.lexicon._is_word_char': ('ie_func/lexicon.html#_is_word_char', 'spannerlib/ie_func/lexicon.py'),
+                                            'spannerlib.ie_func.lexicon._load_lexicon': ('ie_func/lexicon.html#_load_lexicon', 'spannerlib/ie_func/lexicon.py'),
+                                            'spannerlib.ie_func.lexicon.lexicon_ie': ('ie_func/lexicon.html#lexicon_ie', 'spannerlib/ie_func/lexicon.py'),
+                                            'spannerlib.ie_func.lexicon.lexicon_match': ('ie_func/lexicon.html#lexicon_match', 'spannerlib/ie_func/lexicon.py'),
+                                            'spannerlib.ie_func.lexicon.lexicon_match_ignore_case': ('ie_func/lexicon.html#lexicon_match_ignore_case', 'spannerlib/ie_func/lexicon.py'),
+                                            'spannerlib.ie_func.lexicon.load_lexicon': ('ie_func/lexicon.html#load_lexicon', 'spannerlib/ie_func/lexicon.py')},
+            'spannerlib.ie_func.nlp': { 'spannerlib.ie_func.nlp.AnnotationCache': ('ie_func/nlp.html#annotationcache', 'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp.AnnotationCache.__del__': ('ie_func/nlp.html#annotationcache.__del__', 'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp.AnnotationCache.__init__': ('ie_func/nlp.html#annotationcache.__init__', 'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp.AnnotationCache.__len__': ('ie_func/nlp.html#annotationcache.__len__', 'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp.AnnotationCache._get': ('ie_func/nlp.html#annotationcache._get', 'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp.AnnotationCache._get_covered_annotators': ('ie_func/nlp.html#annotationcache._get_covered_annotators', 'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp.AnnotationCache._put_in_memory': ('ie_func/nlp.html#annotationcache._put_in_memory', 'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp.AnnotationCache._put_many': ('ie_func/nlp.html#annotationcache._put_many', 'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp.AnnotationCache.annotate': ('ie_func/nlp.html#annotationcache.annotate', 'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp.AnnotationCache.annotate_many': ('ie_func/nlp.html#annotationcache.annotate_many', 'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp.AnnotationCache.clear': ('ie_func/nlp.html#annotationcache.clear', 'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp.AnnotationCache.close': ('ie_func/nlp.html#annotationcache.close', 'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp.AnnotationCache.get_key': ('ie_func/nlp.html#annotationcache.get_key', 'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp.CoreNLPPool': ('ie_func/nlp.html#corenlppool', 'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp.CoreNLPPool.__init__': ('ie_func/nlp.html#corenlppool.__init__', 'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp.CoreNLPPool.__len__': ('ie_func/nlp.html#corenlppool.__len__', 'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp.CoreNLPPool._acquire': ('ie_func/nlp.html#corenlppool._acquire', 'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp.CoreNLPPool._check_health_periodically': ('ie_func/nlp.html#corenlppool._check_health_periodically', 'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp.CoreNLPPool._is_healthy': ('ie_func/nlp.html#corenlppool._is_healthy', 'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp.CoreNLPPool._release': ('ie_func/nlp.html#corenlppool._release', 'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp.CoreNLPPool._start_server': ('ie_func/nlp.html#corenlppool._start_server', 'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp.CoreNLPPool.annotate': ('ie_func/nlp.html#corenlppool.annotate', 'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp.CoreNLPPool.check_health': ('ie_func/nlp.html#corenlppool.check_health', 'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp.CoreNLPPool.close': ('ie_func/nlp.html#corenlppool.close', 'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp.CoreNLPPool.restart': ('ie_func/nlp.html#corenlppool.restart', 'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp._annotate': ('ie_func/nlp.html#_annotate', 'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp._annotate_batch': ('ie_func/nlp.html#_annotate_batch', 'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp._annotate_documents': ('ie_func/nlp.html#_annotate_documents', 'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp._install_nlp': ( 'ie_func/nlp.html#_install_nlp',
                                                                                  'spannerlib/ie_func/nlp.py'),
                                         'spannerlib.ie_func.nlp._is_installed_java': ( 'ie_func/nlp.html#_is_installed_java',
                                                                                        'spannerlib/ie_func/nlp.py'),
                                         'spannerlib.ie_func.nlp._is_installed_nlp': ( 'ie_func/nlp.html#_is_installed_nlp',
                                                                                       'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp._pack_documents': ('ie_func/nlp.html#_pack_documents', 'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp._read_dependency_parse': ('ie_func/nlp.html#_read_dependency_parse', 'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp._read_entitymentions': ('ie_func/nlp.html#_read_entitymentions', 'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp._read_lemma': ('ie_func/nlp.html#_read_lemma', 'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp._read_ner': ('ie_func/nlp.html#_read_ner', 'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp._read_openie': ('ie_func/nlp.html#_read_openie', 'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp._read_parse': ('ie_func/nlp.html#_read_parse', 'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp._read_pos': ('ie_func/nlp.html#_read_pos', 'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp._read_sentiment': ('ie_func/nlp.html#_read_sentiment', 'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp._read_ssplit': ('ie_func/nlp.html#_read_ssplit', 'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp._read_tokenize': ('ie_func/nlp.html#_read_tokenize', 'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp._read_truecase': ('ie_func/nlp.html#_read_truecase', 'spannerlib/ie_func/nlp.py'),
                                         'spannerlib.ie_func.nlp._run_installation': ( 'ie_func/nlp.html#_run_installation',
                                                                                       'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp._split_annotation': ('ie_func/nlp.html#_split_annotation', 'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp._token_span': ('ie_func/nlp.html#_token_span', 'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp._tokens': ('ie_func/nlp.html#_tokens', 'spannerlib/ie_func/nlp.py'),
                                         'spannerlib.ie_func.nlp.cleanxml_wrapper': ( 'ie_func/nlp.html#cleanxml_wrapper',
                                                                                      'spannerlib/ie_func/nlp.py'),
                                         'spannerlib.ie_func.nlp.coref_wrapper': ( 'ie_func/nlp.html#coref_wrapper',
                                                                                   'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp.dependency_parse_batch': ('ie_func/nlp.html#dependency_parse_batch', 'spannerlib/ie_func/nlp.py'),
                                         'spannerlib.ie_func.nlp.dependency_parse_wrapper': ( 'ie_func/nlp.html#dependency_parse_wrapper',
                                                                                              'spannerlib/ie_func/nlp.py'),
                                         'spannerlib.ie_func.nlp.download_and_install_nlp': ( 'ie_func/nlp.html#download_and_install_nlp',
                                                                                              'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp.entitymentions_batch': ('ie_func/nlp.html#entitymentions_batch', 'spannerlib/ie_func/nlp.py'),
                                         'spannerlib.ie_func.nlp.entitymentions_wrapper': ( 'ie_func/nlp.html#entitymentions_wrapper',
                                                                                            'spannerlib/ie_func/nlp.py'),
                                         'spannerlib.ie_func.nlp.kbp_wrapper': ('ie_func/nlp.html#kbp_wrapper', 'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp.lemma_batch': ('ie_func/nlp.html#lemma_batch', 'spannerlib/ie_func/nlp.py'),
                                         'spannerlib.ie_func.nlp.lemma_wrapper': ( 'ie_func/nlp.html#lemma_wrapper',
                                                                                   'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp.ner_batch': ('ie_func/nlp.html#ner_batch', 'spannerlib/ie_func/nlp.py'),
                                         'spannerlib.ie_func.nlp.ner_wrapper': ('ie_func/nlp.html#ner_wrapper', 'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp.openie_batch': ('ie_func/nlp.html#openie_batch', 'spannerlib/ie_func/nlp.py'),
                                         'spannerlib.ie_func.nlp.openie_wrapper': ( 'ie_func/nlp.html#openie_wrapper',
                                                                                    'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp.parse_batch': ('ie_func/nlp.html#parse_batch', 'spannerlib/ie_func/nlp.py'),
                                         'spannerlib.ie_func.nlp.parse_wrapper': ( 'ie_func/nlp.html#parse_wrapper',
                                                                                   'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp.pos_batch': ('ie_func/nlp.html#pos_batch', 'spannerlib/ie_func/nlp.py'),
                                         'spannerlib.ie_func.nlp.pos_wrapper': ('ie_func/nlp.html#pos_wrapper', 'spannerlib/ie_func/nlp.py'),
                                         'spannerlib.ie_func.nlp.quote_wrapper': ( 'ie_func/nlp.html#quote_wrapper',
                                                                                   'spannerlib/ie_func/nlp.py'),
                                         'spannerlib.ie_func.nlp.regexner_wrapper': ( 'ie_func/nlp.html#regexner_wrapper',
                                                                                      'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp.sentiment_batch': ('ie_func/nlp.html#sentiment_batch', 'spannerlib/ie_func/nlp.py'),
                                         'spannerlib.ie_func.nlp.sentiment_wrapper': ( 'ie_func/nlp.html#sentiment_wrapper',
                                                                                       'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp.set_annotation_cache': ('ie_func/nlp.html#set_annotation_cache', 'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp.ssplit_batch': ('ie_func/nlp.html#ssplit_batch', 'spannerlib/ie_func/nlp.py'),
                                         'spannerlib.ie_func.nlp.ssplit_wrapper': ( 'ie_func/nlp.html#ssplit_wrapper',
                                                                                    'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp.tokenize_batch': ('ie_func/nlp.html#tokenize_batch', 'spannerlib/ie_func/nlp.py'),
                                         'spannerlib.ie_func.nlp.tokenize_wrapper': ( 'ie_func/nlp.html#tokenize_wrapper',
                                                                                      'spannerlib/ie_func/nlp.py'),
                                         'spannerlib.ie_func.nlp.tokensregex_wrapper': ( 'ie_func/nlp.html#tokensregex_wrapper',
                                                                                         'spannerlib/ie_func/nlp.py'),
+                                        'spannerlib.ie_func.nlp.truecase_batch': ('ie_func/nlp.html#truecase_batch', 'spannerlib/ie_func/nlp.py'),
                                         'spannerlib.ie_func.nlp.truecase_wrapper': ( 'ie_func/nlp.html#truecase_wrapper',
                                                                                      'spannerlib/ie_func/nlp.py'),
                                         'spannerlib.ie_func.nlp.udfeats_wrapper': ( 'ie_func/nlp.html#udfeats_wrapper',
                                                                                     'spannerlib/ie_func/nlp.py')},
-            'spannerlib.ie_func.python_regex': { 'spannerlib.ie_func.python_regex.py_rgx': ( 'ie_func/python_regex.html#py_rgx',
+            'spannerlib.ie_func.python_regex': { 'spannerlib.ie_func.python_regex._compile_multi_pattern': ('ie_func/python_regex.html#_compile_multi_pattern', 'spannerlib/ie_func/python_regex.py'),
+                                                 'spannerlib.ie_func.python_regex._compile_pattern': ('ie_func/python_regex.html#_compile_pattern', 'spannerlib/ie_func/python_regex.py'),
+                                                 'spannerlib.ie_func.python_regex._scope_pattern': ('ie_func/python_regex.html#_scope_pattern', 'spannerlib/ie_func/python_regex.py'),
+                                                 'spannerlib.ie_func.python_regex.py_rgx': ( 'ie_func/python_regex.html#py_rgx',
                                                                                              'spannerlib/ie_func/python_regex.py'),
+                                                 'spannerlib.ie_func.python_regex.py_rgx_multi': ('ie_func/python_regex.html#py_rgx_multi', 'spannerlib/ie_func/python_regex.py'),
+                                                 'spannerlib.ie_func.python_regex.py_rgx_multi_ie': ('ie_func/python_regex.html#py_rgx_multi_ie', 'spannerlib/ie_func/python_regex.py'),
                                                  'spannerlib.ie_func.python_regex.py_rgx_out_type': ( 'ie_func/python_regex.html#py_rgx_out_type',
                                                                                                       'spannerlib/ie_func/python_regex.py'),
                                                  'spannerlib.ie_func.python_regex.py_rgx_string': ( 'ie_func/python_regex.html#py_rgx_string',
@@ -375,27 +615,56 @@ d = { 'settings': { 'branch': 'master',
                                                                                                                               'spannerlib/ie_func/rust_spanner_regex.py'),
                                                        'spannerlib.ie_func.rust_spanner_regex._format_spanner_string_output': ( 'ie_func/rust_spanner_regex.html#_format_spanner_string_output',
                                                                                                                                 'spannerlib/ie_func/rust_spanner_regex.py'),
+                                                       'spannerlib.ie_func.rust_spanner_regex._get_rgx_command': ('ie_func/rust_spanner_regex.html#_get_rgx_command', 'spannerlib/ie_func/rust_spanner_regex.py'),
                                                        'spannerlib.ie_func.rust_spanner_regex._is_installed_package': ( 'ie_func/rust_spanner_regex.html#_is_installed_package',
                                                                                                                         'spannerlib/ie_func/rust_spanner_regex.py'),
                                                        'spannerlib.ie_func.rust_spanner_regex.download_and_install_rust_regex': ( 'ie_func/rust_spanner_regex.html#download_and_install_rust_regex',
                                                                                                                                   'spannerlib/ie_func/rust_spanner_regex.py'),
                                                        'spannerlib.ie_func.rust_spanner_regex.rgx': ( 'ie_func/rust_spanner_regex.html#rgx',
                                                                                                       'spannerlib/ie_func/rust_spanner_regex.py'),
+                                                       'spannerlib.ie_func.rust_spanner_regex.rgx_batch': ('ie_func/rust_spanner_regex.html#rgx_batch', 'spannerlib/ie_func/rust_spanner_regex.py'),
                                                        'spannerlib.ie_func.rust_spanner_regex.rgx_span': ( 'ie_func/rust_spanner_regex.html#rgx_span',
                                                                                                            'spannerlib/ie_func/rust_spanner_regex.py'),
+                                                       'spannerlib.ie_func.rust_spanner_regex.rgx_span_batch': ('ie_func/rust_spanner_regex.html#rgx_span_batch', 'spannerlib/ie_func/rust_spanner_regex.py'),
                                                        'spannerlib.ie_func.rust_spanner_regex.rgx_span_from_file': ( 'ie_func/rust_spanner_regex.html#rgx_span_from_file',
                                                                                                                      'spannerlib/ie_func/rust_spanner_regex.py'),
+                                                       'spannerlib.ie_func.rust_spanner_regex.rgx_span_from_file_batch': ('ie_func/rust_spanner_regex.html#rgx_span_from_file_batch', 'spannerlib/ie_func/rust_spanner_regex.py'),
                                                        'spannerlib.ie_func.rust_spanner_regex.rgx_span_out_type': ( 'ie_func/rust_spanner_regex.html#rgx_span_out_type',
                                                                                                                     'spannerlib/ie_func/rust_spanner_regex.py'),
                                                        'spannerlib.ie_func.rust_spanner_regex.rgx_string': ( 'ie_func/rust_spanner_regex.html#rgx_string',
                                                                                                              'spannerlib/ie_func/rust_spanner_regex.py'),
+                                                       'spannerlib.ie_func.rust_spanner_regex.rgx_string_batch': ('ie_func/rust_spanner_regex.html#rgx_string_batch', 'spannerlib/ie_func/rust_spanner_regex.py'),
                                                        'spannerlib.ie_func.rust_spanner_regex.rgx_string_from_file': ( 'ie_func/rust_spanner_regex.html#rgx_string_from_file',
                                                                                                                        'spannerlib/ie_func/rust_spanner_regex.py'),
+                                                       'spannerlib.ie_func.rust_spanner_regex.rgx_string_from_file_batch': ('ie_func/rust_spanner_regex.html#rgx_string_from_file_batch', 'spannerlib/ie_func/rust_spanner_regex.py'),
                                                        'spannerlib.ie_func.rust_spanner_regex.rgx_string_out_type': ( 'ie_func/rust_spanner_regex.html#rgx_string_out_type',
                                                                                                                       'spannerlib/ie_func/rust_spanner_regex.py')},
-            'spannerlib.ie_function': { 'spannerlib.ie_function.IEFunction': ('ie_function.html#iefunction', 'spannerlib/ie_function.py'),
+            'spannerlib.ie_function': { 'spannerlib.ie_function.IECache': ('ie_function.html#iecache', 'spannerlib/ie_function.py'),
+                                        'spannerlib.ie_function.IECache.__del__': ('ie_function.html#iecache.__del__', 'spannerlib/ie_function.py'),
+                                        'spannerlib.ie_function.IECache.__init__': ('ie_function.html#iecache.__init__', 'spannerlib/ie_function.py'),
+                                        'spannerlib.ie_function.IECache.__len__': ('ie_function.html#iecache.__len__', 'spannerlib/ie_function.py'),
+                                        'spannerlib.ie_function.IECache._get_input_key': ('ie_function.html#iecache._get_input_key', 'spannerlib/ie_function.py'),
+                                        'spannerlib.ie_function.IECache._put_in_memory': ('ie_function.html#iecache._put_in_memory', 'spannerlib/ie_function.py'),
+                                        'spannerlib.ie_function.IECache.clear': ('ie_function.html#iecache.clear', 'spannerlib/ie_function.py'),
+                                        'spannerlib.ie_function.IECache.close': ('ie_function.html#iecache.close', 'spannerlib/ie_function.py'),
+                                        'spannerlib.ie_function.IECache.get': ('ie_function.html#iecache.get', 'spannerlib/ie_function.py'),
+                                        'spannerlib.ie_function.IECache.get_function_key': ('ie_function.html#iecache.get_function_key', 'spannerlib/ie_function.py'),
+                                        'spannerlib.ie_function.IECache.get_key': ('ie_function.html#iecache.get_key', 'spannerlib/ie_function.py'),
+                                        'spannerlib.ie_function.IECache.is_enabled': ('ie_function.html#iecache.is_enabled', 'spannerlib/ie_function.py'),
+                                        'spannerlib.ie_function.IECache.put_many': ('ie_function.html#iecache.put_many', 'spannerlib/ie_function.py'),
+                                        'spannerlib.ie_function.IECache.remove_function': ('ie_function.html#iecache.remove_function', 'spannerlib/ie_function.py'),
+                                        'spannerlib.ie_function.IECache.run': ('ie_function.html#iecache.run', 'spannerlib/ie_function.py'),
+                                        'spannerlib.ie_function.IEFunction': ('ie_function.html#iefunction', 'spannerlib/ie_function.py'),
+                                        'spannerlib.ie_function.IEFunction.__del__': ('ie_function.html#iefunction.__del__', 'spannerlib/ie_function.py'),
+                                        'spannerlib.ie_function.IEFunction.__getstate__': ('ie_function.html#iefunction.__getstate__', 'spannerlib/ie_function.py'),
                                         'spannerlib.ie_function.IEFunction.__init__': ( 'ie_function.html#iefunction.__init__',
                                                                                         'spannerlib/ie_function.py'),
+                                        'spannerlib.ie_function.IEFunction._await_async_call': ('ie_function.html#iefunction._await_async_call', 'spannerlib/ie_function.py'),
+                                        'spannerlib.ie_function.IEFunction._await_async_calls': ('ie_function.html#iefunction._await_async_calls', 'spannerlib/ie_function.py'),
+                                        'spannerlib.ie_function.IEFunction._get_code_fingerprint': ('ie_function.html#iefunction._get_code_fingerprint', 'spannerlib/ie_function.py'),
+                                        'spannerlib.ie_function.IEFunction._get_implementation': ('ie_function.html#iefunction._get_implementation', 'spannerlib/ie_function.py'),
+                                        'spannerlib.ie_function.IEFunction._get_value_fingerprint': ('ie_function.html#iefunction._get_value_fingerprint', 'spannerlib/ie_function.py'),
+                                        'spannerlib.ie_function.IEFunction.get_fingerprint': ('ie_function.html#iefunction.get_fingerprint', 'spannerlib/ie_function.py'),
                                         'spannerlib.ie_function.IEFunction.get_input_types': ( 'ie_function.html#iefunction.get_input_types',
                                                                                                'spannerlib/ie_function.py'),
                                         'spannerlib.ie_function.IEFunction.get_meta_data': ( 'ie_function.html#iefunction.get_meta_data',
@@ -403,7 +672,13 @@ d = { 'settings': { 'branch': 'master',
                                         'spannerlib.ie_function.IEFunction.get_output_types': ( 'ie_function.html#iefunction.get_output_types',
                                                                                                 'spannerlib/ie_function.py'),
                                         'spannerlib.ie_function.IEFunction.ie_function': ( 'ie_function.html#iefunction.ie_function',
-                                                                                           'spannerlib/ie_function.py')},
+                                                                                           'spannerlib/ie_function.py'),
+                                        'spannerlib.ie_function.IEFunction.ie_function_batch': ('ie_function.html#iefunction.ie_function_batch', 'spannerlib/ie_function.py'),
+                                        'spannerlib.ie_function.IEFunction.ie_function_batches': ('ie_function.html#iefunction.ie_function_batches', 'spannerlib/ie_function.py'),
+                                        'spannerlib.ie_function.IEFunction.shutdown': ('ie_function.html#iefunction.shutdown', 'spannerlib/ie_function.py'),
+                                        'spannerlib.ie_function._is_async_callable': ('ie_function.html#_is_async_callable', 'spannerlib/ie_function.py'),
+                                        'spannerlib.ie_function._run_coroutine': ('ie_function.html#_run_coroutine', 'spannerlib/ie_function.py'),
+                                        'spannerlib.ie_function._run_ie_function_batch': ('ie_function.html#_run_ie_function_batch', 'spannerlib/ie_function.py')},
             'spannerlib.lark_passes': { 'spannerlib.lark_passes.AddStatementsToNetxParseGraph': ( 'lark_passes.html#addstatementstonetxparsegraph',
                                                                                                   'spannerlib/lark_passes.py'),
                                         'spannerlib.lark_passes.AddStatementsToNetxParseGraph.__init__': ( 'lark_passes.html#addstatementstonetxparsegraph.__init__',
@@ -657,15 +932,18 @@ d = { 'settings': { 'branch': 'master',
                                     'spannerlib.session._remove_rule_relation_from_symbols_and_engine': ( 'session.html#_remove_rule_relation_from_symbols_and_engine',
                                                                                                           'spannerlib/session.py'),
                                     'spannerlib.session._run_passes': ('session.html#_run_passes', 'spannerlib/session.py'),
+                                    'spannerlib.session._stream_commands': ('session.html#_stream_commands', 'spannerlib/session.py'),
                                     'spannerlib.session._text_to_typed_data': ('session.html#_text_to_typed_data', 'spannerlib/session.py'),
                                     'spannerlib.session._verify_relation_types': ( 'session.html#_verify_relation_types',
                                                                                    'spannerlib/session.py'),
+                                    'spannerlib.session.add_facts': ('session.html#add_facts', 'spannerlib/session.py'),
                                     'spannerlib.session.clear_relation': ('session.html#clear_relation', 'spannerlib/session.py'),
                                     'spannerlib.session.export': ('session.html#export', 'spannerlib/session.py'),
                                     'spannerlib.session.format_query_results': ( 'session.html#format_query_results',
                                                                                  'spannerlib/session.py'),
                                     'spannerlib.session.get_pass_stack': ('session.html#get_pass_stack', 'spannerlib/session.py'),
                                     'spannerlib.session.import_rel': ('session.html#import_rel', 'spannerlib/session.py'),
+                                    'spannerlib.session.iter_query': ('session.html#iter_query', 'spannerlib/session.py'),
                                     'spannerlib.session.print_all_rules': ('session.html#print_all_rules', 'spannerlib/session.py'),
                                     'spannerlib.session.print_registered_ie_functions': ( 'session.html#print_registered_ie_functions',
                                                                                           'spannerlib/session.py'),
@@ -0,0 +1,478 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/02c_columnar_engine.ipynb.
+
+# %% auto 0
+__all__ = ['ColumnarEngine']
+
+# %% ../nbs/02c_columnar_engine.ipynb 4
+from nbdev.showdoc import show_doc
+
+# %% ../nbs/02c_columnar_engine.ipynb 5
+import numpy as np
+import pandas as pd
+from itertools import count
+from typing import Iterable, Optional, Set, Tuple, Any, List, Union, Dict, Sequence
+from .ast_node_types import RelationDeclaration, AddFact, RemoveFact, Query, Relation
+from .primitive_types import Span, DataTypes, DataTypeMapping
+from .general_utils import get_free_var_to_relations_dict, get_output_free_var_names, extract_one_relation, string_to_span
+from .engine import spannerlogEngineBase, RESERVED_RELATION_PREFIX, FALSE_VALUE, TRUE_VALUE
+from .utils import patch_method
+
+# %% ../nbs/02c_columnar_engine.ipynb 6
+class ColumnarEngine(spannerlogEngineBase):
+    """
+    in this implementation of the engine, every relation is a pandas dataframe whose columns are named 0, 1, ...
+    and contain the codes of the terms (see `_encode_term`).
+    the dataframes are never changed in place (every change creates a new dataframe), so the same dataframe can be
+    shared by several relations, e.g. by `operator_copy`.
+    """
+
+    # useful prefixes
+    PROJECT_PREFIX = "project"
+    JOIN_PREFIX = "join"
+    COPY_PREFIX = "copy"
+    SELECT_PREFIX = "select"
+    UNION_PREFIX = "union"
+    DIFFERENCE_PREFIX = "difference"
+    INTERSECTION_PREFIX = "intersection"
+    SEPARATOR = "_"
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.unique_relation_id_counter = count()
+
+        # maps the name of each relation to its tuples
+        self.tables: Dict[str, pd.DataFrame] = {}
+
+        # the facts that were added to each relation and weren't inserted into its dataframe yet.
+        # they are inserted together when the relation is read (see `_get_table`), so adding many facts is cheap
+        self.pending_facts: Dict[str, List[Tuple[int, ...]]] = {}
+
+        # the dictionary of the terms. the code of a term is its index in `terms`.
+        # terms are never removed from the dictionary, so the codes in the dataframes stay valid
+        self.terms: List[Any] = []
+        self.term_codes: Dict[Any, int] = {}
+
+    @staticmethod
+    def _create_dataframe(rows: Iterable[Tuple[int, ...]], # the encoded tuples of the relation
+                          arity: int # the relation's arity
+                          ) -> pd.DataFrame:
+        rows = np.array(list(rows), dtype=np.int64).reshape(-1, arity)
+        return pd.DataFrame(rows, columns=range(arity))
+
+    @staticmethod
+    def _remove_duplicates(table: pd.DataFrame) -> pd.DataFrame:
+        if table.shape[1] == 0:
+            # a relation without columns has at most one (empty) tuple
+            return table.iloc[:1]
+        return table.drop_duplicates(ignore_index=True)
+
+    @staticmethod
+    def _is_in(table: pd.DataFrame, # the tuples to look for
+               other_table: pd.DataFrame # a table with the same arity
+               ) -> np.ndarray: # a boolean mask of the tuples of `table` that appear in `other_table`
+        if table.shape[1] == 0:
+            return np.full(len(table), len(other_table) > 0)
+
+        # a left hash join keeps the order of `table`, and doesn't add rows since `other_table` has no duplicates
+        merged_table = table.merge(ColumnarEngine._remove_duplicates(other_table), how="left", indicator=True)
+        return (merged_table["_merge"] == "both").to_numpy()
+
+    @staticmethod
+    def _get_sort_key(term: Any) -> Tuple:
+        # integers are sorted before strings, which are sorted before spans (like in sqlite, which stores spans as BLOBs)
+        if isinstance(term, int):
+            return (0, term, "")
+        if isinstance(term, Span):
+            return (2, term.span_start, term.span_end)
+        return (1, 0, str(term))
+
+# %% ../nbs/02c_columnar_engine.ipynb 7
+@patch_method
+def _encode_term(self: ColumnarEngine, term: Any) -> int:
+    """
+    @return: the code of the term. a new code is given to terms that weren't encoded before.
+    """
+    code = self.term_codes.get(term)
+    if code is None:
+        code = len(self.terms)
+        self.terms.append(term)
+        self.term_codes[term] = code
+    return code
+
+@patch_method
+def _decode_table(self: ColumnarEngine, table: pd.DataFrame) -> List[Tuple]:
+    """
+    @return: the tuples of the table, where every code is replaced by its term.
+    """
+    terms = np.fromiter(self.terms, dtype=object, count=len(self.terms))
+    columns = [terms[table[col].to_numpy()] for col in table.columns]
+    if not columns:
+        return [tuple()] * len(table)
+    return list(zip(*columns))
+
+@patch_method
+def _get_table(self: ColumnarEngine, table_name: str) -> pd.DataFrame:
+    """
+    @return: the dataframe of the relation, after inserting the pending facts into it.
+    """
+    pending_facts = self.pending_facts.pop(table_name, None)
+    if pending_facts:
+        table = self.tables[table_name]
+        new_table = self._create_dataframe(pending_facts, table.shape[1])
+        self.tables[table_name] = self._remove_duplicates(pd.concat([table, new_table], ignore_index=True))
+
+    return self.tables[table_name]
+
+@patch_method
+def _add_table(self: ColumnarEngine, 
+               table: pd.DataFrame, # the tuples of the new relation
+               prefix: str = "" # will be used as a part of the relation's name
+               ) -> str: # the new relation's name
+    """
+    Adds a relation with a unique name.
+    """
+    unique_relation_id = next(self.unique_relation_id_counter)
+    if RESERVED_RELATION_PREFIX in prefix:
+        # we don't want relations to be called __spannerlog__spannerlog__spannerlog...
+        unique_relation_name = f'{prefix}{unique_relation_id}'
+    else:
+        unique_relation_name = f'{RESERVED_RELATION_PREFIX}{prefix}{unique_relation_id}'
+
+    self.tables[unique_relation_name] = table
+    return unique_relation_name
+
+@patch_method
+def _create_unique_relation(self: ColumnarEngine, 
+                            arity: int, # the relation's arity
+                            prefix: str = "" # will be used as a part of the relation's name
+                            ) -> str: # the new relation's name
+    """
+    Declares a new empty relation with the requested arity, the relation will have a unique name.
+    """
+    return self._add_table(self._create_dataframe([], arity), prefix)
+
+@patch_method
+def _convert_relation_term_to_string_or_int(self: ColumnarEngine, datatype: DataTypes, term: DataTypeMapping.term) -> Union[str, int, Span]:
+    # the terms are kept as python objects. like in `SqliteEngine`, strings are unquoted
+    if datatype is DataTypes.integer:
+        assert isinstance(term, int), "an integer must be of int type"
+        return term
+    elif datatype is DataTypes.span and isinstance(term, Span):
+        return term
+    else:
+        unquoted_term = str(term).strip('"')
+        if datatype is DataTypes.span:
+            return string_to_span(unquoted_term) or unquoted_term
+        return unquoted_term
+
+# %% ../nbs/02c_columnar_engine.ipynb 8
+@patch_method
+def declare_relation_table(self: ColumnarEngine, 
+                relation_decl: RelationDeclaration # the declaration info
+                ) -> None:
+    """
+    Declares an empty relation. if the relation is already declared, do nothing.
+    """
+    if not self.is_table_exists(relation_decl.relation_name):
+        self.tables[relation_decl.relation_name] = self._create_dataframe([], len(relation_decl.type_list))
+
+@patch_method
+def is_table_exists(self: ColumnarEngine, table_name: str) -> bool:
+    return table_name in self.tables
+
+@patch_method
+def remove_table(self: ColumnarEngine, table_name: str) -> None:
+    self.tables.pop(table_name, None)
+    self.pending_facts.pop(table_name, None)
+
+@patch_method
+def remove_tables(self: ColumnarEngine, table_names: Iterable[str]) -> None:
+    for table_name in table_names:
+        self.remove_table(table_name)
+
+@patch_method
+def clear_relation(self: ColumnarEngine, table_name: str) -> None:
+    self.pending_facts.pop(table_name, None)
+    self.tables[table_name] = self.tables[table_name].iloc[:0]
+
+@patch_method
+def get_table_len(self: ColumnarEngine, table_name: str) -> int:
+    return len(self._get_table(table_name))
+
+# %% ../nbs/02c_columnar_engine.ipynb 9
+@patch_method
+def add_fact(self: ColumnarEngine, 
+            fact: AddFact # the fact to be added
+            ) -> None:
+    """
+    Adds a tuple to an existing relation, based on `fact`'s terms and types.
+    """
+    row = tuple(self._encode_term(self._convert_relation_term_to_string_or_int(datatype, term))
+                for datatype, term in zip(fact.type_list, fact.term_list))
+    self.pending_facts.setdefault(fact.relation_name, []).append(row)
+
+@patch_method
+def add_facts(self: ColumnarEngine, 
+              relation_name: str, # the relation into which the facts are added
+              rows: Iterable[Sequence[DataTypeMapping.term]], # the terms of each fact. can be any iterable, e.g. a generator
+              type_list: Sequence[DataTypes] # the types of the relation's terms
+              ) -> None:
+    """
+    Adds many tuples to an existing relation. all the rows are encoded before any of them is added, so if a row
+    can't be added (e.g. the iterable raises an exception), none of the rows are added.
+    """
+    new_rows = [tuple(self._encode_term(self._convert_relation_term_to_string_or_int(datatype, term))
+                      for datatype, term in zip(type_list, row))
+                for row in rows]
+    self.pending_facts.setdefault(relation_name, []).extend(new_rows)
+
+@patch_method
+def remove_fact(self: ColumnarEngine, 
+                fact: RemoveFact # the fact to be removed
+                ) -> None:
+    """
+    Removes a tuple from an existing relation, based on `fact`'s terms and types.
+    """
+    table = self._get_table(fact.relation_name)
+    row = [self._encode_term(self._convert_relation_term_to_string_or_int(datatype, term))
+           for datatype, term in zip(fact.type_list, fact.term_list)]
+    is_removed = self._is_in(table, self._create_dataframe([row], len(row)))
+    self.tables[fact.relation_name] = table[~is_removed].reset_index(drop=True)
+
+# %% ../nbs/02c_columnar_engine.ipynb 12
+@patch_method
+def _get_free_var_table(self: ColumnarEngine, 
+                        relation: Relation # a relation whose tuples are read
+                        ) -> pd.DataFrame: # the tuples of the relation, where every column is named after a free variable of the relation
+    """
+    Reads a relation, keeping only the tuples where repeated free variables have the same value
+    (e.g. for `a(X, Y, X)`, only the tuples whose first and third terms are equal).
+    """
+    table = self._get_table(relation.relation_name)
+    var_dict = get_free_var_to_relations_dict({relation})
+
+    mask = np.ones(len(table), dtype=bool)
+    var_indexes = {}
+    for free_var, pairs in var_dict.items():
+        first_index = pairs[0][1]
+        var_indexes[free_var] = first_index
+        for _, other_index in pairs[1:]:
+            mask &= table[first_index].to_numpy() == table[other_index].to_numpy()
+
+    free_var_table = table if mask.all() else table[mask]
+    free_var_table = free_var_table[list(var_indexes.values())]
+    free_var_table.columns = list(var_indexes.keys())
+    return free_var_table
+
+# %% ../nbs/02c_columnar_engine.ipynb 13
+@patch_method
+@extract_one_relation
+def operator_select(self: ColumnarEngine, 
+                src_relation: Relation, # the relation from which we select tuples
+                constant_variables_info: Set[Tuple[int, Any, DataTypes]], # a set of tuples. each tuple contains the index of the column, the value to select (a constant variable), and the type of the column
+                *args: Any
+                ) -> Relation: # a filtered relation
+    """
+    Keeps the tuples whose columns are equal to the constants in `constant_variables_info`, and whose repeated free
+    variables are equal, using a vectorized comparison over each column.
+    """
+    table = self._get_table(src_relation.relation_name)
+
+    mask = np.ones(len(table), dtype=bool)
+    for i, value, datatype in constant_variables_info:
+        code = self.term_codes.get(self._convert_relation_term_to_string_or_int(datatype, value))
+        if code is None:
+            # the constant doesn't appear in any relation
+            mask[:] = False
+        else:
+            mask &= table[i].to_numpy() == code
+
+    for free_var, pairs in get_free_var_to_relations_dict({src_relation}).items():
+        first_index = pairs[0][1]
+        for _, other_index in pairs[1:]:
+            mask &= table[first_index].to_numpy() == table[other_index].to_numpy()
+
+    selected_table = table if mask.all() else table[mask].reset_index(drop=True)
+    new_relation_name = self._add_table(selected_table, prefix=f"{src_relation.relation_name}{self.SEPARATOR}{self.SELECT_PREFIX}")
+    return Relation(new_relation_name, src_relation.term_list, src_relation.type_list)
+
+# %% ../nbs/02c_columnar_engine.ipynb 14
+@patch_method
+def operator_join(self: ColumnarEngine, 
+            relations: List[Relation], # a list of normal relations
+            *args: Any
+            ) -> Relation: # a new relation whose terms are the free variables of all the relations
+    """
+    Joins the relations one by one using hash joins on their common free variables.
+    we start from the smallest relation, and every time we join the smallest relation that has a common free variable
+    with the relations that were already joined. relations without common free variables are joined using a cross
+    join (product), only when there are no other relations left.
+    """
+    assert len(relations) > 0, "can't join an empty list"
+    if len(relations) == 1:
+        return relations[0]
+
+    tables = sorted((self._get_free_var_table(relation) for relation in relations), key=len)
+    joined_table = tables.pop(0)
+    while tables:
+        connected_indexes = [i for i, table in enumerate(tables) if set(table.columns) & set(joined_table.columns)]
+        table = tables.pop(connected_indexes[0] if connected_indexes else 0)
+
+        common_vars = [free_var for free_var in table.columns if free_var in joined_table.columns]
+        if common_vars:
+            joined_table = joined_table.merge(table, on=common_vars)
+        else:
+            joined_table = joined_table.merge(table, how="cross")
+
+    joined_relation_terms = list(joined_table.columns)
+    joined_table.columns = range(len(joined_relation_terms))
+    joined_table = self._remove_duplicates(joined_table)
+
+    joined_relation_name = self._add_table(joined_table, prefix=self.JOIN_PREFIX)
+    return Relation(joined_relation_name, joined_relation_terms, [DataTypes.free_var_name] * len(joined_relation_terms))
+
+# %% ../nbs/02c_columnar_engine.ipynb 15
+@patch_method
+@extract_one_relation
+def operator_project(self: ColumnarEngine, 
+                src_relation: Relation, # the relation on which we project
+                project_vars: List[str], # a list of variables on which we project
+                *args: Any
+                ) -> Relation: # the projected relation
+    var_dict = get_free_var_to_relations_dict({src_relation})
+    project_indexes = [var_dict[var][0][1] for var in project_vars]
+
+    projected_table = self._get_table(src_relation.relation_name)[project_indexes]
+    projected_table.columns = range(len(project_indexes))
+    projected_table = self._remove_duplicates(projected_table)
+
+    new_type_list = [src_relation.type_list[i] for i in project_indexes]
+    new_relation_name = self._add_table(projected_table, prefix=f"{src_relation.relation_name}{self.SEPARATOR}{self.PROJECT_PREFIX}")
+    return Relation(new_relation_name, project_vars, new_type_list)
+
+@patch_method
+def _sort_table(self: ColumnarEngine, table: pd.DataFrame) -> pd.DataFrame:
+    """
+    @return: the table sorted by the terms of its columns (and not by their codes).
+    """
+    # only the distinct codes of the table are decoded, the columns are sorted by the rank of each code
+    codes = np.unique(table.to_numpy())
+    code_order = sorted(range(len(codes)), key=lambda i: self._get_sort_key(self.terms[codes[i]]))
+    ranks = np.empty(len(codes), dtype=np.int64)
+    ranks[code_order] = np.arange(len(codes))
+
+    rank_columns = [ranks[np.searchsorted(codes, table[col].to_numpy())] for col in table.columns]
+    # `np.lexsort` uses the last key as the primary key
+    return table.iloc[np.lexsort(rank_columns[::-1])].reset_index(drop=True)
+
+@patch_method
+def operator_union(self: ColumnarEngine, 
+                relations: List[Relation], # a list of relations to unite
+                *args: Any
+                ) -> Relation: # the united relation
+    assert len(relations) > 0, "cannot perform union on an empty list"
+    if len(relations) == 1:
+        return relations[0]
+
+    # we assume the same order in all the relations
+    tables = [self._get_table(relation.relation_name) for relation in relations]
+    united_table = self._remove_duplicates(pd.concat(tables, ignore_index=True))
+    if united_table.shape[1] > 0:
+        # like SQL's UNION (and `SqliteEngine`), the united tuples are sorted
+        united_table = self._sort_table(united_table)
+    new_relation_name = self._add_table(united_table, prefix=self.UNION_PREFIX)
+    return Relation(new_relation_name, relations[0].term_list, relations[0].type_list)
+
+@patch_method
+@extract_one_relation
+def operator_copy(self: ColumnarEngine, src_rel: Relation, output_relation: Optional[Relation] = None, *args: Any) -> Relation:
+    """
+    See `spannerlogEngineBase.operator_copy` for explanation
+    """
+    # the dataframes are never changed in place, so the copy can share the dataframe of the source
+    table = self._get_table(src_rel.relation_name)
+    if output_relation:
+        dest_rel_name = output_relation.relation_name
+        self.pending_facts.pop(dest_rel_name, None)
+        self.tables[dest_rel_name] = table
+    else:
+        dest_rel_name = self._add_table(table, prefix=f"{src_rel.relation_name}{self.SEPARATOR}{self.COPY_PREFIX}")
+
+    return Relation(dest_rel_name, src_rel.term_list, src_rel.type_list)
+
+# %% ../nbs/02c_columnar_engine.ipynb 18
+@patch_method
+def operator_difference(self: ColumnarEngine,
+                relations: List[Relation], # a list of relations. the first one is the relation we subtract from
+                *args: Any
+                ) -> Relation: # a new relation that contains the tuples of the first relation that aren't in the other relations
+    assert len(relations) > 0, "cannot perform difference on an empty list"
+    src_relation, other_relations = relations[0], relations[1:]
+
+    table = self._get_table(src_relation.relation_name)
+    for relation in other_relations:
+        table = table[~self._is_in(table, self._get_table(relation.relation_name))]
+
+    new_relation_name = self._add_table(table.reset_index(drop=True),
+                                        prefix=f"{src_relation.relation_name}{self.SEPARATOR}{self.DIFFERENCE_PREFIX}")
+    return Relation(new_relation_name, src_relation.term_list, src_relation.type_list)
+
+@patch_method
+def operator_intersection(self: ColumnarEngine,
+                relations: List[Relation], # a list of relations to intersect
+                *args: Any
+                ) -> Relation: # a new relation that contains the tuples that appear in all the relations
+    assert len(relations) > 0, "cannot perform intersection on an empty list"
+    src_relation, other_relations = relations[0], relations[1:]
+
+    table = self._get_table(src_relation.relation_name)
+    for relation in other_relations:
+        table = table[self._is_in(table, self._get_table(relation.relation_name))]
+
+    new_relation_name = self._add_table(table.reset_index(drop=True), prefix=self.INTERSECTION_PREFIX)
+    return Relation(new_relation_name, src_relation.term_list, src_relation.type_list)
+
+@patch_method
+def insert_relation(self: ColumnarEngine,
+                src_rel: Relation, # the relation whose tuples are inserted
+                dest_rel: Relation # the relation into which the tuples are inserted
+                ) -> None:
+    tables = [self._get_table(dest_rel.relation_name), self._get_table(src_rel.relation_name)]
+    self.tables[dest_rel.relation_name] = self._remove_duplicates(pd.concat(tables, ignore_index=True))
+
+@patch_method
+def delete_relation(self: ColumnarEngine,
+                src_rel: Relation, # the relation whose tuples are deleted
+                dest_rel: Relation # the relation from which the tuples are deleted
+                ) -> None:
+    table = self._get_table(dest_rel.relation_name)
+    is_deleted = self._is_in(table, self._get_table(src_rel.relation_name))
+    self.tables[dest_rel.relation_name] = table[~is_deleted].reset_index(drop=True)
+
+# %% ../nbs/02c_columnar_engine.ipynb 21
+@patch_method
+def query(self: ColumnarEngine, 
+                query: Query, # the query to be performed
+                allow_duplicates: bool = False # not used, the relations never contain duplicates
+                ) -> List[Tuple]: # a query results which is True, False, or a list of tuples
+    """
+    Outputs a preformatted query result, e.g. [("a",5),("b",6)].
+    """
+    free_var_names_for_project = [term for term, term_type in zip(query.term_list, query.type_list)
+                                  if term_type is DataTypes.free_var_name]
+    has_free_vars = bool(free_var_names_for_project)
+
+    # create temporary relations for the select/project, and delete them
+    selected_relation = self.operator_select(query, query.get_select_cols_values_and_types())
+    if has_free_vars:
+        projected_relation = self.operator_project(selected_relation, free_var_names_for_project)
+    else:
+        projected_relation = selected_relation
+
+    query_result = self._decode_table(self._get_table(projected_relation.relation_name))
+    self.remove_tables([selected_relation.relation_name, projected_relation.relation_name])
+
+    if (not has_free_vars) and query_result != FALSE_VALUE:
+        query_result = TRUE_VALUE
+
+    return query_result
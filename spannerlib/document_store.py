@@ -0,0 +1,239 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/02d_document_store.ipynb.
+
+# %% auto 0
+__all__ = ['DEFAULT_DOCUMENT_MIN_LENGTH', 'DEFAULT_DOCUMENT_CACHE_SIZE', 'DOCUMENT_ID_PREFIX', 'DOCUMENT_DIGEST_SIZE',
+           'FILE_VALIDATION_CHUNK_SIZE', 'Document', 'DocumentStore']
+
+# %% ../nbs/02d_document_store.ipynb 3
+import codecs
+import hashlib
+import mmap
+import weakref
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, Union
+
+# %% ../nbs/02d_document_store.ipynb 4
+# strings of at least this many characters are documents, shorter strings are not worth an id
+DEFAULT_DOCUMENT_MIN_LENGTH = 1024
+# the maximal number of memory mapped documents that are kept decoded in memory
+DEFAULT_DOCUMENT_CACHE_SIZE = 64
+# the ids of documents start with this prefix, which tells them apart from packed spans (and from any other bytes)
+DOCUMENT_ID_PREFIX = b"doc:"
+DOCUMENT_DIGEST_SIZE = 16
+# the number of bytes of a memory mapped file that are decoded at a time when it is validated
+FILE_VALIDATION_CHUNK_SIZE = 1 << 20
+
+# %% ../nbs/02d_document_store.ipynb 5
+class Document:
+    """
+    A lazy reference to a document of a `DocumentStore`, e.g. the value of a variable that is assigned by `read()`.
+
+    the engine stores the id of the document without resolving it, and the text is only resolved when it is used as a
+    string, e.g. when it is the input of an ie function or when it is printed. as long as a reference is alive, its
+    store keeps the document.
+    """
+    __slots__ = ('store', 'document_id', '__weakref__')
+
+    def __init__(self, store: "DocumentStore", # the store that keeps the document
+                 document_id: bytes # the id of the document
+                 ):
+        self.store = store
+        self.document_id = document_id
+
+    @property
+    def text(self) -> str:
+        return self.store.get(self.document_id)
+
+    def __str__(self) -> str:
+        return self.text
+
+    def __repr__(self) -> str:
+        return f"Document({self.document_id!r})"
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, Document) and self.document_id == other.document_id
+
+    def __hash__(self) -> int:
+        return hash(self.document_id)
+
+    def __deepcopy__(self, memo: Dict) -> "Document":
+        # a reference is immutable, and copying it would copy its store as well
+        return self
+
+# %% ../nbs/02d_document_store.ipynb 6
+class DocumentStore:
+    """
+    Keeps every document (a long string) once, and identifies it by a compact id.
+
+    the engine stores the id of a document instead of its text in the rows that contain it, and resolves the ids in query
+    results back into text, so all of the rows and ie function inputs that contain a document share a single string.
+    documents that are read from files are memory-mapped and referenced by a `Document`, so they are not decoded
+    until their text is used, and only the `cache_size` most recently used ones are kept decoded in memory.
+
+    an id is a digest of the document's text, so equal documents have equal ids, and ids can be compared and joined
+    instead of the documents themselves. documents that are no longer referenced by the engine or by a `Document` are
+    freed by `collect`.
+    """
+
+    def __init__(self,
+                 min_length: int = DEFAULT_DOCUMENT_MIN_LENGTH, # the length from which a string is kept as a document
+                 cache_size: int = DEFAULT_DOCUMENT_CACHE_SIZE # the number of memory mapped documents that are kept decoded
+                 ):
+        if min_length < 1:
+            raise ValueError(f"the minimal length of a document must be positive, got {min_length}")
+        self.min_length = min_length
+        self.cache_size = cache_size
+        # the documents that are kept in memory, and the memory mapped ones
+        self._texts: Dict[bytes, str] = {}
+        self._files: Dict[bytes, mmap.mmap] = {}
+        # the recently used memory mapped documents, decoded
+        self._decoded: OrderedDict[bytes, str] = OrderedDict()
+        # maps the documents that are in memory to their ids, so a document that is stored again isn't hashed again
+        self._ids: Dict[str, bytes] = {}
+        # the alive references to the documents, which keep them from being collected
+        self._references: Dict[bytes, weakref.ref] = {}
+        # whether documents may have stopped being referenced since the last `collect`
+        self.released = False
+
+    def __len__(self) -> int:
+        return len(self._texts) + len(self._files)
+
+    def __contains__(self, document_id: bytes) -> bool:
+        return document_id in self._texts or document_id in self._files
+
+    def is_document(self, value: Any # a term
+                    ) -> bool: # whether the term is long enough to be kept as a document
+        return isinstance(value, str) and len(value) >= self.min_length
+
+    @staticmethod
+    def is_id(value: Any # a value that was read from the engine
+              ) -> bool: # whether the value is the id of a document
+        return isinstance(value, bytes) and value.startswith(DOCUMENT_ID_PREFIX)
+
+    @staticmethod
+    def get_id(data: Union[str, bytes, mmap.mmap] # a document, or its utf-8 encoding
+               ) -> bytes: # the id of the document
+        if isinstance(data, str):
+            data = data.encode('utf-8', 'surrogatepass')
+        return DOCUMENT_ID_PREFIX + hashlib.blake2b(data, digest_size=DOCUMENT_DIGEST_SIZE).digest()
+
+    def _cache_decoded(self, document_id: bytes, text: str) -> None:
+        self._decoded[document_id] = text
+        self._decoded.move_to_end(document_id)
+        self._ids[text] = document_id
+        while len(self._decoded) > self.cache_size:
+            _, evicted_text = self._decoded.popitem(last=False)
+            del self._ids[evicted_text]
+
+    def _get_reference(self, document_id: bytes) -> Document:
+        reference = self._references.get(document_id)
+        document = None if reference is None else reference()
+        if document is None:
+            document = Document(self, document_id)
+            self._references[document_id] = weakref.ref(document, self._release)
+        return document
+
+    def _release(self, reference: weakref.ref) -> None:
+        # called when a `Document` is garbage collected
+        self.released = True
+
+    def add(self, text: str # a document
+            ) -> bytes: # the id of the document
+        """
+        Stores a document (unless it is already stored) and returns its id.
+        """
+        document_id = self._ids.get(text)
+        if document_id is not None:
+            return document_id
+
+        document_id = self.get_id(text)
+        if document_id in self._files:
+            # the text of a memory mapped document, which can be reused until it is evicted
+            self._cache_decoded(document_id, text)
+        elif document_id not in self._texts:
+            self._texts[document_id] = text
+            self._ids[text] = document_id
+        return document_id
+
+    def read_file(self, path: Union[str, Path] # a utf-8 text file
+                  ) -> Union[str, Document]: # the text of the file, or a reference to it if it is a document
+        """
+        Reads a text file, keeping it as a memory mapped document if it is long enough. <br>
+        the file is validated without being decoded into memory, so its text is only decoded once it is used.
+        """
+        path = Path(path)
+        if path.stat().st_size < self.min_length:
+            return path.read_text(encoding='utf-8')
+
+        with open(path, 'rb') as file:
+            mapped_file = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            decoder = codecs.getincrementaldecoder('utf-8')()
+            for chunk_start in range(0, len(mapped_file), FILE_VALIDATION_CHUNK_SIZE):
+                decoder.decode(mapped_file[chunk_start:chunk_start + FILE_VALIDATION_CHUNK_SIZE])
+            decoder.decode(b"", final=True)
+        except UnicodeDecodeError:
+            mapped_file.close()
+            raise
+
+        if mapped_file.find(b'\r') != -1:
+            # reading a text translates its newlines, so the file's bytes are not the document's encoding
+            mapped_file.close()
+            return self._get_reference(self.add(path.read_text(encoding='utf-8')))
+
+        document_id = self.get_id(mapped_file)
+        if document_id in self:
+            mapped_file.close()
+        else:
+            self._files[document_id] = mapped_file
+        return self._get_reference(document_id)
+
+    def get(self, document_id: bytes # the id of a stored document
+            ) -> str: # the text of the document
+        """
+        Returns the text of a document, decoding it if it is memory mapped and was not used recently.
+        """
+        if document_id in self._texts:
+            return self._texts[document_id]
+        if document_id not in self._files:
+            raise KeyError(f"unknown document id: {document_id!r}")
+
+        text = self._decoded.get(document_id)
+        if text is None:
+            text = str(self._files[document_id], 'utf-8')
+        self._cache_decoded(document_id, text)
+        return text
+
+    def collect(self, referenced_ids: Iterable[bytes] # the ids of the documents that are still referenced, e.g. by the engine's tables
+                ) -> int: # the number of documents that were freed
+        """
+        Frees the documents that are neither in `referenced_ids` nor referenced by an alive `Document`.
+        """
+        referenced_ids = set(referenced_ids)
+        for document_id, reference in list(self._references.items()):
+            if reference() is None:
+                del self._references[document_id]
+            else:
+                referenced_ids.add(document_id)
+
+        freed_ids = [document_id for document_id in (*self._texts, *self._files) if document_id not in referenced_ids]
+        for document_id in freed_ids:
+            if document_id in self._texts:
+                del self._ids[self._texts.pop(document_id)]
+            else:
+                self._files.pop(document_id).close()
+                if document_id in self._decoded:
+                    del self._ids[self._decoded.pop(document_id)]
+        self.released = False
+        return len(freed_ids)
+
+    def close(self) -> None:
+        """
+        Unmaps the memory mapped documents.
+        """
+        for mapped_file in self._files.values():
+            mapped_file.close()
+        self._files.clear()
+        for document_id in list(self._decoded):
+            del self._ids[self._decoded.pop(document_id)]
@@ -1,8 +1,8 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/02a_engine.ipynb.
 
 # %% auto 0
-__all__ = ['RESERVED_RELATION_PREFIX', 'FALSE_VALUE', 'TRUE_VALUE', 'logger', 'log_function_call', 'spannerlogEngineBase',
-           'SqliteEngine']
+__all__ = ['RESERVED_RELATION_PREFIX', 'FALSE_VALUE', 'TRUE_VALUE', 'DEFAULT_QUERY_FETCH_SIZE', 'logger',
+           'log_function_call', 'QueryCursor', 'spannerlogEngineBase', 'SqliteEngine']
 
 # %% ../nbs/02a_engine.ipynb 5
 from nbdev.showdoc import show_doc
@@ -12,16 +12,22 @@ from fastcore.basics import patch
 #| output: false
 import logging
 import sqlite3 as sqlite
+import struct
 import tempfile
+import threading
+import weakref
 import pandas as pd
 from abc import abstractmethod
-from itertools import count
+from collections import defaultdict, OrderedDict
+from functools import lru_cache
+from itertools import count, islice
 from jinja2 import Template
 from pathlib import Path
-from typing import Iterable, Optional, Set, Tuple, Any, List, Union, Dict, no_type_check, Sequence, Callable
+from typing import Iterable, Iterator, Optional, Set, Tuple, Any, List, Union, Dict, no_type_check, Sequence, Callable, Hashable
 from .ast_node_types import RelationDeclaration, AddFact, RemoveFact, Query, IERelation, Relation
 from .primitive_types import Span, DataTypes, DataTypeMapping
-from .ie_function import IEFunction
+from .ie_function import IEFunction, IECache
+from .document_store import DOCUMENT_ID_PREFIX, Document, DocumentStore
 from .general_utils import strip_lines, string_to_span, get_free_var_to_relations_dict, get_output_free_var_names, extract_one_relation
 from .utils import patch_method
 
@@ -32,6 +38,9 @@ RESERVED_RELATION_PREFIX = "__spannerlog__"
 FALSE_VALUE: List = []
 TRUE_VALUE: List[Tuple] = [tuple()]
 
+# the number of tuples that are read from the engine at once, when a query result is streamed
+DEFAULT_QUERY_FETCH_SIZE = 1024
+
 logger = logging.getLogger(__name__)
 
 # %% ../nbs/02a_engine.ipynb 8
@@ -51,6 +60,71 @@ def log_function_call(func):
     return wrapper
 
 # %% ../nbs/02a_engine.ipynb 10
+class QueryCursor:
+    """
+    A streamed query result, returned by `spannerlogEngineBase.iter_query`. <br>
+    iterating over it yields the result's tuples. the engine produces them in batches, so the whole result is never
+    held in memory. the cursor is closed when it is exhausted, or by calling `close` (it is also a context manager).
+    closing it releases the resources of the query, e.g. the temporary relations that were created for it.
+    """
+
+    def __init__(self, batches: Iterator[List[Tuple]], # the batches of the result's tuples
+                 on_close: Optional[Callable[[], None]] = None # called once, when the cursor is closed
+                 ) -> None:
+        self._batches = batches
+        self._on_close = on_close
+        self._rows: Iterator[Tuple] = iter(())
+        self.closed = False
+
+    def __iter__(self) -> 'QueryCursor':
+        return self
+
+    def __next__(self) -> Tuple:
+        while not self.closed:
+            row = next(self._rows, None)
+            if row is not None:
+                return row
+
+            batch = next(self._batches, None)
+            if batch is None:
+                self.close()
+            else:
+                self._rows = iter(batch)
+
+        raise StopIteration
+
+    def fetchmany(self, size: int # the maximal number of tuples to fetch
+                  ) -> List[Tuple]: # the next tuples of the result, an empty list if it is exhausted
+        return list(islice(self, size))
+
+    def batches(self, size: int # the number of tuples in each batch
+                ) -> Iterator[List[Tuple]]: # lists of `size` tuples, except for the last one
+        while True:
+            batch = self.fetchmany(size)
+            if not batch:
+                return
+            yield batch
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        self._rows = iter(())
+        if hasattr(self._batches, "close"):
+            self._batches.close()
+        if self._on_close is not None:
+            self._on_close()
+
+    def __enter__(self) -> 'QueryCursor':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def __del__(self) -> None:
+        self.close()
+
+# %% ../nbs/02a_engine.ipynb 12
 class spannerlogEngineBase():
     """
     An abstraction for a spannerlog execution engine, used by `GenericExecution`.
@@ -60,6 +134,32 @@ class spannerlogEngineBase():
 
     def __init__(self) -> None:
         super().__init__()
+        # memoizes the outputs of ie functions in `compute_ie_relation`, nothing is memoized if it is None
+        self.ie_cache: Optional[IECache] = None
+        # keeps the documents (long strings) of engines that store them by their ids, e.g. `SqliteEngine`
+        self.document_store: Optional[DocumentStore] = None
+        # serializes the operators when rule relations are computed by several threads (see `naive_execution`)
+        self.lock = threading.RLock()
+        # a weak reference to the cursor of a streamed query (see `iter_query`), the relations can't be modified while
+        # it is open. it is weak so a cursor that is dropped before it is exhausted is still closed by `__del__`
+        self._open_cursor_reference: Optional[weakref.ref] = None
+
+    @property
+    def open_cursor(self) -> Optional[QueryCursor]:
+        """
+        @return: the cursor of a streamed query that wasn't exhausted or closed yet, or None.
+        """
+        query_cursor = None if self._open_cursor_reference is None else self._open_cursor_reference()
+        return None if query_cursor is None or query_cursor.closed else query_cursor
+
+    def assert_no_open_cursor(self) -> None:
+        """
+        @raise Exception: if the cursor of a streamed query is still open. the engine must not be modified (or
+        queried again) until it is exhausted or closed, since the cursor reads the engine's relations lazily.
+        """
+        if self.open_cursor is not None:
+            raise Exception("a streamed query result is still open, "
+                            "exhaust or close its cursor before running other commands")
 
     @abstractmethod
     def declare_relation_table(self, 
@@ -79,6 +179,18 @@ class spannerlogEngineBase():
         """
         pass
 
+    def add_facts(self, 
+                  relation_name: str, # the relation into which the facts are added
+                  rows: Iterable[Sequence[DataTypeMapping.term]], # the terms of each fact. can be any iterable, e.g. a generator
+                  type_list: Sequence[DataTypes] # the types of the relation's terms
+                  ) -> None:
+        """
+        Adds many facts to the same relation of the spannerlog engine.
+        engines should override this method with a bulk insertion; by default, the facts are added one by one.
+        """
+        for row in rows:
+            self.add_fact(AddFact(relation_name, list(row), list(type_list)))
+
     @abstractmethod
     def remove_fact(self, 
                     fact: RemoveFact # the fact to be removed
@@ -106,6 +218,18 @@ class spannerlogEngineBase():
         """
         pass
 
+    def iter_query(self, 
+                   query: Query, # a query for the spannerlog engine
+                   fetch_size: int = DEFAULT_QUERY_FETCH_SIZE # the number of tuples that are produced at once
+                   ) -> QueryCursor: # a cursor that streams the query's results
+        """
+        Queries the spannerlog engine like `query`, but streams the results through a `QueryCursor`. <br>
+        engines should override this method to read the results lazily; by default, the results of `query` are
+        returned in batches.
+        """
+        query_result = self.query(query)
+        return QueryCursor(iter([query_result[i:i + fetch_size] for i in range(0, len(query_result), fetch_size)]))
+
     @abstractmethod
     def remove_tables(self, 
                 tables_names: Iterable[str] # tables to remove
@@ -133,12 +257,93 @@ class spannerlogEngineBase():
         for table in tables_names:
             self.clear_relation(table)
 
+    def collect_documents(self, 
+                          force: bool = False # whether to collect even if no documents were released since the last collection
+                          ) -> int: # the number of documents that were freed
+        """
+        Frees the documents of `self.document_store` that are no longer referenced. <br>
+        engines that store documents by their ids should override this method; by default, nothing is freed.
+        """
+        return 0
+
     @abstractmethod
     def get_table_len(self, 
                 table: str # name of a table
                     ) -> int: # number of tuples inside the table
         pass
 
+    @abstractmethod
+    def is_table_exists(self, 
+                        table_name: str # the table which is checked for existence
+                        ) -> bool: # True if it exists, else False
+        pass
+
+    @abstractmethod
+    def remove_table(self, 
+                     table_name: str # the table to remove
+                     ) -> None:
+        """
+        Removes a table from the spannerlog engine, if it exists.
+        """
+        pass
+
+    @abstractmethod
+    def _create_unique_relation(self, 
+                                arity: int, # the relation's arity
+                                prefix: str = "" # will be used as a part of the relation's name
+                                ) -> str: # the new relation's name
+        """
+        Declares a new relation with the requested arity, the relation will have a unique name.
+        """
+        pass
+
+    @staticmethod
+    def _assert_ie_output_properly_typed(
+                    ie_input: Iterable, # the input of the ie function (used in the exception when the type check fails)
+                    ie_output: Iterable, # an output of the ie function
+                    ie_output_schema: Iterable, # the expected schema for ie_output
+                    ie_relation: IERelation # the ie relation for which the output was computed (will be used to print an exception in case the output is not properly typed)
+                    ) -> None:
+        """
+        Even though spannerlog performs typechecking during the semantic checks phase, information extraction functions
+        are written by the users and could yield results that are not properly typed.
+        this method asserts an information extraction function's output is properly typed.
+
+        @raise TypeError: if there is output term of an unsupported type or the output relation is not properly typed.
+        """
+
+        # get a list of the ie output's term types
+        ie_output_term_types = []
+        for output_term in ie_output:
+            if isinstance(output_term, int):
+                output_type = DataTypes.integer
+            elif isinstance(output_term, str):
+                output_type = DataTypes.string
+            elif isinstance(output_term, Span):
+                # allow the user to return a span as either a tuple of length 2 or a datatypes.Span instance
+                output_type = DataTypes.span
+            else:
+                # encountered an output term of an unsupported type
+                raise TypeError(f'executing ie relation {ie_relation}\n'
+                                f'with the input {ie_input}\n'
+                                f'failed because one of the outputs had an unsupported term type\n'
+                                f'the output: {ie_output}\n'
+                                f'the invalid term: {output_term}\n'
+                                f'the invalid term type: {type(output_term)}\n'
+                                f'note that only strings, spans and integers are supported\n'
+                                f'spans can be represented as a tuple of length 2 or as a datatypes.span instance')
+            ie_output_term_types.append(output_type)
+
+        # assert that the ie output is properly typed
+        ie_output_is_properly_typed = ie_output_term_types == list(ie_output_schema)
+        if not ie_output_is_properly_typed and len(ie_output_term_types) - len(ie_relation.input_term_list) != 0:
+            raise TypeError(f'executing ie relation {ie_relation}\n'
+                            f'with the input {ie_input}\n'
+                            f'failed because one of the outputs had unexpected term types\n'
+                            f'the output: {ie_output}\n'
+                            f'the output term types: {ie_output_term_types}\n'
+                            f'the expected types: {ie_output_schema}')
+
     @abstractmethod
     def compute_ie_relation(self, 
                 ie_relation: IERelation, # an ie relation that determines the input and output terms of the ie function
@@ -287,13 +492,84 @@ class spannerlogEngineBase():
         Copies computed_relation to rule_relation.
         """
         pass
+    @abstractmethod
+    def operator_difference(self,
+                            relations: List[Relation], # a list of relations. the first one is the relation we subtract from
+                            *args: Any
+                            ) -> Relation: # a new relation that contains the tuples of the first relation that aren't in the other relations
+        """
+        The `operator_difference` function returns the tuples of the first relation that don't appear in any of the other relations. <br>
+        It is used by the semi-naive execution to find the tuples that were derived for the first time in an iteration of the fixed point. <br>
+        @note: like in `operator_union`, we assume that all the relations have the same arity and the same column order.
+        """
+        pass
 
-# %% ../nbs/02a_engine.ipynb 29
+    @abstractmethod
+    def insert_relation(self,
+                        src_rel: Relation, # the relation whose tuples are inserted
+                        dest_rel: Relation # the relation into which the tuples are inserted
+                        ) -> None:
+        """
+        Inserts all the tuples of `src_rel` into `dest_rel`. unlike `operator_copy`, the tuples that are already in `dest_rel` are kept.
+        """
+        pass
+
+    @abstractmethod
+    def operator_intersection(self,
+                              relations: List[Relation], # a list of relations to intersect
+                              *args: Any
+                              ) -> Relation: # a new relation that contains the tuples that appear in all the relations
+        """
+        The `operator_intersection` function returns the tuples that appear in all of the relations. <br>
+        It is used by the incremental maintenance of rule relations to find the removed tuples that can be derived again. <br>
+        @note: like in `operator_union`, we assume that all the relations have the same arity and the same column order.
+        """
+        pass
+
+    @abstractmethod
+    def delete_relation(self,
+                        src_rel: Relation, # the relation whose tuples are deleted
+                        dest_rel: Relation # the relation from which the tuples are deleted
+                        ) -> None:
+        """
+        Deletes all the tuples of `src_rel` from `dest_rel` (the opposite of `insert_relation`).
+        """
+        pass
+
+# %% ../nbs/02a_engine.ipynb 37
 class SqliteEngine(spannerlogEngineBase):
     """
     in this implementation of the engine, we use python's sqlite3, which allows creating an SQL database easily, without using servers.
     the engine is called from `GenericExecution`, and uses `run_sql` as an interface to the database, which queries/modifies a table.
     each `operator` method implements a relational algebra operator by constructing an SQL command and executing it.
+
+    the select, join, project and union operators don't write their output into a table. instead, they return a
+    deferred relation, which is kept as a SELECT statement and is used as a subquery by the operators that read it.
+    this way, all the operators of a rule body (up to the inputs of the ie functions) are fused into a single nested
+    SQL statement, which is planned by sqlite as a whole, and is executed only when its output is written into a table
+    (by `operator_copy`, `operator_difference`, `operator_intersection` or `insert_relation`) or read (by `query`).
+
+    the tables are created without keys or indexes. instead, the select and join operators count how many times each
+    group of columns of a table is used as a selection constraint or as a join key, and create an index over the
+    columns according to the index policy (see `_use_columns`). sqlite keeps the indexes up to date when the
+    tables change, so every following statement that reads these columns can use them.
+
+    the constants of the statements (e.g. the terms of a fact, or the values of a select) are not rendered into them.
+    they are bound to the statements as parameters, and a deferred relation keeps the parameters of its SELECT statement.
+    this way, the text of a statement only depends on its shape (the operator, the relations it reads and the positions
+    of the constraints), so it is rendered once per shape (see `_render_sql_template`) and sqlite's statement cache
+    can reuse its compiled version, e.g. in every iteration of a fixed point.
+
+    spans are stored as BLOBs that pack their start and end as big-endian unsigned 64-bit integers (see `SPAN_STRUCT`).
+    sqlite compares BLOBs byte by byte, so spans are compared and indexed by (start, end) like `Span` objects, and since
+    no other term is stored as a BLOB, the spans of a query result are found by their storage class instead of
+    matching every string against a span pattern.
+
+    strings that are long enough to be documents (e.g. the texts that are read by `read()`, which are repeated in every
+    output row of the ie functions that read them) are not copied into the tables. each document is kept once in a
+    `DocumentStore`, and the tables store its id (a BLOB that starts with `DOCUMENT_ID_PREFIX`, unlike a packed span).
+    ids are equal exactly when their documents are, so they are compared and joined instead of the documents,
+    and the ids in a query result are resolved into the document's text, which is a single string shared by all the rows.
     """
 
     # useful prefixes
@@ -302,29 +578,69 @@ class SqliteEngine(spannerlogEngineBase):
     COPY_PREFIX = "copy"
     SELECT_PREFIX = "select"
     UNION_PREFIX = "union"
+    DIFFERENCE_PREFIX = "difference"
+    INTERSECTION_PREFIX = "intersection"
     RELATION_COLUMN_PREFIX = "col"
+    INDEX_PREFIX = "index"
+
+    # index policies
+    INDEX_POLICY_NEVER = "never" # never create indexes (sqlite may still create temporary indexes for a single statement)
+    INDEX_POLICY_EAGER = "eager" # create an index the first time the columns are used
+    INDEX_POLICY_ADAPTIVE = "adaptive" # create an index once the columns were used `index_threshold` times
+    INDEX_POLICIES = (INDEX_POLICY_NEVER, INDEX_POLICY_EAGER, INDEX_POLICY_ADAPTIVE)
 
     # sql constants
     SQL_SELECT = "SELECT DISTINCT"
+    # deferred relations don't remove duplicates, so sqlite can flatten them into the statements that read them
+    SQL_DEFERRED_SELECT = "SELECT"
     SQL_TABLE_OF_TABLES = "sqlite_master"
     SQL_SEPARATOR = "_"
-    DATATYPE_TO_SQL_TYPE = {DataTypes.string: "TEXT", DataTypes.integer: "INTEGER", DataTypes.span: "TEXT"}
+    DATATYPE_TO_SQL_TYPE = {DataTypes.string: "TEXT", DataTypes.integer: "INTEGER", DataTypes.span: "BLOB"}
+    SPAN_STRUCT = struct.Struct(">QQ")
     DATABASE_SUFFIX = "_sqlite"
+    SQL_PARAMETER = "?"
+    # the number of rendered statements that are kept, and the number of compiled statements that sqlite keeps
+    STATEMENT_CACHE_SIZE = 512
         
     # ~~ dunder methods ~~
     def __init__(self, 
-                database_name: Optional[str] = None # open an existing database instead of a new one
+                database_name: Optional[str] = None, # open an existing database instead of a new one
+                index_policy: str = INDEX_POLICY_ADAPTIVE, # when to create indexes, one of `INDEX_POLICIES`
+                index_threshold: int = 2, # the number of uses after which an index is created by the adaptive policy
+                document_store: Optional[DocumentStore] = None # keeps the documents that are stored by their ids, defaults to a new `DocumentStore`
                 ):
         """
         Creates/opens an SQL database file + connection.
         """
         super().__init__()
+        if index_policy not in SqliteEngine.INDEX_POLICIES:
+            raise ValueError(f"unknown index policy: {index_policy}, expected one of {SqliteEngine.INDEX_POLICIES}")
+
         self.unique_relation_id_counter = count()
 
+        # maps the name of each deferred relation to its SELECT statement, the names of the tables it reads,
+        # and the parameters that are bound to the statement
+        self.deferred_relations: Dict[str, Tuple[str, Set[str], List]] = {}
+
+        # maps the shape of each rendered statement to its text (see `_render_sql_template`)
+        self.statement_cache: OrderedDict[Hashable, str] = OrderedDict()
+
+        # maps deferred relations that only filter the tuples of a table (e.g. a select) to the name of that table
+        self.filtered_tables: Dict[str, str] = {}
+
+        self.index_policy = index_policy
+        self.index_threshold = index_threshold
+        self.document_store = DocumentStore() if document_store is None else document_store
+        # counts the uses of each group of columns of each table, and keeps the groups that are indexed
+        self.column_uses: Dict[Tuple[str, Tuple[int, ...]], int] = defaultdict(int)
+        self.indexed_columns: Dict[str, Set[Tuple[int, ...]]] = defaultdict(set)
+
         self.df_filename = SqliteEngine._get_db_filename(database_name)
         logger.info(f"using database file: {self.df_filename}")
 
-        self.sql_conn = sqlite.connect(self.df_filename)
+        # the connection is used by the threads that compute rule relations concurrently, one at a time (see `self.lock`)
+        self.sql_conn = sqlite.connect(self.df_filename, cached_statements=SqliteEngine.STATEMENT_CACHE_SIZE,
+                                       check_same_thread=False)
         self.sql_cursor = self.sql_conn.cursor()
 
     def __del__(self) -> None:
@@ -339,74 +655,32 @@ class SqliteEngine(spannerlogEngineBase):
         return [i for i, term_type in enumerate(type_list) if (term_type is DataTypes.free_var_name)]
 
     @staticmethod
-    def _assert_ie_output_properly_typed(
-                    ie_input: Iterable, # the input of the ie function (used in the exception when the type check fails)
-                    ie_output: Iterable, # an output of the ie function
-                    ie_output_schema: Iterable, # the expected schema for ie_output
-                    ie_relation: IERelation # the ie relation for which the output was computed (will be used to print an exception in case the output is not properly typed)
-                    ) -> None:
-        """
-        Even though spannerlog performs typechecking during the semantic checks phase, information extraction functions
-        are written by the users and could yield results that are not properly typed.
-        this method asserts an information extraction function's output is properly typed.
-
-        @raise TypeError: if there is output term of an unsupported type or the output relation is not properly typed.
-        """
-
-        # get a list of the ie output's term types
-        ie_output_term_types = []
-        for output_term in ie_output:
-            if isinstance(output_term, int):
-                output_type = DataTypes.integer
-            elif isinstance(output_term, str):
-                output_type = DataTypes.string
-            elif isinstance(output_term, Span):
-                # allow the user to return a span as either a tuple of length 2 or a datatypes.Span instance
-                output_type = DataTypes.span
-            else:
-                # encountered an output term of an unsupported type
-                raise TypeError(f'executing ie relation {ie_relation}\n'
-                                f'with the input {ie_input}\n'
-                                f'failed because one of the outputs had an unsupported term type\n'
-                                f'the output: {ie_output}\n'
-                                f'the invalid term: {output_term}\n'
-                                f'the invalid term type: {type(output_term)}\n'
-                                f'note that only strings, spans and integers are supported\n'
-                                f'spans can be represented as a tuple of length 2 or as a datatypes.span instance')
-            ie_output_term_types.append(output_type)
-
-        # assert that the ie output is properly typed
-        ie_output_is_properly_typed = ie_output_term_types == list(ie_output_schema)
-        if not ie_output_is_properly_typed and len(ie_output_term_types) - len(ie_relation.input_term_list) != 0:
-            raise TypeError(f'executing ie relation {ie_relation}\n'
-                            f'with the input {ie_input}\n'
-                            f'failed because one of the outputs had unexpected term types\n'
-                            f'the output: {ie_output}\n'
-                            f'the output term types: {ie_output_term_types}\n'
-                            f'the expected types: {ie_output_schema}')
+    def _pack_span(span: Span) -> bytes:
+        return SqliteEngine.SPAN_STRUCT.pack(span.span_start, span.span_end)
 
     @staticmethod
-    def _convert_strings_to_spans_in_query_result(query_result: List[Tuple]) -> List[Tuple]:
-        """
-        convert strings that look like spans into spans
-        @param query_result: the list of tuples which may contain strings that should be converted to spans
-        @return: the same list, but with span-looking strings converted to `Span` objects
-        """
-        spanned_query_result = []
-        for row in query_result:
-            converted_row: List[Union[str, int, Span]] = []
-            for value in row:
-                if isinstance(value, str):
-                    transformed_string = string_to_span(value)
-                    if transformed_string is None:
-                        converted_row.append(value)
-                    else:
-                        converted_row.append(transformed_string)
-                else:
-                    converted_row.append(value)
+    def _convert_blobs_to_spans_in_query_result(query_result: List[Tuple]) -> List[Tuple]:
+        """
+        convert the packed spans (BLOBs) of a query result into spans
+        @param query_result: the list of tuples which may contain packed spans
+        @return: the same list, but with packed spans converted to `Span` objects
+        """
+        unpack_span = SqliteEngine.SPAN_STRUCT.unpack
+        span_size = SqliteEngine.SPAN_STRUCT.size
+        return [tuple(Span(*unpack_span(value)) if isinstance(value, bytes) and len(value) == span_size else value
+                      for value in row)
+                for row in query_result]
 
-            spanned_query_result.append(tuple(converted_row))
-        return spanned_query_result
+    def _convert_document_ids_in_query_result(self, query_result: List[Tuple]) -> List[Tuple]:
+        """
+        convert the ids of documents (BLOBs) in a query result into the documents' text
+        @param query_result: the list of tuples which may contain document ids
+        @return: the same list, but with document ids converted to strings
+        """
+        if len(self.document_store) == 0:
+            return query_result
+        get_document, is_id = self.document_store.get, DocumentStore.is_id
+        return [tuple(get_document(value) if is_id(value) else value for value in row) for row in query_result]
 
     @staticmethod
     def _get_db_filename(database_name: Optional[Any]) -> str:
@@ -422,10 +696,16 @@ class SqliteEngine(spannerlogEngineBase):
 
  
 
-# %% ../nbs/02a_engine.ipynb 30
+# %% ../nbs/02a_engine.ipynb 38
 # Helper method for testing
 @patch_method
 def table_to_dataframe(self : SqliteEngine ,name) -> pd.DataFrame:
+    if name in self.deferred_relations:
+        self.sql_cursor.execute(f"{SqliteEngine.SQL_SELECT} * FROM {self._get_relation_source(name)}", self._get_relation_parameters(name))
+        rows = self.sql_cursor.fetchall()
+        column_names = [description[0] for description in self.sql_cursor.description]
+        return pd.DataFrame(rows, columns=column_names)
+
     self.sql_cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
     table_names = self.sql_cursor.fetchall()
     # Iterate over the table names and print the data from each table
@@ -445,7 +725,7 @@ def table_to_dataframe(self : SqliteEngine ,name) -> pd.DataFrame:
             
             return df
 
-# %% ../nbs/02a_engine.ipynb 31
+# %% ../nbs/02a_engine.ipynb 39
 @patch_method
 def print_sql(self: SqliteEngine):
     self.sql_cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
@@ -467,22 +747,56 @@ def print_sql(self: SqliteEngine):
             print(row)
         print()
 
-# %% ../nbs/02a_engine.ipynb 32
+# %% ../nbs/02a_engine.ipynb 40
+@lru_cache(maxsize=None)
+def _compile_sql_template(sql_template: str) -> Template:
+    return Template(strip_lines(sql_template))
+
+def _to_hashable(value: Any) -> Hashable:
+    if isinstance(value, dict):
+        return tuple((key, _to_hashable(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(_to_hashable(item) for item in value)
+    return value
+
 @patch_method
-def _run_sql_from_jinja_template(self: SqliteEngine, sql_template: str, template_dict: Optional[dict] = None) -> None:
+def _render_sql_template(self: SqliteEngine, sql_template: str, template_dict: Optional[dict] = None) -> str:
+    """
+    Renders a jinja template into an SQL statement.
+    the constants are bound as parameters, so the template and the values it's rendered with describe the shape of the
+    statement. the last `STATEMENT_CACHE_SIZE` statements are cached by their shape, and each template is compiled once.
+    """
     if not template_dict:
         template_dict = {}
 
-    sql_command = Template(strip_lines(sql_template)).render(**template_dict)
-    self._run_sql(sql_command)
+    shape = (sql_template, _to_hashable(template_dict))
+    sql_command = self.statement_cache.get(shape)
+    if sql_command is None:
+        sql_command = _compile_sql_template(sql_template).render(**template_dict)
+        self.statement_cache[shape] = sql_command
+        if len(self.statement_cache) > SqliteEngine.STATEMENT_CACHE_SIZE:
+            self.statement_cache.popitem(last=False)
+    else:
+        self.statement_cache.move_to_end(shape)
+    return sql_command
 
-# %% ../nbs/02a_engine.ipynb 33
+@patch_method
+def _run_sql_from_jinja_template(self: SqliteEngine, sql_template: str, template_dict: Optional[dict] = None,
+                                 command_args: Optional[List] = None) -> None:
+    sql_command = self._render_sql_template(sql_template, template_dict)
+    self._run_sql(sql_command, command_args)
+
+# %% ../nbs/02a_engine.ipynb 41
 @patch_method
 def _run_sql(self: SqliteEngine, command: str, command_args: Optional[List] = None, do_commit: bool = False) -> List:
     logger.debug(f"sql {command=}")
     if command_args:
         logger.debug(f"...with args: {command_args}")
 
+    # sqlite can't drop a table while a cursor reads it, and the cursor would see the rows that are inserted
+    if command.split(None, 1)[0].upper() not in ("SELECT", "PRAGMA"):
+        self.assert_no_open_cursor()
+
     if command_args:
         self.sql_cursor.execute(command, command_args)
     else:
@@ -494,19 +808,26 @@ def _run_sql(self: SqliteEngine, command: str, command_args: Optional[List] = No
 
     return self.sql_cursor.fetchall()
 
-# %% ../nbs/02a_engine.ipynb 34
+# %% ../nbs/02a_engine.ipynb 42
 @patch_method
 def _get_col_name(self: SqliteEngine, col_id: int) -> str:
     return f'{SqliteEngine.RELATION_COLUMN_PREFIX}{col_id}'
 
-# %% ../nbs/02a_engine.ipynb 35
+# %% ../nbs/02a_engine.ipynb 43
 @patch_method
 def get_table_len(self: SqliteEngine, table_name: str) -> int:
+    if table_name in self.deferred_relations:
+        # a deferred relation may contain duplicates
+        sql_parameters = self._get_relation_parameters(table_name)
+        table_name = f"({SqliteEngine.SQL_SELECT} * FROM {self._get_relation_source(table_name)})"
+    else:
+        sql_parameters = []
+
     sql_command = f"SELECT COUNT(*) FROM {table_name}"
-    table_len, = self._run_sql(sql_command)[0]
+    table_len, = self._run_sql(sql_command, sql_parameters)[0]
     return table_len
 
-# %% ../nbs/02a_engine.ipynb 36
+# %% ../nbs/02a_engine.ipynb 44
 @patch_method
 def declare_relation_table(self: SqliteEngine, 
                 relation_decl: RelationDeclaration # the declaration info
@@ -528,7 +849,16 @@ def declare_relation_table(self: SqliteEngine,
 
     self._run_sql_from_jinja_template(sql_template, template_dict)
 
-# %% ../nbs/02a_engine.ipynb 37
+# %% ../nbs/02a_engine.ipynb 45
+@patch_method
+def _get_unique_relation_name(self: SqliteEngine, prefix: str = "") -> str:
+    unique_relation_id = next(self.unique_relation_id_counter)
+    if RESERVED_RELATION_PREFIX in prefix:
+        # we don't want relations to be called __spannerlog__spannerlog__spannerlog...
+        return f'{prefix}{unique_relation_id}'
+    else:
+        return f'{RESERVED_RELATION_PREFIX}{prefix}{unique_relation_id}'
+
 @patch_method
 def _create_unique_relation(self: SqliteEngine, 
                             arity: int, # the relation's arity
@@ -539,12 +869,7 @@ def _create_unique_relation(self: SqliteEngine,
     Declares a new relation with the requested arity in SQL, the relation will have a unique name.
     """
     # create the name of the new relation
-    unique_relation_id = next(self.unique_relation_id_counter)
-    if RESERVED_RELATION_PREFIX in prefix:
-        # we don't want relations to be called __spannerlog__spannerlog__spannerlog...
-        unique_relation_name = f'{prefix}{unique_relation_id}'
-    else:
-        unique_relation_name = f'{RESERVED_RELATION_PREFIX}{prefix}{unique_relation_id}'
+    unique_relation_name = self._get_unique_relation_name(prefix)
 
     # in SQLite there's no typechecking so we just need to make sure that the schema has the correct arity
     unique_relation_schema = [DataTypes.free_var_name] * arity
@@ -556,7 +881,88 @@ def _create_unique_relation(self: SqliteEngine,
     self.declare_relation_table(unique_relation_decl)
     return unique_relation_name
 
-# %% ../nbs/02a_engine.ipynb 38
+# %% ../nbs/02a_engine.ipynb 46
+@patch_method
+def _create_deferred_relation(self: SqliteEngine,
+                              sql_select: str, # the SELECT statement that computes the relation. its columns are named col0, col1, ...
+                              src_relations: Iterable[Relation], # the relations that are read by the statement
+                              prefix: str = "", # will be used as a part of the relation's name
+                              sql_parameters: Sequence = () # the parameters of the statement, in the order of their placeholders
+                              ) -> str: # the new relation's name
+    """
+    Creates a relation with a unique name, without creating a table for it. instead, the SELECT statement is kept, and
+    is used as a subquery by the operators that read the relation (see `_get_relation_source`), together with its
+    parameters (see `_get_relation_parameters`).
+    """
+    deferred_relation_name = self._get_unique_relation_name(prefix)
+    source_tables = set().union(*(self._get_source_tables(relation.relation_name) for relation in src_relations))
+    self.deferred_relations[deferred_relation_name] = (sql_select, source_tables, list(sql_parameters))
+    return deferred_relation_name
+
+@patch_method
+def _get_relation_source(self: SqliteEngine, relation_name: str) -> str:
+    """
+    @return: an SQL expression that can be used after `FROM` to read the relation -
+    the table itself, or a subquery if the relation is deferred.
+    """
+    if relation_name in self.deferred_relations:
+        sql_select, _, _ = self.deferred_relations[relation_name]
+        return f"({sql_select})"
+    return relation_name
+
+@patch_method
+def _get_relation_parameters(self: SqliteEngine, relation_name: str) -> List:
+    """
+    @return: the parameters that are bound to the source of the relation (see `_get_relation_source`).
+    """
+    if relation_name in self.deferred_relations:
+        _, _, sql_parameters = self.deferred_relations[relation_name]
+        return sql_parameters
+    return []
+
+@patch_method
+def _get_source_tables(self: SqliteEngine, relation_name: str) -> Set[str]:
+    """
+    @return: the names of the tables that are read in order to compute the relation.
+    """
+    if relation_name in self.deferred_relations:
+        _, source_tables, _ = self.deferred_relations[relation_name]
+        return source_tables
+    return {relation_name}
+
+# %% ../nbs/02a_engine.ipynb 47
+@patch_method
+def _create_index(self: SqliteEngine, 
+                  table_name: str, # the indexed table
+                  col_ids: Tuple[int, ...] # the indexed columns
+                  ) -> None:
+    index_name = f"{RESERVED_RELATION_PREFIX}{SqliteEngine.INDEX_PREFIX}{SqliteEngine.SQL_SEPARATOR}{table_name}{SqliteEngine.SQL_SEPARATOR}" + \
+                 SqliteEngine.SQL_SEPARATOR.join(str(col_id) for col_id in col_ids)
+    col_names = ", ".join(self._get_col_name(col_id) for col_id in col_ids)
+    self._run_sql(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} ({col_names})")
+    self.indexed_columns[table_name].add(col_ids)
+
+@patch_method
+def _use_columns(self: SqliteEngine, 
+                 relation_name: str, # a relation that is read by a select or a join
+                 col_ids: Iterable[int] # the columns of the relation that are compared to constants or to other columns
+                 ) -> None:
+    """
+    Records a use of the columns as a selection constraint or as a join key, and creates an index over them
+    according to the index policy.
+    only the columns of tables (or of deferred relations that filter a table) can be indexed.
+    """
+    table_name = self.filtered_tables.get(relation_name, relation_name)
+    col_ids = tuple(sorted(set(col_ids)))
+    if (self.index_policy == SqliteEngine.INDEX_POLICY_NEVER or not col_ids or table_name in self.deferred_relations
+            or col_ids in self.indexed_columns[table_name]):
+        return
+
+    self.column_uses[(table_name, col_ids)] += 1
+    if self.index_policy == SqliteEngine.INDEX_POLICY_EAGER or self.column_uses[(table_name, col_ids)] >= self.index_threshold:
+        self._create_index(table_name, col_ids)
+
+# %% ../nbs/02a_engine.ipynb 48
 @patch_method
 def _convert_relation_term_to_string_or_int(self: SqliteEngine, datatype: DataTypes, term: DataTypeMapping.term) -> Union[str, int]:
     if datatype is DataTypes.integer:
@@ -566,13 +972,33 @@ def _convert_relation_term_to_string_or_int(self: SqliteEngine, datatype: DataTy
         unquoted_term = str(term).strip('"')
         return f'"{unquoted_term}"'
 
-# %% ../nbs/02a_engine.ipynb 39
+@patch_method
+def _convert_relation_term_to_sql_parameter(self: SqliteEngine, datatype: DataTypes, term: DataTypeMapping.term) -> Union[str, int, bytes]:
+    """
+    @return: the value that is stored for the term, which is bound to a statement as a parameter instead of being
+    rendered into it. strings are unquoted like in `_convert_relation_term_to_string_or_int`, spans are packed,
+    and documents are replaced by their ids (a `Document` of this engine's store is not resolved at all).
+    """
+    if datatype is DataTypes.integer:
+        assert isinstance(term, int), "an integer must be of int type"
+        return term
+    elif datatype is DataTypes.span:
+        span = term if isinstance(term, Span) else string_to_span(str(term).strip('"'))
+        assert span is not None, "a span must be a Span or the string representation of a span"
+        return self._pack_span(span)
+    elif isinstance(term, Document) and term.store is self.document_store:
+        return term.document_id
+    else:
+        string = str(term).strip('"')
+        return self.document_store.add(string) if self.document_store.is_document(string) else string
+
+# %% ../nbs/02a_engine.ipynb 49
 @patch_method
 def clear_relation(self: SqliteEngine, table_name: str) -> None:
     sql_command = f"DELETE FROM {table_name}"
     self._run_sql(sql_command)
 
-# %% ../nbs/02a_engine.ipynb 40
+# %% ../nbs/02a_engine.ipynb 50
 @patch_method
 def is_table_exists(self: SqliteEngine, 
                     table_name: str # the table which is checked for existence.
@@ -583,7 +1009,7 @@ def is_table_exists(self: SqliteEngine,
     sql_check_if_exists = f"{SqliteEngine.SQL_SELECT} name FROM {SqliteEngine.SQL_TABLE_OF_TABLES} WHERE " f"type='table' AND name='{table_name}'"
     return bool(self._run_sql(sql_check_if_exists))
 
-# %% ../nbs/02a_engine.ipynb 42
+# %% ../nbs/02a_engine.ipynb 52
 @patch_method
 def remove_table(self: SqliteEngine, 
                 table_name: str # the table to remove
@@ -591,11 +1017,21 @@ def remove_table(self: SqliteEngine,
     """
     Removes a table from the sql database, if it exists.
     """
+    if table_name in self.deferred_relations:
+        del self.deferred_relations[table_name]
+        self.filtered_tables.pop(table_name, None)
+        return
+
     if self.is_table_exists(table_name):
+        # the indexes of the table are dropped with it
         sql_command = f"DROP TABLE {table_name}"
         self._run_sql(sql_command)
+        self.indexed_columns.pop(table_name, None)
+        if not table_name.startswith(RESERVED_RELATION_PREFIX):
+            # the documents of the table may not be referenced anymore (see `collect_documents`)
+            self.document_store.released = True
 
-# %% ../nbs/02a_engine.ipynb 44
+# %% ../nbs/02a_engine.ipynb 54
 @patch_method
 def remove_tables(self: SqliteEngine, 
             table_names: Iterable[str] # tables to remove
@@ -606,7 +1042,36 @@ def remove_tables(self: SqliteEngine,
     for table_name in table_names:
         self.remove_table(table_name)
 
-# %% ../nbs/02a_engine.ipynb 46
+# %% ../nbs/02a_engine.ipynb 56
+@patch_method
+def collect_documents(self: SqliteEngine, 
+                      force: bool = False # whether to collect even if no documents were released since the last collection
+                      ) -> int: # the number of documents that were freed
+    """
+    Frees the documents of the document store that are no longer referenced by any table, deferred relation or
+    `Document`. <br>
+    unless `force` is given, the tables are only scanned if documents may have been released since the last collection,
+    i.e. if facts were removed, relation tables were dropped (the temporary tables of the operators don't count, since
+    their documents are copied from other tables) or a `Document` was garbage collected.
+    """
+    if not (force or self.document_store.released) or len(self.document_store) == 0:
+        self.document_store.released = False
+        return 0
+
+    with self.lock:
+        referenced_ids = set()
+        for sql_parameters in (parameters for _, _, parameters in self.deferred_relations.values()):
+            referenced_ids.update(value for value in sql_parameters if DocumentStore.is_id(value))
+        table_names = [name for name, in self._run_sql(f"{SqliteEngine.SQL_SELECT} name FROM {SqliteEngine.SQL_TABLE_OF_TABLES} "
+                                                       f"WHERE type='table'")]
+        for table_name in table_names:
+            for _, col_name, *_ in self._run_sql(f"PRAGMA table_info({table_name})"):
+                referenced_ids.update(value for value, in self._run_sql(
+                    f"SELECT DISTINCT {col_name} FROM {table_name} WHERE typeof({col_name}) = 'blob' "
+                    f"AND substr({col_name}, 1, {len(DOCUMENT_ID_PREFIX)}) = ?", [DOCUMENT_ID_PREFIX]))
+        return self.document_store.collect(referenced_ids)
+
+# %% ../nbs/02a_engine.ipynb 58
 @patch_method
 def add_fact(self: SqliteEngine, 
             fact: AddFact # the fact to be added
@@ -614,21 +1079,55 @@ def add_fact(self: SqliteEngine,
     """
     Add a row into an existing sql table, based on `fact`'s terms and types
     """
-    num_types = len(fact.type_list)
-    col_names = [f"{self._get_col_name(i)}" for i in range(num_types)]
-    col_values = [self._convert_relation_term_to_string_or_int(datatype, term) for datatype, term in
-                    zip(fact.type_list, fact.term_list)]
+    sql_command = self._get_insert_statement(fact.relation_name, len(fact.type_list))
+    sql_parameters = [self._convert_relation_term_to_sql_parameter(datatype, term) for datatype, term in
+                      zip(fact.type_list, fact.term_list)]
+    self._run_sql(sql_command, sql_parameters)
 
-    template_dict = {"col_values": col_values, "fact": fact, "col_names": col_names}
+@patch_method
+def _get_insert_statement(self: SqliteEngine, relation_name: str, arity: int) -> str:
+    """
+    @return: an INSERT statement of a single row into the relation, whose values are bound as parameters.
+    """
+    col_names = [f"{self._get_col_name(i)}" for i in range(arity)]
+    template_dict = {"rel_name": relation_name, "col_names": col_names, "placeholders": [SqliteEngine.SQL_PARAMETER] * arity}
 
     sql_template = ("""
-    INSERT INTO {{fact.relation_name}} ({{col_names | join(", ")}})
-    VALUES ({{col_values | join(", ")}})
+    INSERT INTO {{rel_name}} ({{col_names | join(", ")}})
+    VALUES ({{placeholders | join(", ")}})
     """)
 
-    self._run_sql_from_jinja_template(sql_template, template_dict)
+    return self._render_sql_template(sql_template, template_dict)
 
-# %% ../nbs/02a_engine.ipynb 50
+# %% ../nbs/02a_engine.ipynb 59
+@patch_method
+def add_facts(self: SqliteEngine, 
+              relation_name: str, # the relation into which the facts are added
+              rows: Iterable[Sequence[DataTypeMapping.term]], # the terms of each fact. can be any iterable, e.g. a generator
+              type_list: Sequence[DataTypes] # the types of the relation's terms
+              ) -> None:
+    """
+    Adds many rows into an existing sql table, using a single `executemany` inside a single transaction.
+    the terms are bound to the INSERT statement as parameters, and the rows are consumed lazily.
+    if a row can't be added (e.g. the iterable raises an exception), none of the rows are added.
+    """
+    self.assert_no_open_cursor()
+    sql_command = self._get_insert_statement(relation_name, len(type_list))
+    logger.debug(f"sql {sql_command=}")
+
+    sql_parameters = ([self._convert_relation_term_to_sql_parameter(datatype, term) for datatype, term in zip(type_list, row)]
+                      for row in rows)
+
+    # commit the statements that were executed before, so a rollback only discards the added rows
+    self.sql_conn.commit()
+    try:
+        self.sql_cursor.executemany(sql_command, sql_parameters)
+    except Exception:
+        self.sql_conn.rollback()
+        raise
+    self.sql_conn.commit()
+
+# %% ../nbs/02a_engine.ipynb 65
 @patch_method
 def remove_fact(self: SqliteEngine, 
                 fact: RemoveFact # the fact to be removed
@@ -638,14 +1137,14 @@ def remove_fact(self: SqliteEngine,
     """
     num_types = len(fact.type_list)
     col_names = [f"{self._get_col_name(i)}" for i in range(num_types)]
-    col_values = [self._convert_relation_term_to_string_or_int(datatype, term) for datatype, term in
-                    zip(fact.type_list, fact.term_list)]
-    constraint_pairs = zip(col_names, col_values)
+    sql_parameters = [self._convert_relation_term_to_sql_parameter(datatype, term) for datatype, term in
+                      zip(fact.type_list, fact.term_list)]
+    constraint_pairs = [(col_name, SqliteEngine.SQL_PARAMETER) for col_name in col_names]
 
-    template_dict = {"fact": fact, "constraint_pairs": constraint_pairs}
+    template_dict = {"rel_name": fact.relation_name, "constraint_pairs": constraint_pairs}
 
     sql_template = ("""
-    DELETE FROM {{fact.relation_name}} WHERE
+    DELETE FROM {{rel_name}} WHERE
     {% for left, right in constraint_pairs %}
         {{left}}={{right}}
         {% if not loop.last %}
@@ -654,9 +1153,11 @@ def remove_fact(self: SqliteEngine,
     {% endfor %}
     """)
 
-    self._run_sql_from_jinja_template(sql_template, template_dict)
+    self._run_sql_from_jinja_template(sql_template, template_dict, sql_parameters)
+    # the documents of the fact may not be referenced anymore (see `collect_documents`)
+    self.document_store.released = True
 
-# %% ../nbs/02a_engine.ipynb 55
+# %% ../nbs/02a_engine.ipynb 70
 @patch_method
 @extract_one_relation
 def operator_select(self: SqliteEngine, 
@@ -668,25 +1169,30 @@ def operator_select(self: SqliteEngine,
     Performs sql WHERE, whose constraints are based on `select_info`
     """
     constant_var_pairs = []
+    constant_values: List[Union[str, int]] = []
     equal_var_pairs = []
 
-    def _create_new_relation_for_select_result() -> Relation:
+    def _create_new_relation_for_select_result(sql_select: str) -> Relation:
         new_term_list = src_relation.term_list
-        new_arity = len(new_term_list)
         new_type_list = src_relation.type_list
-        new_relation_name = self._create_unique_relation(new_arity, prefix=f"{src_relation.relation_name}{self.SQL_SEPARATOR}{self.SELECT_PREFIX}")
+        new_relation_name = self._create_deferred_relation(sql_select, [src_relation],
+                                                           prefix=f"{src_relation.relation_name}{self.SQL_SEPARATOR}{self.SELECT_PREFIX}",
+                                                           sql_parameters=self._get_relation_parameters(src_relation.relation_name) + constant_values)
+        # the selected relation has the columns of the source, so the source's indexes can be used to compute it
+        self.filtered_tables[new_relation_name] = self.filtered_tables.get(src_relation.relation_name, src_relation.relation_name)
         return Relation(new_relation_name, new_term_list, new_type_list)
 
     def _extract_constant_variable_pairs() -> List[Tuple[str, str]]:
         """
-        generate constraints based on `constant_variables_info`
+        generate constraints based on `constant_variables_info`.
+        the constants are bound as parameters (in the order of the columns), so they are kept in `constant_values`.
 
-        @return: column + constant pairs, which are used as constraints for `select`
+        @return: column + parameter placeholder pairs, which are used as constraints for `select`
         """
-        for i, value, datatype in constant_variables_info:
+        for i, value, datatype in sorted(constant_variables_info, key=lambda info: info[0]):
             col_name = self._get_col_name(i)
-            value = self._convert_relation_term_to_string_or_int(datatype, value)
-            constant_var_pairs.append((col_name, value))
+            constant_values.append(self._convert_relation_term_to_sql_parameter(datatype, value))
+            constant_var_pairs.append((col_name, SqliteEngine.SQL_PARAMETER))
         return constant_var_pairs
 
     def _extract_equal_variable_pairs() -> List[Tuple[str, str]]:
@@ -717,17 +1223,16 @@ def operator_select(self: SqliteEngine,
                 equal_var_pairs.append((first_col_name, second_col_name))
         return equal_var_pairs
 
-    selected_relation = _create_new_relation_for_select_result()
-
     constant_constraints = _extract_constant_variable_pairs()
+    self._use_columns(src_relation.relation_name, [i for i, _, _ in constant_variables_info])
     equal_var_constraints = _extract_equal_variable_pairs()
     all_constraints = constant_constraints + equal_var_constraints
 
-    template_dict = {"new_rel_name": selected_relation.relation_name, "SELECT": SqliteEngine.SQL_SELECT, "src_rel_name": src_relation.relation_name,
+    template_dict = {"SELECT": SqliteEngine.SQL_DEFERRED_SELECT, "src_rel_name": self._get_relation_source(src_relation.relation_name),
                         "all_constraints": all_constraints}
 
     sql_template = ("""
-    INSERT INTO {{new_rel_name}} {{SELECT}} * FROM {{src_rel_name}}
+    {{SELECT}} * FROM {{src_rel_name}}
     {%- if all_constraints %}
     WHERE
         {% for left, right in all_constraints %}
@@ -739,11 +1244,10 @@ def operator_select(self: SqliteEngine,
     {%- endif -%}
     """)
 
-    self._run_sql_from_jinja_template(sql_template, template_dict)
+    sql_select = self._render_sql_template(sql_template, template_dict)
+    return _create_new_relation_for_select_result(sql_select)
 
-    return selected_relation
-
-# %% ../nbs/02a_engine.ipynb 59
+# %% ../nbs/02a_engine.ipynb 74
 @patch_method
 def operator_join(self: SqliteEngine, 
             relations: List[Relation], # a list of normal relation
@@ -756,25 +1260,28 @@ def operator_join(self: SqliteEngine,
     inner_join_list: List[Tuple[str, str]] = []
     free_var_cols: List[Tuple[str, str]] = []
 
-    def _create_new_relation_for_join_result() -> Relation:
+    def _get_joined_relation_terms() -> List[str]:
         # get all of the free variables in all of the relations, they'll serve as the terms of the joined relation
         free_var_sets: Sequence[Set] = [get_output_free_var_names(relation) for relation in relations]
         free_vars: Set = set().union(*free_var_sets)
-        joined_relation_terms = list(free_vars)
+        return list(free_vars)
 
+    def _create_new_relation_for_join_result(sql_select: str) -> Relation:
         # get the type list of the joined relation (all of the terms are free variables)
-        relation_arity = len(joined_relation_terms)
-        relation_types = [DataTypes.free_var_name] * relation_arity
+        relation_types = [DataTypes.free_var_name] * len(joined_relation_terms)
 
-        # declare the joined relation in sql and get its name
-        joined_relation_name = self._create_unique_relation(relation_arity, prefix=SqliteEngine.JOIN_PREFIX)
+        # declare the joined relation and get its name
+        # the relations are read in their order, so their parameters are bound in this order
+        sql_parameters = [parameter for relation in relations for parameter in self._get_relation_parameters(relation.relation_name)]
+        joined_relation_name = self._create_deferred_relation(sql_select, relations, prefix=SqliteEngine.JOIN_PREFIX,
+                                                              sql_parameters=sql_parameters)
 
         # create a structured node of the joined relation
         return Relation(joined_relation_name, joined_relation_terms, relation_types)
     @no_type_check
     def _extract_col_names_and_constraints() -> None:
         # iterate over the free_vars and do 2 things:
-        for i, free_var in enumerate(joined_relation.term_list):
+        for i, free_var in enumerate(joined_relation_terms):
             free_var_pairs: List[Tuple[Union[Relation, IERelation], int]] = var_dict[free_var]
             first_pair, other_pairs = free_var_pairs[0], free_var_pairs[1:]
 
@@ -804,24 +1311,33 @@ def operator_join(self: SqliteEngine,
     relation_temp_names = {relation: f"table{i}" for (i, relation) in enumerate(relations)}
     var_dict = get_free_var_to_relations_dict(set(relations))
 
-    joined_relation = _create_new_relation_for_join_result()
+    joined_relation_terms = _get_joined_relation_terms()
     _extract_col_names_and_constraints()
 
+    # the columns of the shared free variables are the join keys of each relation
+    join_keys: Dict[Relation, List[int]] = defaultdict(list)
+    for free_var_pairs in var_dict.values():
+        if len(free_var_pairs) > 1:
+            for relation, index in free_var_pairs:
+                join_keys[relation].append(index)
+    for relation, col_ids in join_keys.items():
+        self._use_columns(relation.relation_name, col_ids)
+
     # first relation - used after `FROM`
     first_relation, other_relations = relations[0], relations[1:]
 
     # every next relation is used after `INNER JOIN`
     for relation in other_relations:
-        old_relation_name = relation.relation_name
+        old_relation_name = self._get_relation_source(relation.relation_name)
         new_temp_relation_name = relation_temp_names[relation]
         inner_join_list.append((old_relation_name, new_temp_relation_name))
 
-    template_dict = {"new_rel_name": joined_relation.relation_name, "SELECT": SqliteEngine.SQL_SELECT, "new_columns_names": free_var_cols,
-                        "first_rel_name": first_relation.relation_name, "first_rel_temp_name": relation_temp_names[first_relation],
+    template_dict = {"SELECT": SqliteEngine.SQL_DEFERRED_SELECT, "new_columns_names": free_var_cols,
+                        "first_rel_name": self._get_relation_source(first_relation.relation_name), "first_rel_temp_name": relation_temp_names[first_relation],
                         "relations_temp_names": inner_join_list, "join_constraints": on_constraints_list}
 
     sql_template = ("""
-    INSERT INTO {{new_rel_name}} {{SELECT}}
+    {{SELECT}}
     {% for left, right in new_columns_names %}
         {{left}} AS {{right}}
         {% if not loop.last %}
@@ -845,11 +1361,10 @@ def operator_join(self: SqliteEngine,
     {%- endif -%}
     """)
 
-    self._run_sql_from_jinja_template(sql_template, template_dict)
-
-    return joined_relation
+    sql_select = self._render_sql_template(sql_template, template_dict)
+    return _create_new_relation_for_join_result(sql_select)
 
-# %% ../nbs/02a_engine.ipynb 61
+# %% ../nbs/02a_engine.ipynb 76
 @patch_method
 @extract_one_relation
 def operator_project(self: SqliteEngine, 
@@ -863,7 +1378,7 @@ def operator_project(self: SqliteEngine,
     project_indexes = []
     dest_col_list = []
 
-    def _create_new_relation_for_project_result() -> Relation:
+    def _extract_project_indexes() -> None:
         # get the indexes to project from (in `src_relation`) based on `var_dict`
         var_dict: Dict[str, List[Tuple[Union[Relation, IERelation], int]]] = get_free_var_to_relations_dict({src_relation})
 
@@ -871,11 +1386,12 @@ def operator_project(self: SqliteEngine,
             var_index_in_src = (var_dict[var][0][1])
             project_indexes.append(var_index_in_src)
 
+    def _create_new_relation_for_project_result(sql_select: str) -> Relation:
         src_type_list = src_relation.type_list
         new_type_list = [src_type_list[i] for i in project_indexes]
-        new_arity = len(project_vars)
-        new_relation_name = self._create_unique_relation(new_arity,
-                                                            prefix=f"{src_relation.relation_name}{SqliteEngine.SQL_SEPARATOR}{SqliteEngine.PROJECT_PREFIX}")
+        new_relation_name = self._create_deferred_relation(sql_select, [src_relation],
+                                                           prefix=f"{src_relation.relation_name}{SqliteEngine.SQL_SEPARATOR}{SqliteEngine.PROJECT_PREFIX}",
+                                                           sql_parameters=self._get_relation_parameters(src_relation.relation_name))
         return Relation(new_relation_name, project_vars, new_type_list)
 
     def _extract_project_col_names() -> None:
@@ -888,16 +1404,15 @@ def operator_project(self: SqliteEngine,
             else:
                 dest_col_list.append(f"{src_col} AS {new_col}")
 
-    new_relation = _create_new_relation_for_project_result()
+    _extract_project_indexes()
     _extract_project_col_names()
 
-    sql_command = (f"INSERT INTO {new_relation.relation_name} {SqliteEngine.SQL_SELECT} {', '.join(dest_col_list)}"
-                    f" FROM {src_relation.relation_name}")
+    sql_select = (f"{SqliteEngine.SQL_DEFERRED_SELECT} {', '.join(dest_col_list)}"
+                  f" FROM {self._get_relation_source(src_relation.relation_name)}")
 
-    self._run_sql(sql_command)
-    return new_relation
+    return _create_new_relation_for_project_result(sql_select)
 
-# %% ../nbs/02a_engine.ipynb 65
+# %% ../nbs/02a_engine.ipynb 80
 @patch_method
 def operator_union(self: SqliteEngine, 
                 relations: List[Relation], # a list of relations to unite
@@ -905,8 +1420,10 @@ def operator_union(self: SqliteEngine,
                 ) -> Relation: # the united relation
     union_list: List[str] = []
 
-    def _create_new_relation_for_union() -> Relation:
-        new_relation_name = self._create_unique_relation(len(relations[0].term_list), prefix=SqliteEngine.UNION_PREFIX)
+    def _create_new_relation_for_union(sql_select: str) -> Relation:
+        sql_parameters = [parameter for relation in relations for parameter in self._get_relation_parameters(relation.relation_name)]
+        new_relation_name = self._create_deferred_relation(sql_select, relations, prefix=SqliteEngine.UNION_PREFIX,
+                                                           sql_parameters=sql_parameters)
         new_term_list = relations[0].term_list
         new_type_list = relations[0].type_list
         return Relation(new_relation_name, new_term_list, new_type_list)
@@ -919,12 +1436,14 @@ def operator_union(self: SqliteEngine,
 
         for relation in relations:
             # we assume the same order in the source and the destination, so no need to use 'AS'
-            selection_list = [self._get_col_name(col_index) for col_index in range(len(united_relation.term_list))]
+            selection_list = [self._get_col_name(col_index) for col_index in range(len(relations[0].term_list))]
 
             # render a jinja template into an SQL select
             relation_string_template = '{{SELECT}} {{ selected_cols | join(", ") }} FROM {{rel_name}}'
-            template_dict = {"SELECT": SqliteEngine.SQL_SELECT, "selected_cols": selection_list, "rel_name": relation.relation_name}
-            rendered_relation_string = Template(strip_lines(relation_string_template)).render(**template_dict)
+            # `UNION` removes the duplicates by itself
+            template_dict = {"SELECT": SqliteEngine.SQL_DEFERRED_SELECT, "selected_cols": selection_list,
+                             "rel_name": self._get_relation_source(relation.relation_name)}
+            rendered_relation_string = self._render_sql_template(relation_string_template, template_dict)
             union_list.append(rendered_relation_string)
 
     new_arity = len(relations)
@@ -932,15 +1451,12 @@ def operator_union(self: SqliteEngine,
     if new_arity == 1:
         return relations[0]
 
-    united_relation = _create_new_relation_for_union()
     _extract_union_selections()
 
-    sql_command = f"INSERT INTO {united_relation.relation_name} {' UNION '.join(union_list)}"
-
-    self._run_sql(sql_command)
-    return united_relation
+    sql_select = ' UNION '.join(union_list)
+    return _create_new_relation_for_union(sql_select)
 
-# %% ../nbs/02a_engine.ipynb 69
+# %% ../nbs/02a_engine.ipynb 84
 @patch_method
 @extract_one_relation
 def operator_copy(self: SqliteEngine, src_rel: Relation, output_relation: Optional[Relation] = None, *args: Any) -> Relation:
@@ -948,9 +1464,17 @@ def operator_copy(self: SqliteEngine, src_rel: Relation, output_relation: Option
     See `spannerlogEngineBase.operator_copy` for explanation
     """
     src_rel_name = src_rel.relation_name
+    is_src_copied = False
     if output_relation:
         dest_rel_name = output_relation.relation_name
 
+        if dest_rel_name in self._get_source_tables(src_rel_name):
+            # the source is a deferred relation that reads the destination (e.g. in a recursive rule),
+            # so it has to be computed before the destination is cleared
+            src_rel = self.operator_copy(src_rel)
+            src_rel_name = src_rel.relation_name
+            is_src_copied = True
+
         # check if the relation already exists
         if self.is_table_exists(dest_rel_name):
             self.clear_relation(dest_rel_name)
@@ -965,34 +1489,115 @@ def operator_copy(self: SqliteEngine, src_rel: Relation, output_relation: Option
     dest_rel = Relation(dest_rel_name, src_rel.term_list, src_rel.type_list)
 
     # sql part
-    sql_command = f"INSERT INTO {dest_rel_name} {SqliteEngine.SQL_SELECT} * FROM {src_rel_name}"
-    self._run_sql(sql_command)
+    sql_command = f"INSERT INTO {dest_rel_name} {SqliteEngine.SQL_SELECT} * FROM {self._get_relation_source(src_rel_name)}"
+    self._run_sql(sql_command, self._get_relation_parameters(src_rel_name))
+
+    if is_src_copied:
+        self.remove_table(src_rel_name)
 
     return dest_rel
 
+# %% ../nbs/02a_engine.ipynb 89
+@patch_method
+def operator_difference(self: SqliteEngine,
+                relations: List[Relation], # a list of relations. the first one is the relation we subtract from
+                *args: Any
+                ) -> Relation: # a new relation that contains the tuples of the first relation that aren't in the other relations
+    """
+    Performs SQL EXCEPT.
+    """
+    assert len(relations) > 0, "cannot perform difference on an empty list"
+    src_relation, other_relations = relations[0], relations[1:]
+
+    new_relation_name = self._create_unique_relation(len(src_relation.term_list),
+                                                     prefix=f"{src_relation.relation_name}{SqliteEngine.SQL_SEPARATOR}{SqliteEngine.DIFFERENCE_PREFIX}")
+    new_relation = Relation(new_relation_name, src_relation.term_list, src_relation.type_list)
+
+    # we assume the same order in all the relations, so no need to use 'AS'
+    selected_cols = ", ".join(self._get_col_name(col_index) for col_index in range(len(src_relation.term_list)))
+    difference_list = [f"{SqliteEngine.SQL_SELECT} {selected_cols} FROM {self._get_relation_source(relation.relation_name)}" for relation in relations]
 
-# %% ../nbs/02a_engine.ipynb 72
+    sql_command = f"INSERT INTO {new_relation_name} {' EXCEPT '.join(difference_list)}"
+    sql_parameters = [parameter for relation in relations for parameter in self._get_relation_parameters(relation.relation_name)]
+    self._run_sql(sql_command, sql_parameters)
+    return new_relation
+
+# %% ../nbs/02a_engine.ipynb 91
 @patch_method
-def query(self: SqliteEngine, 
-                query: Query, # the query to be performed
-                allow_duplicates: bool = False # if True, query result may contain duplicate values
-                ) -> List[Tuple]: # a query results which is True, False, or a list of tuples
+def insert_relation(self: SqliteEngine,
+                src_rel: Relation, # the relation whose tuples are inserted
+                dest_rel: Relation # the relation into which the tuples are inserted
+                ) -> None:
     """
-    Outputs a preformatted query result, e.g. [("a",5),("b",6)].
-    notice that `query` isn't a string; it's a `Query` object which inherits from `Relation`.
-    for example, parsing the string `?excellent("bill","ted")` yields the following `Query`:
+    See `spannerlogEngineBase.insert_relation` for explanation
+    """
+    sql_command = f"INSERT INTO {dest_rel.relation_name} {SqliteEngine.SQL_SELECT} * FROM {self._get_relation_source(src_rel.relation_name)}"
+    self._run_sql(sql_command, self._get_relation_parameters(src_rel.relation_name))
 
-    ```prolog
-    relation_name = excellent
-    term_list = ["bill", "ted"]
-    type_list = [DataType.string, DataType.string]
-    ```
+# %% ../nbs/02a_engine.ipynb 93
+@patch_method
+def operator_intersection(self: SqliteEngine,
+                relations: List[Relation], # a list of relations to intersect
+                *args: Any
+                ) -> Relation: # a new relation that contains the tuples that appear in all the relations
+    """
+    Performs SQL INTERSECT.
+    """
+    assert len(relations) > 0, "cannot perform intersection on an empty list"
+    src_relation = relations[0]
+
+    new_relation_name = self._create_unique_relation(len(src_relation.term_list), prefix=SqliteEngine.INTERSECTION_PREFIX)
+    new_relation = Relation(new_relation_name, src_relation.term_list, src_relation.type_list)
+
+    # we assume the same order in all the relations, so no need to use 'AS'
+    selected_cols = ", ".join(self._get_col_name(col_index) for col_index in range(len(src_relation.term_list)))
+    intersection_list = [f"{SqliteEngine.SQL_SELECT} {selected_cols} FROM {self._get_relation_source(relation.relation_name)}" for relation in relations]
+
+    sql_command = f"INSERT INTO {new_relation_name} {' INTERSECT '.join(intersection_list)}"
+    sql_parameters = [parameter for relation in relations for parameter in self._get_relation_parameters(relation.relation_name)]
+    self._run_sql(sql_command, sql_parameters)
+    return new_relation
+
+# %% ../nbs/02a_engine.ipynb 95
+@patch_method
+def delete_relation(self: SqliteEngine,
+                src_rel: Relation, # the relation whose tuples are deleted
+                dest_rel: Relation # the relation from which the tuples are deleted
+                ) -> None:
+    """
+    See `spannerlogEngineBase.delete_relation` for explanation
+    """
+    col_names = [self._get_col_name(col_index) for col_index in range(len(src_rel.term_list))]
+    template_dict = {"src_rel_source": self._get_relation_source(src_rel.relation_name), "dest_rel_name": dest_rel.relation_name,
+                     "col_names": col_names}
+
+    sql_template = ("""
+    DELETE FROM {{dest_rel_name}} WHERE EXISTS (
+        SELECT 1 FROM {{src_rel_source}} AS src WHERE
+        {% for col_name in col_names %}
+            src.{{col_name}}={{dest_rel_name}}.{{col_name}}
+            {% if not loop.last %}
+                AND
+            {% endif %}
+        {% endfor %}
+    )
+    """)
+
+    self._run_sql_from_jinja_template(sql_template, template_dict, self._get_relation_parameters(src_rel.relation_name))
+
+# %% ../nbs/02a_engine.ipynb 101
+@patch_method
+def _create_query_relations(self: SqliteEngine, 
+                            query: Query # the query to be performed
+                            ) -> Tuple[bool, str, str]: # whether the query has free variables, and the names of the selected and projected relations
+    """
+    creates deferred relations for the select/project of a query, so the query is computed by a single statement.
+    the caller reads the projected relation, and then removes both relations.
     """
     query_free_var_indexes = self._get_free_variable_indexes(query.type_list)
     has_free_vars = bool(query_free_var_indexes)
     select_info = query.get_select_cols_values_and_types()
 
-    # create temporary tables for the select/project, and delete them
     selected_relation = self.operator_select(query, select_info)
     selected_relation_name = selected_relation.relation_name
 
@@ -1003,7 +1608,29 @@ def query(self: SqliteEngine,
     else:
         projected_relation_name = selected_relation_name
 
-    query_result = self._run_sql(f"{SqliteEngine.SQL_SELECT} * FROM {projected_relation_name}", do_commit=True)
+    return has_free_vars, selected_relation_name, projected_relation_name
+
+# %% ../nbs/02a_engine.ipynb 102
+@patch_method
+def query(self: SqliteEngine, 
+                query: Query, # the query to be performed
+                allow_duplicates: bool = False # if True, query result may contain duplicate values
+                ) -> List[Tuple]: # a query results which is True, False, or a list of tuples
+    """
+    Outputs a preformatted query result, e.g. [("a",5),("b",6)].
+    notice that `query` isn't a string; it's a `Query` object which inherits from `Relation`.
+    for example, parsing the string `?excellent("bill","ted")` yields the following `Query`:
+
+    ```prolog
+    relation_name = excellent
+    term_list = ["bill", "ted"]
+    type_list = [DataType.string, DataType.string]
+    ```
+    """
+    has_free_vars, selected_relation_name, projected_relation_name = self._create_query_relations(query)
+
+    query_result = self._run_sql(f"{SqliteEngine.SQL_SELECT} * FROM {self._get_relation_source(projected_relation_name)}",
+                                 self._get_relation_parameters(projected_relation_name), do_commit=True)
 
     self.remove_table(selected_relation_name)
     self.remove_table(projected_relation_name)
@@ -1012,13 +1639,60 @@ def query(self: SqliteEngine,
     if (not has_free_vars) and query_result != FALSE_VALUE:
         query_result = TRUE_VALUE
 
-    spanned_query_result = self._convert_strings_to_spans_in_query_result(query_result)
+    spanned_query_result = self._convert_blobs_to_spans_in_query_result(query_result)
 
-    return spanned_query_result
+    return self._convert_document_ids_in_query_result(spanned_query_result)
 
-# %% ../nbs/02a_engine.ipynb 80
+# %% ../nbs/02a_engine.ipynb 103
+@patch_method
+def iter_query(self: SqliteEngine, 
+               query: Query, # the query to be performed
+               fetch_size: int = DEFAULT_QUERY_FETCH_SIZE # the number of rows that are fetched from sqlite at once
+               ) -> QueryCursor: # a cursor that streams the query's results
+    """
+    See `spannerlogEngineBase.iter_query` for explanation. <br>
+    the results are read with `fetchmany` from a dedicated sqlite cursor, and only the fetched rows are converted into
+    spans and documents, so the whole result is never held in memory. the relations that were created for the query
+    are removed when the returned cursor is closed. until then, modifying the engine or running another query raises
+    an exception (see `assert_no_open_cursor`).
+    """
+    self.assert_no_open_cursor()
+    has_free_vars, selected_relation_name, projected_relation_name = self._create_query_relations(query)
+
+    self.sql_conn.commit()
+    sql_cursor = self.sql_conn.cursor()
+    sql_cursor.execute(f"{SqliteEngine.SQL_SELECT} * FROM {self._get_relation_source(projected_relation_name)}",
+                       self._get_relation_parameters(projected_relation_name))
+
+    def fetch_batches() -> Iterator[List[Tuple]]:
+        if not has_free_vars:
+            # the result of a query without free variables is either true or false
+            yield TRUE_VALUE if sql_cursor.fetchone() is not None else FALSE_VALUE
+            return
+
+        while True:
+            rows = sql_cursor.fetchmany(fetch_size)
+            if not rows:
+                return
+            yield self._convert_document_ids_in_query_result(self._convert_blobs_to_spans_in_query_result(rows))
+
+    def close() -> None:
+        self._open_cursor_reference = None
+        try:
+            sql_cursor.close()
+        except sqlite.ProgrammingError:
+            # the connection was closed with the engine (e.g. at exit), and the query's relations were discarded with it
+            return
+        self.remove_table(selected_relation_name)
+        self.remove_table(projected_relation_name)
+
+    query_cursor = QueryCursor(fetch_batches(), close)
+    self._open_cursor_reference = weakref.ref(query_cursor)
+    return query_cursor
+
+# %% ../nbs/02a_engine.ipynb 122
 @patch_method
-def _get_all_relation_tuples(self: SqliteEngine, 
+def _get_all_relation_tuples(self: spannerlogEngineBase, 
                              relation: Relation # a relation to be queried
                              ) -> List[Tuple]: # all the tuples of 'relation' as a list of tuples
 
@@ -1037,9 +1711,9 @@ def _get_all_relation_tuples(self: SqliteEngine,
     all_relation_tuples = self.query(query)
     return all_relation_tuples
 
-# %% ../nbs/02a_engine.ipynb 81
+# %% ../nbs/02a_engine.ipynb 123
 @patch_method
-def compute_ie_relation(self: SqliteEngine, 
+def compute_ie_relation(self: spannerlogEngineBase, 
                 ie_relation: IERelation, # an ie relation that determines the input and output terms of the ie function
                 ie_func: IEFunction, # the ie function that will be used to compute the ie relation
                 bounding_relation: Optional[Relation] # a relation that contains the inputs for ie_funcs. the actual input needs to be queried from it
@@ -1048,6 +1722,13 @@ def compute_ie_relation(self: SqliteEngine,
     Computes an information extraction relation, returning the result as a normal relation.
     for more details see spannerlogEngineBase.compute_ie_relation.
     notice comments below regarding constants
+
+    this implementation only uses `query`, `_create_unique_relation` and `add_facts`, so it is shared by all the engines.
+    the distinct inputs are passed to the ie function in batches of `ie_func.batch_size` (skipping inputs memoized by `self.ie_cache`),
+    which run concurrently if the ie function has a parallel executor or is async,
+    and the outputs are added to the output relation in bulk, chunk by chunk, while they are computed.
+    `self.lock` is held only while the engine is used, not while the ie function runs, so other threads can use the
+    engine in the meantime.
     """
 
     def _looks_like_span(checked_value: Any) -> bool:
@@ -1072,7 +1753,7 @@ def compute_ie_relation(self: SqliteEngine,
             # in this case, the ie input relation is defined exclusively by constant terms, i.e, by a single tuple
             # add that tuple as a fact to the input relation
             # create the input relation for the ie function, and also declare it inside SQL
-            all_ie_inputs = [tuple(ie_relation.input_term_list)]
+            all_ie_inputs = [tuple(term.text if isinstance(term, Document) else term for term in ie_relation.input_term_list)]
         else:
             # get a list of inputs to the ie function - some of them may be constants
             inputs_without_constants = self._get_all_relation_tuples(bounding_relation)
@@ -1085,9 +1766,10 @@ def compute_ie_relation(self: SqliteEngine,
                         result_input_list.append(bounded_input[bounding_relation.get_index_of_free_var(term)])
                     else:
                         # add a constant from the ie_relation's input
-                        result_input_list.append(term)
+                        result_input_list.append(term.text if isinstance(term, Document) else term)
                 all_ie_inputs.append(tuple(result_input_list))
-        return all_ie_inputs
+        # the bounding relation may repeat an input (e.g. when it has columns that are not inputs), but it is enough to run it once
+        return list(dict.fromkeys(all_ie_inputs))
 
     def _format_ie_output(raw_ie_output):
         # the output should be a tuple, but if a single value is returned, we accept it as well
@@ -1098,40 +1780,51 @@ def compute_ie_relation(self: SqliteEngine,
             # convert said tuples to spans
             return [Span(int(term[0]), int(term[1])) if _looks_like_span(term) else term for term in list(raw_ie_output)]
 
-    def _run_ie_function_and_add_outputs_as_facts():
-        # run the ie function on each input and process the outputs
-        for ie_input in ie_inputs:
-            # run the ie function on the input, resulting in a list of tuples
-            ie_outputs = ie_func.ie_function(*ie_input)
-            # process each ie output and add it to the output relation
-            for ie_output in ie_outputs:
+    def _run_ie_function_and_get_output_rows() -> Iterator[List[List]]:
+        # run the ie function on chunks of inputs and process the outputs, yielding the output rows of each chunk
+        # each chunk is split into batches, which run concurrently if the function has a parallel executor or is async
+        # (functions that are not batched are still called once per input, see `IEFunction.ie_function_batches`)
+        # only one chunk is in flight at a time, which bounds the memory that is used by the pending outputs
+        for chunk_start in range(0, len(ie_inputs), ie_func.chunk_size):
+            ie_input_chunk = ie_inputs[chunk_start:chunk_start + ie_func.chunk_size]
+            if self.ie_cache is None:
+                ie_outputs = ie_func.ie_function_batches(ie_input_chunk)
+            else:
+                # only inputs whose outputs were not memoized are passed to the ie function
+                ie_outputs = self.ie_cache.run(ie_func, ie_input_chunk)
+            # process each ie output (in the order of the inputs) and make it a row of the output relation
+            output_rows = []
+            for input_index, ie_output in ie_outputs:
+                ie_input = ie_input_chunk[input_index]
                 spanned_ie_output = _format_ie_output(ie_output)
 
                 # assert the ie output is properly typed
                 self._assert_ie_output_properly_typed(ie_input, list(ie_input) + spanned_ie_output, ie_output_schema, ie_relation)
 
-                # add the output as a fact to the output relation
                 # notice - repetitions are ignored here (results are in a set)
                 if len(spanned_ie_output) != 0:
-                    output_fact = AddFact(output_relation.relation_name, list(ie_input) + spanned_ie_output, list(ie_output_schema))
-                    self.add_fact(output_fact)
+                    output_rows.append(list(ie_input) + spanned_ie_output)
+            yield output_rows
 
     ie_relation_name = ie_relation.relation_name
     # create the output relation for the ie function, and also declare it inside SQL
     output_relation_arity = len(ie_relation.input_term_list) + len(ie_relation.output_term_list)
-    output_relation_name = self._create_unique_relation(output_relation_arity,
-                                                        prefix=f'{ie_relation_name}{SqliteEngine.SQL_SEPARATOR}output')
+    with self.lock:
+        output_relation_name = self._create_unique_relation(output_relation_arity,
+                                                            prefix=f'{ie_relation_name}_output')
+        ie_inputs = _get_all_ie_function_inputs()
     output_relation = Relation(output_relation_name, ie_relation.get_term_list(), ie_relation.get_type_list())
 
-    ie_inputs = _get_all_ie_function_inputs()
-
     ie_output_schema = ie_func.get_output_types(output_relation_arity)
 
-    _run_ie_function_and_add_outputs_as_facts()
+    for output_rows in _run_ie_function_and_get_output_rows():
+        if output_rows:
+            with self.lock:
+                self.add_facts(output_relation.relation_name, output_rows, ie_output_schema)
 
     return output_relation
 
-# %% ../nbs/02a_engine.ipynb 113
+# %% ../nbs/02a_engine.ipynb 156
 if __name__ == "__main__":
     my_engine = SqliteEngine()
     print("hello world")
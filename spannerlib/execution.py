@@ -1,14 +1,21 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/02b_execution.ipynb.
 
 # %% auto 0
-__all__ = ['OUT_REL_ATTRIBUTE', 'FREE_VAR_PREFIX', 'naive_execution']
+__all__ = ['OUT_REL_ATTRIBUTE', 'FREE_VAR_PREFIX', 'naive_execution', 'semi_naive_execution']
 
 # %% ../nbs/02b_execution.ipynb 4
-from typing import (Tuple, Dict, List, Callable, Optional, Union)
-
-from .ast_node_types import (Relation, Query, IERelation)
-from .engine import spannerlogEngineBase
-from .graphs import EvalState, GraphBase, TermGraphBase, ROOT_TYPE, TermNodeType, TYPE, STATE, VALUE
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from functools import partial
+from itertools import count
+from typing import (Tuple, Dict, List, Callable, Optional, Union, Iterable, Sequence, Set, FrozenSet, Any)
+
+from .ast_node_types import (Relation, Query, IERelation, AddFact, Rule)
+from .primitive_types import DataTypes
+from .engine import spannerlogEngineBase, QueryCursor, RESERVED_RELATION_PREFIX, DEFAULT_QUERY_FETCH_SIZE
+from .graphs import (EvalState, GraphBase, TermGraphBase, TermGraph, NetxStateGraph, ROOT_TYPE, TermNodeType,
+                               TYPE, STATE, VALUE)
+from .general_utils import get_input_free_var_names, get_output_free_var_names
 from .symbol_table import SymbolTableBase
 from .passes_utils import ParseNodeType
 
@@ -18,10 +25,661 @@ OUT_REL_ATTRIBUTE = "output_rel"
 FREE_VAR_PREFIX = "COL"
 
 # %% ../nbs/02b_execution.ipynb 6
+def _compute_node(node_id: GraphBase.NodeIdType, # the current node
+                  term_graph: TermGraphBase, # the term graph that contains the node
+                  symbol_table: SymbolTableBase, # a symbol table
+                  spannerlog_engine: spannerlogEngineBase # the engine that computes the node
+                  ) -> None:
+    """
+    Computes the current node based on its type.
+    """
+
+    def is_node_computed() -> bool:
+        """
+        Finds out whether the node is computed.
+
+        @return: True if all the children of the node are computed or it has no children, False otherwise.
+        """
+
+        children = term_graph.get_children(node_id)
+        if not children:
+            return True
+
+        children_statuses_is_computed = [term_graph[child_id][STATE] is EvalState.COMPUTED
+                                         for child_id in children]
+        return all(children_statuses_is_computed)
+
+    def get_children_relations() -> List[Relation]:
+        """
+        Gets the node's children output relations.
+
+        @return: a list containing the children output relations.
+        """
+        relations_ids = term_graph.get_children(node_id)
+        relations_nodes = [term_graph[rel_id] for rel_id in relations_ids]
+        relations = [rel_node[OUT_REL_ATTRIBUTE] for rel_node in relations_nodes]
+        return relations
+
+    term_type_to_engine_op: Dict[TermNodeType, Callable] = {
+        TermNodeType.RULE_REL: spannerlog_engine.operator_copy,
+        TermNodeType.UNION: spannerlog_engine.operator_union,
+        TermNodeType.JOIN: spannerlog_engine.operator_join,
+        TermNodeType.PROJECT: spannerlog_engine.operator_project,
+        TermNodeType.SELECT: spannerlog_engine.operator_select
+    }
+
+    term_attrs = term_graph[node_id]
+    if term_attrs[STATE] is EvalState.COMPUTED:
+        return
+
+    term_type = term_attrs[TYPE]
+
+    if term_type is TermNodeType.GET_REL:
+        output_relation = term_attrs[VALUE]
+
+    elif term_type is TermNodeType.CALC:
+        children_relations = get_children_relations()
+        rel_in = children_relations[0] if children_relations else None  # tmp bounding relation of the ie rel (join over all the bounding relations)
+        ie_rel_in: IERelation = term_attrs[VALUE]  # the ie relation to compute
+        ie_func_data = symbol_table.get_ie_func_data(ie_rel_in.relation_name)  # the ie function that correspond to the ie relation
+        # the engine takes its lock by itself, and releases it while the ie function runs
+        output_relation = spannerlog_engine.compute_ie_relation(ie_rel_in, ie_func_data, rel_in)
+
+    else:
+        operator = term_type_to_engine_op[term_type]
+        input_relations = get_children_relations()
+        with spannerlog_engine.lock:
+            output_relation = operator(input_relations, term_attrs.get(VALUE))
+
+    term_graph.set_node_attribute(node_id, OUT_REL_ATTRIBUTE, output_relation)
+
+    # statement was executed, mark it as "computed" or "visited"
+    compute_status = EvalState.COMPUTED if is_node_computed() else EvalState.VISITED
+    term_graph.set_node_attribute(node_id, STATE, compute_status)
+
+# %% ../nbs/02b_execution.ipynb 7
+def _get_get_rel_nodes(term_graph: TermGraphBase, # the term graph
+                       body_id: GraphBase.NodeIdType, # the root of a rule body (a child of a union node)
+                       relation_names: Iterable[str] # the names of the relations to look for
+                       ) -> List[GraphBase.NodeIdType]: # the ids of the get_rel nodes
+    """
+    Finds the get_rel nodes of a rule body that read one of the given relations.
+    We don't look inside other rule relations, since they are computed separately.
+    """
+    relation_names = set(relation_names)
+    get_rel_nodes = []
+    visited_nodes = set()
+    nodes_to_visit = [body_id]
+    while nodes_to_visit:
+        node_id = nodes_to_visit.pop()
+        if node_id in visited_nodes:
+            continue
+
+        visited_nodes.add(node_id)
+        term_attrs = term_graph[node_id]
+        if term_attrs[TYPE] is TermNodeType.RULE_REL:
+            continue
+
+        if term_attrs[TYPE] is TermNodeType.GET_REL and term_attrs[VALUE].relation_name in relation_names:
+            get_rel_nodes.append(node_id)
+
+        nodes_to_visit.extend(term_graph.get_children(node_id))
+
+    return get_rel_nodes
+
+# %% ../nbs/02b_execution.ipynb 8
+def _compute_rule_body(body_id: GraphBase.NodeIdType, # the root of a rule body (a child of a union node)
+                       term_graph: TermGraphBase, # the term graph that contains the rule body
+                       symbol_table: SymbolTableBase, # a symbol table
+                       spannerlog_engine: spannerlogEngineBase, # the engine that computes the nodes
+                       delta_node_id: Optional[GraphBase.NodeIdType] = None, # a get_rel node that reads `delta_relation` instead of its relation
+                       delta_relation: Optional[Relation] = None # the tuples that were added to (or removed from) the relation of `delta_node_id`
+                       ) -> Relation: # the output relation of the rule body
+    """
+    Computes a rule body using the current state of the relations it reads (rule relations are not computed, their
+    tables are used as they are). <br>
+    If a delta node is given, the result only contains the tuples that are derived using the delta. the nodes
+    that read the delta are always computed again, while the other nodes are computed only if they aren't computed
+    already.
+    """
+
+    # the nodes from which the delta node can be reached
+    delta_path = set()
+
+    def find_delta_path(node_id: GraphBase.NodeIdType, visited_nodes: set) -> None:
+        if node_id in visited_nodes or term_graph[node_id][TYPE] is TermNodeType.RULE_REL:
+            return
+
+        visited_nodes.add(node_id)
+        children = term_graph.get_children(node_id)
+        for child in children:
+            find_delta_path(child, visited_nodes)
+
+        if node_id == delta_node_id or any(child in delta_path for child in children):
+            delta_path.add(node_id)
+
+    def compute_postorder(node_id: GraphBase.NodeIdType, visited_nodes: set) -> None:
+        term_attrs = term_graph[node_id]
+        if node_id in visited_nodes or term_attrs[TYPE] is TermNodeType.RULE_REL:
+            return
+
+        visited_nodes.add(node_id)
+        if node_id == delta_node_id:
+            relation = term_attrs[VALUE]
+            delta = Relation(delta_relation.relation_name, relation.term_list, relation.type_list)
+            term_graph.set_node_attribute(node_id, OUT_REL_ATTRIBUTE, delta)
+            term_graph.set_node_attribute(node_id, STATE, EvalState.VISITED)
+            return
+
+        if node_id in delta_path:
+            # the output of the node was computed without the delta
+            term_graph.set_node_attribute(node_id, STATE, EvalState.NOT_COMPUTED)
+        elif term_attrs[STATE] is EvalState.COMPUTED:
+            return
+
+        for child in term_graph.get_children(node_id):
+            compute_postorder(child, visited_nodes)
+
+        _compute_node(node_id, term_graph, symbol_table, spannerlog_engine)
+
+    if delta_node_id is not None:
+        find_delta_path(body_id, set())
+
+    compute_postorder(body_id, set())
+    return term_graph[body_id][OUT_REL_ATTRIBUTE]
+
+# %% ../nbs/02b_execution.ipynb 9
+def _compute_rule_strata(relation_name: str, # the rule relation to compute
+                         do_reset: bool, # if set to True, the nodes of the relation are reset after the computation
+                         compute_stratum: Callable[[str, Set[str], bool], None], # computes a stratum, given one of its relations
+                         term_graph: TermGraphBase, # the term graph, which keeps the strata of the rule relations
+                         workers: int, # the number of threads that compute independent strata concurrently
+                         stratum_locks: Dict[FrozenSet[str], Any] # guards the computation of each stratum
+                         ) -> None:
+    """
+    Computes a rule relation stratum by stratum: first the strata it depends on (see `DependencyGraph.get_strata`), in
+    topological order, and then its own stratum. <br>
+    If `workers` is more than 1, the strata it depends on are computed by a pool of threads. a stratum is dispatched
+    once all the strata it depends on are computed, so strata that don't depend on one another (e.g. rules that extract
+    information from different relations) are computed concurrently. the engine's operators are serialized by its
+    lock, which isn't held while ie functions run, so the ie functions of different strata run concurrently.
+    """
+
+    def compute_stratum_once(stratum: Set[str], stratum_relation_name: str, stratum_do_reset: bool) -> None:
+        # a stratum may be reached by several threads, e.g. from a rule body that reads it without depending on it
+        with stratum_locks.setdefault(frozenset(stratum), threading.RLock()):
+            if term_graph[stratum_relation_name][STATE] is not EvalState.COMPUTED:
+                compute_stratum(stratum_relation_name, stratum, stratum_do_reset)
+
+    *lower_strata, relation_stratum = term_graph.get_strata(relation_name)
+    lower_strata = [stratum for stratum in lower_strata
+                    if term_graph[next(iter(stratum))][STATE] is not EvalState.COMPUTED]
+
+    if workers <= 1 or len(lower_strata) <= 1:
+        for stratum in lower_strata:
+            compute_stratum_once(stratum, next(iter(stratum)), False)
+    else:
+        # maps each stratum that isn't computed yet to the strata it is waiting for
+        pending_strata = {frozenset(stratum): set() for stratum in lower_strata}
+        for stratum, dependencies in pending_strata.items():
+            dependencies.update(frozenset(dependency) for dependency in term_graph.get_strata(next(iter(stratum)))[:-1])
+            dependencies.intersection_update(pending_strata)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            running_strata = {}
+            while pending_strata or running_strata:
+                for stratum in [stratum for stratum, dependencies in pending_strata.items() if not dependencies]:
+                    del pending_strata[stratum]
+                    future = executor.submit(compute_stratum_once, set(stratum), next(iter(stratum)), False)
+                    running_strata[future] = stratum
+
+                done_futures, _ = wait(running_strata, return_when=FIRST_COMPLETED)
+                for future in done_futures:
+                    stratum = running_strata.pop(future)
+                    # raises the exception of the stratum, if there was one
+                    future.result()
+                    for dependencies in pending_strata.values():
+                        dependencies.discard(stratum)
+
+    compute_stratum_once(relation_stratum, relation_name, do_reset)
+
+# %% ../nbs/02b_execution.ipynb 10
+def _update_fact(fact: Relation, # the fact to add or remove
+                 is_addition: bool, # True if the fact is added, False if it is removed
+                 term_graph: TermGraphBase, # the term graph
+                 symbol_table: SymbolTableBase, # a symbol table
+                 spannerlog_engine: spannerlogEngineBase # the engine that stores the relations
+                 ) -> None:
+    """
+    Adds/removes a fact, and incrementally updates the computed rule relations that depend on it, instead of
+    computing them again from scratch on the next query.
+
+    The change set of the fact's relation (a delta relation, that contains the fact if the relation was actually
+    changed) is propagated through the dependent rule relations, from the relations it is used by to the relations
+    that use them. for each rule relation, every rule body is computed once for every get_rel node that reads a
+    changed relation, where that node reads the delta and the other nodes read the full relations
+    (see `semi_naive_execution`). mutually recursive relations are updated together until their deltas are empty.
+
+    * when a fact is added, the new tuples of each rule relation are inserted into it, and are used as its delta.
+    * when a fact is removed, we use the delete and rederive method: first we find all the tuples that were derived
+    using the removed tuples (before removing anything), then we delete them from the rule relations, and finally we
+    insert back the deleted tuples that can still be derived from the remaining tuples.
+
+    Rule relations that aren't computed are not updated, they will be computed from scratch on the next query.
+    """
+
+    relation_name = fact.relation_name
+    update_fact = spannerlog_engine.add_fact if is_addition else spannerlog_engine.remove_fact
+
+    # we only update the computed relations. a relation that depends on a relation that isn't computed isn't
+    # computed as well
+    dependent_relations = [relations for relations in term_graph.get_dependent_relations(relation_name)
+                           if all(term_graph[relation][STATE] is EvalState.COMPUTED for relation in relations)]
+
+    if not dependent_relations:
+        update_fact(fact)
+        term_graph.invalidate_relation(relation_name)
+        return
+
+    # the tuples of the relation that are equal to the fact. the delta is copied, since the relation is about to change
+    fact_delta = spannerlog_engine.operator_copy(spannerlog_engine.operator_select(fact, fact.get_select_cols_values_and_types()))
+    is_fact_in_relation = spannerlog_engine.get_table_len(fact_delta.relation_name) > 0
+    if is_fact_in_relation == is_addition:
+        # the relation doesn't change
+        spannerlog_engine.remove_table(fact_delta.relation_name)
+        return
+
+    if is_addition:
+        spannerlog_engine.add_fact(AddFact(fact_delta.relation_name, fact.term_list, fact.type_list))
+
+    # all the nodes that read the changed relations have to be computed again
+    term_graph.invalidate_relation(relation_name)
+
+    # maps each changed relation to the tuples that were added to it (or should be removed from it)
+    deltas: Dict[str, Relation] = {relation_name: fact_delta}
+    delta_tables = [fact_delta.relation_name]
+
+    def get_rule_bodies(relation: str) -> Sequence[GraphBase.NodeIdType]:
+        return term_graph.get_children(term_graph.get_child(relation))
+
+    def compute_deltas(relations: Set[str]) -> None:
+        """
+        Computes the deltas of mutually recursive relations using semi-naive evaluation.
+        when a fact is added, the new tuples are also inserted into the relations.
+
+        @param relations: a set of mutually recursive relations.
+        """
+        relation_deltas: Dict[str, List[Relation]] = {relation: [] for relation in relations}
+
+        # in the first iteration we use the deltas of the relations that were already updated
+        current_deltas = deltas
+        while current_deltas:
+            new_deltas = {}
+            for relation in relations:
+                delta_results = []
+                for body_id in get_rule_bodies(relation):
+                    for node_id in _get_get_rel_nodes(term_graph, body_id, current_deltas):
+                        delta = current_deltas[term_graph[node_id][VALUE].relation_name]
+                        delta_results.append(_compute_rule_body(body_id, term_graph, symbol_table, spannerlog_engine,
+                                                                node_id, delta))
+
+                if not delta_results:
+                    continue
+
+                # remove the tuples we already know about
+                known_relations = [term_graph[relation][VALUE]] if is_addition else relation_deltas[relation]
+                united_relation = spannerlog_engine.operator_union(delta_results)
+                new_delta = spannerlog_engine.operator_difference([united_relation] + known_relations)
+                delta_tables.append(new_delta.relation_name)
+                if spannerlog_engine.get_table_len(new_delta.relation_name) == 0:
+                    continue
+
+                if is_addition:
+                    spannerlog_engine.insert_relation(new_delta, term_graph[relation][VALUE])
+                relation_deltas[relation].append(new_delta)
+                new_deltas[relation] = new_delta
+
+            current_deltas = new_deltas
+
+        for relation, relation_delta_list in relation_deltas.items():
+            if relation_delta_list:
+                deltas[relation] = spannerlog_engine.operator_union(relation_delta_list)
+                delta_tables.append(deltas[relation].relation_name)
+
+    def rederive(relations: Set[str]) -> None:
+        """
+        Inserts back the deleted tuples of mutually recursive relations that can still be derived.
+
+        @param relations: a set of mutually recursive relations.
+        """
+        is_recursive = any(_get_get_rel_nodes(term_graph, body_id, relations)
+                           for relation in relations for body_id in get_rule_bodies(relation))
+        removed_relations = {relation: deltas[relation] for relation in relations if relation in deltas}
+
+        is_changed = True
+        while is_changed:
+            is_changed = False
+            for relation, removed_relation in removed_relations.items():
+                results = [_compute_rule_body(body_id, term_graph, symbol_table, spannerlog_engine)
+                           for body_id in get_rule_bodies(relation)]
+                united_relation = spannerlog_engine.operator_union(results)
+                rederived_relation = spannerlog_engine.operator_intersection([united_relation, removed_relation])
+                delta_tables.append(rederived_relation.relation_name)
+                if spannerlog_engine.get_table_len(rederived_relation.relation_name) == 0:
+                    continue
+
+                spannerlog_engine.insert_relation(rederived_relation, term_graph[relation][VALUE])
+                removed_relations[relation] = spannerlog_engine.operator_difference([removed_relation, rederived_relation])
+                delta_tables.append(removed_relations[relation].relation_name)
+                # a rederived tuple might rederive other tuples of the mutually recursive relations
+                is_changed = is_recursive
+
+    def set_computed(relations: Set[str]) -> None:
+        for relation in relations:
+            term_graph.set_node_attribute(relation, STATE, EvalState.COMPUTED)
+
+    if is_addition:
+        update_fact(fact)
+        for relations in dependent_relations:
+            compute_deltas(relations)
+            set_computed(relations)
+
+    else:
+        # find all the tuples that were derived using the removed tuple, while the relations are not changed yet
+        for relations in dependent_relations:
+            compute_deltas(relations)
+
+        update_fact(fact)
+        # some of the nodes that read the relation were computed while the fact was still in it
+        term_graph.invalidate_relation(relation_name)
+        for relation, delta in deltas.items():
+            if relation != relation_name:
+                spannerlog_engine.delete_relation(delta, term_graph[relation][VALUE])
+
+        for relations in dependent_relations:
+            rederive(relations)
+            set_computed(relations)
+
+    spannerlog_engine.remove_tables(delta_tables)
+
+# %% ../nbs/02b_execution.ipynb 11
+# makes the names of the relations of every magic sets rewriting unique
+_magic_sets_ids = count()
+
+def _rewrite_query_with_magic_sets(query: Query, # a query with at least one constant term
+                                   term_graph: TermGraphBase # the term graph that holds the rules of the program
+                                   ) -> Tuple[List[Rule], AddFact, Query, Set[str]]: # the rewritten rules, the magic seed fact, the rewritten query and the rule relations the rewritten rules read as they are
+    """
+    Rewrites the rules that a query depends on using the magic sets transformation, so that only the part of the
+    rule relations that is relevant to the constants of the query is derived. <br>
+    Every rule relation that isn't computed yet is rewritten once for every adornment it is used with, i.e. a string
+    that marks each of its columns as bound (`b`) or free (`f`):
+
+    * the adorned relation `p_bf` has a rule for every rule of `p`, whose body starts with the magic relation `magic_p_bf`.
+    the magic relation holds the values of the bound columns that `p` is demanded with, so the rule only derives the
+    tuples of `p` that match them.
+    * the bindings flow through the rule bodies from left to right (the sideways information passing strategy).
+    a relation in a rule body is bound in the columns that hold a free variable which already appeared in the bound
+    columns of the head or in the relations before it. for every rule relation in the body with a bound column,
+    a magic rule derives its demanded values from the magic relation of the head and the relations before it.
+    * the magic relation of the query is seeded with the constants of the query. since rule relations are cleared
+    before they are computed, the constants are added to a seed relation, which is copied into the magic relation.
+
+    for example, the query `?ancestor("alice", Y)` over the program:
+
+    ```prolog
+    ancestor(X,Y) <- parent(X,Y)
+    ancestor(X,Y) <- parent(X,Z), ancestor(Z,Y)
+    ```
+
+    is rewritten into the program (the actual relation names are unique reserved names):
+
+    ```prolog
+    seed_ancestor_bf("alice")
+    magic_ancestor_bf(X0) <- seed_ancestor_bf(X0)
+    ancestor_bf(X,Y) <- magic_ancestor_bf(X), parent(X,Y)
+    ancestor_bf(X,Y) <- magic_ancestor_bf(X), parent(X,Z), ancestor_bf(Z,Y)
+    magic_ancestor_bf(Z) <- magic_ancestor_bf(X), parent(X,Z)
+    ?ancestor_bf("alice", Y)
+    ```
+
+    so only the descendants of alice are derived. <br>
+    Rule relations that are computed already, or that aren't bound in any column, are read as they are.
+    """
+
+    rewriting_id = next(_magic_sets_ids)
+
+    def is_rewritten(relation_name: str) -> bool:
+        return term_graph.is_contains_node(relation_name) and term_graph[relation_name][STATE] is not EvalState.COMPUTED
+
+    def get_relation_name(prefix: str, relation_name: str, adornment: str) -> str:
+        return f"{RESERVED_RELATION_PREFIX}{prefix}_{rewriting_id}_{relation_name}_{adornment}"
+
+    def get_adornment(relation: Relation, bound_vars: Set[str]) -> str:
+        # a free variable that appears more than once is bound only in its first column, the others are selected
+        adornment, seen_vars = [], set()
+        for term, term_type in zip(relation.term_list, relation.type_list):
+            is_bound = term_type is DataTypes.free_var_name and term in bound_vars and term not in seen_vars
+            adornment.append("b" if is_bound else "f")
+            if term_type is DataTypes.free_var_name:
+                seen_vars.add(term)
+        return "".join(adornment)
+
+    def get_magic_relation(relation_name: str, adornment: str, term_list: Sequence) -> Relation:
+        bound_terms = [term for term, binding in zip(term_list, adornment) if binding == "b"]
+        return Relation(get_relation_name("magic", relation_name, adornment), bound_terms,
+                        [DataTypes.free_var_name] * len(bound_terms))
+
+    # the query is bound in the columns of its constants
+    query_adornment = "".join("f" if term_type is DataTypes.free_var_name else "b" for term_type in query.type_list)
+    magic_fact_terms = [(term, term_type) for term, term_type in zip(query.term_list, query.type_list)
+                        if term_type is not DataTypes.free_var_name]
+    magic_fact = AddFact(get_relation_name("seed", query.relation_name, query_adornment),
+                         [term for term, _ in magic_fact_terms], [term_type for _, term_type in magic_fact_terms])
+    rewritten_query = Query(get_relation_name("demand", query.relation_name, query_adornment),
+                            query.term_list, query.type_list)
+
+    seed_vars = [f"X{i}" for i in range(len(magic_fact_terms))]
+    seed_types = [DataTypes.free_var_name] * len(seed_vars)
+    seed_rule = Rule(Relation(get_relation_name("magic", query.relation_name, query_adornment), seed_vars, seed_types),
+                     [Relation(magic_fact.relation_name, seed_vars, seed_types)], ["relation"])
+
+    rules: List[Rule] = [seed_rule]
+    read_relations: Set[str] = set()
+    adorned_relations = {(query.relation_name, query_adornment)}
+    relations_to_rewrite = [(query.relation_name, query_adornment)]
+    while relations_to_rewrite:
+        relation_name, adornment = relations_to_rewrite.pop()
+        for rule in term_graph.get_rules(relation_name):
+            magic_relation = get_magic_relation(relation_name, adornment, rule.head_relation.term_list)
+            bound_vars = set(magic_relation.term_list)
+            body: List[Union[Relation, IERelation]] = [magic_relation]
+            body_types = ["relation"]
+            # ie relations are added to the body only once their inputs are bound, so every magic rule is safe
+            waiting_ie_relations: List[IERelation] = []
+
+            def add_to_body(relation: Union[Relation, IERelation], relation_type: str) -> None:
+                body.append(relation)
+                body_types.append(relation_type)
+                bound_vars.update(get_output_free_var_names(relation))
+
+            for relation, relation_type in zip(rule.body_relation_list, rule.body_relation_type_list):
+                if relation_type != "relation":
+                    waiting_ie_relations.append(relation)
+                elif not is_rewritten(relation.relation_name):
+                    add_to_body(relation, relation_type)
+                else:
+                    body_adornment = get_adornment(relation, bound_vars)
+                    if "b" not in body_adornment:
+                        # the whole relation is needed, so it is computed as usual
+                        read_relations.add(relation.relation_name)
+                        add_to_body(relation, relation_type)
+                    else:
+                        magic_head = get_magic_relation(relation.relation_name, body_adornment, relation.term_list)
+                        # a magic rule whose head is the magic relation of the rule's head (e.g. in a left recursive
+                        # rule) can't derive new values
+                        if not magic_head.has_same_terms_and_types(magic_relation) or \
+                                magic_head.relation_name != magic_relation.relation_name:
+                            rules.append(Rule(magic_head, list(body), list(body_types)))
+                        if (relation.relation_name, body_adornment) not in adorned_relations:
+                            adorned_relations.add((relation.relation_name, body_adornment))
+                            relations_to_rewrite.append((relation.relation_name, body_adornment))
+
+                        adorned_relation = Relation(get_relation_name("demand", relation.relation_name, body_adornment),
+                                                    relation.term_list, relation.type_list)
+                        add_to_body(adorned_relation, relation_type)
+
+                bound_ie_relations = [ie_relation for ie_relation in waiting_ie_relations
+                                      if get_input_free_var_names(ie_relation) <= bound_vars]
+                while bound_ie_relations:
+                    for ie_relation in bound_ie_relations:
+                        waiting_ie_relations.remove(ie_relation)
+                        add_to_body(ie_relation, "ie_relation")
+                    bound_ie_relations = [ie_relation for ie_relation in waiting_ie_relations
+                                          if get_input_free_var_names(ie_relation) <= bound_vars]
+
+            body.extend(waiting_ie_relations)
+            body_types.extend(["ie_relation"] * len(waiting_ie_relations))
+            head_relation = Relation(get_relation_name("demand", relation_name, adornment),
+                                     rule.head_relation.term_list, rule.head_relation.type_list)
+            rules.append(Rule(head_relation, body, body_types))
+
+    # the same magic rule may be derived from several rules of a relation
+    rules = list({str(rule): rule for rule in rules}.values())
+    return rules, magic_fact, rewritten_query, read_relations
+
+# %% ../nbs/02b_execution.ipynb 12
+def _query_with_magic_sets(query: Query, # a query with at least one constant term, on a rule relation that isn't computed
+                           term_graph: TermGraphBase, # the term graph
+                           symbol_table: SymbolTableBase, # a symbol table
+                           spannerlog_engine: spannerlogEngineBase, # the engine that executes the rewritten program
+                           compute_rule: Callable[[str, bool], None], # computes a rule relation of `term_graph`
+                           demand_execution: Callable, # the execution that computes the rewritten program
+                           stream_query: bool # if True, the query's result is a `QueryCursor` that streams it
+                           ) -> Tuple[Query, Union[List, QueryCursor]]: # the query and its result
+    """
+    Computes a query using the magic sets rewriting of the rules it depends on (see `_rewrite_query_with_magic_sets`),
+    instead of computing its whole relation. <br>
+    The rewritten program is executed on a term graph of its own, and its relations are removed once the result was
+    read, so the rule relations of `term_graph` are not changed (and they stay not computed).
+    """
+    rules, magic_fact, rewritten_query, read_relations = _rewrite_query_with_magic_sets(query, term_graph)
+
+    # the rule relations that weren't rewritten are read from their tables
+    for relation_name in read_relations:
+        compute_rule(relation_name, do_reset=False)
+
+    # the rules are not ordered by their dependencies, so all the rule relations are added before the rules that use them
+    demand_term_graph = TermGraph()
+    for rule in rules:
+        demand_term_graph.add_relation(rule.head_relation)
+    for rule in rules:
+        demand_term_graph.add_rule_to_term_graph(rule)
+
+    demand_parse_graph = NetxStateGraph()
+    statements = [(ParseNodeType.RELATION_DECLARATION, magic_fact.as_relation_declaration()),
+                  *[(ParseNodeType.RULE, rule) for rule in rules],
+                  (ParseNodeType.ADD_FACT, magic_fact),
+                  (ParseNodeType.QUERY, rewritten_query)]
+    for statement_type, statement_value in statements:
+        statement_node = demand_parse_graph.add_node(type=statement_type, value=statement_value)
+        demand_parse_graph.add_edge(demand_parse_graph.get_root_id(), statement_node)
+
+    _, result = demand_execution(parse_graph=demand_parse_graph, term_graph=demand_term_graph,
+                                 symbol_table=symbol_table, spannerlog_engine=spannerlog_engine,
+                                 stream_query=stream_query)
+
+    def remove_rewritten_relations() -> None:
+        with spannerlog_engine.lock:
+            spannerlog_engine.remove_tables({magic_fact.relation_name} |
+                                            {rule.head_relation.relation_name for rule in rules})
+
+    if not stream_query:
+        remove_rewritten_relations()
+        return query, result
+
+    def close_result() -> None:
+        result.close()
+        remove_rewritten_relations()
+
+    return query, QueryCursor(result.batches(DEFAULT_QUERY_FETCH_SIZE), close_result)
+
+# %% ../nbs/02b_execution.ipynb 13
+def _execute_parse_graph(parse_graph: GraphBase, # a parse graph to execute
+                         term_graph: TermGraphBase, # the term graph, used to update the rule relations that depend on changed facts
+                         symbol_table: SymbolTableBase, # a symbol table
+                         spannerlog_engine: spannerlogEngineBase, # the engine that executes the statements
+                         compute_rule: Callable[[str, bool], None], # a function that computes a rule relation (and its dependencies) inside the engine
+                         stream_query: bool = False, # if True, the query's result is streamed by `spannerlogEngineBase.iter_query`
+                         demand_execution: Optional[Callable] = None # if given, queries with constants are computed by it using magic sets
+                         ) -> Optional[Tuple[Query, List]]: # the last query and its result, if there was a query
+    """
+    Executes every statement of the parse graph that wasn't computed yet. <br>
+    The rule relations that were computed by a query stay computed for the following queries. when a fact is added
+    or removed, they are updated incrementally (see `_update_fact`). <br>
+    A query with constants on a rule relation that isn't computed is computed using the magic sets rewriting of its
+    rules instead (see `_query_with_magic_sets`), so only the tuples that are relevant to its constants are derived.
+    the rewritten relations are dropped after the query, so this pays off for a few selective queries, while many
+    queries on the same relation are cheaper when it is computed once and reused.
+    """
+
+    node_type_to_action: Dict[Union[str, ParseNodeType], Callable] = {
+        ParseNodeType.RULE: lambda rule_: spannerlog_engine.declare_relation_table(rule_.head_relation.as_relation_declaration()),
+        ParseNodeType.RELATION_DECLARATION: spannerlog_engine.declare_relation_table,
+        ParseNodeType.ADD_FACT: lambda fact: _update_fact(fact, True, term_graph, symbol_table, spannerlog_engine),
+        ParseNodeType.REMOVE_FACT: lambda fact: _update_fact(fact, False, term_graph, symbol_table, spannerlog_engine),
+        ROOT_TYPE: lambda *args: None  # noop
+    }
+
+    # get the parse_graph's node ids. note that the order of the ids does not actually matter as long as the statements
+    # are ordered the same way as they were in the original program
+
+    parse_node_ids = parse_graph.post_order_dfs()
+    query_result = None
+    # execute each non computed statement in the parse graph
+    for parse_id in parse_node_ids:
+        parse_node_attrs = parse_graph[parse_id]
+
+        if parse_node_attrs[STATE] is EvalState.COMPUTED:
+            continue
+
+        # mark node as "computed"
+
+        parse_graph.set_node_attribute(parse_id, STATE, EvalState.COMPUTED)
+
+
+        # the parse node is not computed, get its type and compute it accordingly
+        parse_node_type = parse_node_attrs[TYPE]
+
+        if parse_node_type == ParseNodeType.QUERY:
+            # we return the query as well as the result, because we print as part of the output
+            query: Query = parse_node_attrs[VALUE]
+            is_demand_query = (demand_execution is not None and term_graph.is_contains_node(query.relation_name) and
+                               term_graph[query.relation_name][STATE] is not EvalState.COMPUTED and
+                               any(term_type is not DataTypes.free_var_name for term_type in query.type_list))
+            if is_demand_query:
+                query_result = _query_with_magic_sets(query, term_graph, symbol_table, spannerlog_engine, compute_rule,
+                                                      demand_execution, stream_query)
+                continue
+
+            # we don't reset the computed nodes, so the next queries can reuse them
+            compute_rule(query.relation_name, do_reset=False)
+            query_result = (query, spannerlog_engine.iter_query(query) if stream_query else spannerlog_engine.query(query))
+
+        else:
+            action = node_type_to_action[parse_node_type]
+            action(parse_node_attrs.get(VALUE))
+
+    return query_result
+
+# %% ../nbs/02b_execution.ipynb 14
 def naive_execution(parse_graph: GraphBase, # a parse graph to execute
                     term_graph: TermGraphBase, # a term graph
                     symbol_table: SymbolTableBase, # a symbol table
-                    spannerlog_engine: spannerlogEngineBase # a spannerlog engine that will be used to execute the term graph
+                    spannerlog_engine: spannerlogEngineBase, # a spannerlog engine that will be used to execute the term graph
+                    stream_query: bool = False, # if True, the query's result is a `QueryCursor` that streams it
+                    workers: int = 1, # the number of threads that compute independent rule relations concurrently
+                    magic_sets: bool = False # if True, queries with constants on rule relations that aren't computed are computed using magic sets (see `_query_with_magic_sets`)
                     ) -> Optional[Tuple[Query, List]]:
     """
     Executes a parse graph
@@ -54,6 +712,9 @@ def naive_execution(parse_graph: GraphBase, # a parse graph to execute
 
     """
 
+    # guards the computation of each stratum, see `_compute_rule_strata`
+    stratum_locks: Dict[FrozenSet[str], Any] = {}
+
     # it's an inner function because it needs to access all naive_execution's params
     def compute_rule(relation_name: str, do_reset: bool = True) -> None:
         """
@@ -63,7 +724,8 @@ def naive_execution(parse_graph: GraphBase, # a parse graph to execute
         During the traversal, when we reach a root of another rule relation, we build its computational graph as well.
         We do that in the following way:
             * if the relation is mutually recursive, we use its current value.
-            * if the relation isn't mutually recursive, we compute it recursively (calling compute_rule on it).
+            * if the relation isn't mutually recursive, it was already computed, since the strata of the relation
+              (see `DependencyGraph.get_strata`) are computed in topological order.
 
         Finally, we compute together all the mutually recursive relations in the following way:
             we iterate over all the mutually recursive relations:
@@ -93,9 +755,24 @@ def naive_execution(parse_graph: GraphBase, # a parse graph to execute
         if not term_graph.is_contains_node(relation_name):
             return
 
+        # the relation was computed by a previous query, and none of the relations it depends on has changed since
+        if term_graph[relation_name][STATE] is EvalState.COMPUTED:
+            return
+
+        # the strata of the relation are taken from the plan that the term graph keeps. they are computed in
+        # topological order, so each stratum only reads rule relations that were already computed
+        _compute_rule_strata(relation_name, do_reset, compute_stratum, term_graph, workers, stratum_locks)
+
+    def compute_stratum(relation_name: str, mutually_recursive: Set[str], do_reset: bool) -> None:
+        """
+        Computes a stratum, i.e. a set of mutually recursive relations, see `compute_rule`.
+
+        @param relation_name: the name of a relation in the stratum, the nodes are reset starting from it.
+        @param mutually_recursive: the names of the relations in the stratum.
+        @param do_reset: if set to True, we reset the nodes after the computation.
+        """
         # stores all the nodes that were visited during the dfs
         visited_nodes = set()
-        mutually_recursive = term_graph.get_mutually_recursive_relations(relation_name)
         current_computed_relation = None
 
         def compute_postorder(node_id: GraphBase.NodeIdType) -> None:
@@ -128,11 +805,12 @@ def naive_execution(parse_graph: GraphBase, # a parse graph to execute
             for child in children:
                 compute_postorder(child)
 
-            compute_node(node_id)
+            _compute_node(node_id, term_graph, symbol_table, spannerlog_engine)
             return
 
         # clear all the mutually recursive tables.
-        spannerlog_engine.clear_tables(mutually_recursive)
+        with spannerlog_engine.lock:
+            spannerlog_engine.clear_tables(mutually_recursive)
 
         fixed_point = False
         while not fixed_point:
@@ -141,9 +819,11 @@ def naive_execution(parse_graph: GraphBase, # a parse graph to execute
             for relation in mutually_recursive:
                 current_computed_relation = relation
                 visited_nodes = set()
-                initial_len = spannerlog_engine.get_table_len(current_computed_relation)
+                with spannerlog_engine.lock:
+                    initial_len = spannerlog_engine.get_table_len(current_computed_relation)
                 compute_postorder(current_computed_relation)
-                is_stopped = spannerlog_engine.get_table_len(current_computed_relation) == initial_len
+                with spannerlog_engine.lock:
+                    is_stopped = spannerlog_engine.get_table_len(current_computed_relation) == initial_len
 
                 # we stop iterating when all the rules converged at the same step
                 fixed_point = fixed_point and is_stopped
@@ -154,110 +834,182 @@ def naive_execution(parse_graph: GraphBase, # a parse graph to execute
 
         return
 
-    def compute_node(node_id: GraphBase.NodeIdType) -> None:
-        """
-        Computes the current node based on its type.
+    # the rewritten program is computed without magic sets, otherwise its query would be rewritten again
+    demand_execution = partial(naive_execution, workers=workers, magic_sets=False) if magic_sets else None
+    return _execute_parse_graph(parse_graph, term_graph, symbol_table, spannerlog_engine, compute_rule, stream_query,
+                                demand_execution)
+
+# %% ../nbs/02b_execution.ipynb 15
+def semi_naive_execution(parse_graph: GraphBase, # a parse graph to execute
+                         term_graph: TermGraphBase, # a term graph
+                         symbol_table: SymbolTableBase, # a symbol table
+                         spannerlog_engine: spannerlogEngineBase, # a spannerlog engine that will be used to execute the term graph
+                         stream_query: bool = False, # if True, the query's result is a `QueryCursor` that streams it
+                         workers: int = 1, # the number of threads that compute independent rule relations concurrently
+                         magic_sets: bool = False # if True, queries with constants on rule relations that aren't computed are computed using magic sets (see `_query_with_magic_sets`)
+                         ) -> Optional[Tuple[Query, List]]:
+    """
+    Executes a parse graph, exactly like `naive_execution`, except that mutually recursive relations are computed
+    using semi-naive evaluation.
 
-        @param node_id: the current node.
-        """
+    In the naive execution every iteration of the fixed point recomputes the rules over the full relations, so all the
+    work of the previous iterations is done again. <br>
+    Here, for each mutually recursive relation we keep a delta relation, which holds the tuples that were derived for
+    the first time in the previous iteration. a rule body that uses the recursive relations is computed once for every
+    recursive relation in it, where that relation is replaced by its delta and the other relations are read in full.
+    that way every iteration only joins the new tuples with the accumulated ones.
 
-        def is_node_computed() -> bool:
-            """
-            Finds out whether the node is computed.
+    for example, for the program:
 
-            @return: True if all the children of the node are computed or it has no children, False otherwise.
-            """
+    ```prolog
+    ancestor(X,Y) <- parent(X,Y)
+    ancestor(X,Y) <- parent(X,Z), ancestor(Z,Y)
+    ```
 
-            children = term_graph.get_children(node_id)
-            if not children:
-                return True
+    the first iteration computes only the non recursive rule (`ancestor` is still empty), and puts the result in the
+    delta of `ancestor`. every following iteration joins `parent` with the delta of `ancestor`, removes the tuples that
+    are already in `ancestor` to get the new delta, and adds them to `ancestor`.
+    we stop when all the deltas are empty.
+    """
 
-            children_statuses_is_computed = [term_graph[child_id][STATE] is EvalState.COMPUTED
-                                             for child_id in children]
-            return all(children_statuses_is_computed)
+    # guards the computation of each stratum, see `_compute_rule_strata`
+    stratum_locks: Dict[FrozenSet[str], Any] = {}
 
-        def get_children_relations() -> List[Relation]:
-            """
-            Gets the node's children output relations.
+    def compute_rule(relation_name: str, do_reset: bool = True) -> None:
+        """
+        Computes the rule (including the mutual recursive rules) using semi-naive evaluation.
 
-            @return: a list containing the children output relations.
-            """
-            relations_ids = term_graph.get_children(node_id)
-            relations_nodes = [term_graph[rel_id] for rel_id in relations_ids]
-            relations = [rel_node[OUT_REL_ATTRIBUTE] for rel_node in relations_nodes]
-            return relations
-
-        term_type_to_engine_op: Dict[TermNodeType, Callable] = {
-            TermNodeType.RULE_REL: spannerlog_engine.operator_copy,
-            TermNodeType.UNION: spannerlog_engine.operator_union,
-            TermNodeType.JOIN: spannerlog_engine.operator_join,
-            TermNodeType.PROJECT: spannerlog_engine.operator_project,
-            TermNodeType.SELECT: spannerlog_engine.operator_select
-        }
+        @param relation_name: the name of the relation to compute.
+        @param do_reset: if set to True, we reset the nodes after the computation.
+        """
 
-        term_attrs = term_graph[node_id]
-        if term_attrs[STATE] is EvalState.COMPUTED:
+        # check if the relation is base relation
+        if not term_graph.is_contains_node(relation_name):
             return
 
-        term_type = term_attrs[TYPE]
-
-        if term_type is TermNodeType.GET_REL:
-            output_relation = term_attrs[VALUE]
-
-        elif term_type is TermNodeType.CALC:
-            children_relations = get_children_relations()
-            rel_in = children_relations[0] if children_relations else None  # tmp bounding relation of the ie rel (join over all the bounding relations)
-            ie_rel_in: IERelation = term_attrs[VALUE]  # the ie relation to compute
-            ie_func_data = symbol_table.get_ie_func_data(ie_rel_in.relation_name)  # the ie function that correspond to the ie relation
-            output_relation = spannerlog_engine.compute_ie_relation(ie_rel_in, ie_func_data, rel_in)
-
-        else:
-            operator = term_type_to_engine_op[term_type]
-            input_relations = get_children_relations()
-            output_relation = operator(input_relations, term_attrs.get(VALUE))
-
-        term_graph.set_node_attribute(node_id, OUT_REL_ATTRIBUTE, output_relation)
+        # the relation was computed by a previous query, and none of the relations it depends on has changed since
+        if term_graph[relation_name][STATE] is EvalState.COMPUTED:
+            return
 
-        # statement was executed, mark it as "computed" or "visited"
-        compute_status = EvalState.COMPUTED if is_node_computed() else EvalState.VISITED
-        term_graph.set_node_attribute(node_id, STATE, compute_status)
+        # the strata of the relation are taken from the plan that the term graph keeps. they are computed in
+        # topological order, so each stratum only reads rule relations that were already computed
+        _compute_rule_strata(relation_name, do_reset, compute_stratum, term_graph, workers, stratum_locks)
 
-    node_type_to_action: Dict[Union[str, ParseNodeType], Callable] = {
-        ParseNodeType.RULE: lambda rule_: spannerlog_engine.declare_relation_table(rule_.head_relation.as_relation_declaration()),
-        ParseNodeType.RELATION_DECLARATION: spannerlog_engine.declare_relation_table,
-        ParseNodeType.ADD_FACT: spannerlog_engine.add_fact,
-        ParseNodeType.REMOVE_FACT: spannerlog_engine.remove_fact,
-        ROOT_TYPE: lambda *args: None  # noop
-    }
+    def compute_stratum(relation_name: str, mutually_recursive: Set[str], do_reset: bool) -> None:
+        """
+        Computes a stratum, i.e. a set of mutually recursive relations, see `compute_rule`.
 
-    # get the parse_graph's node ids. note that the order of the ids does not actually matter as long as the statements
-    # are ordered the same way as they were in the original program
+        @param relation_name: the name of a relation in the stratum, the nodes are reset starting from it.
+        @param mutually_recursive: the names of the relations in the stratum.
+        @param do_reset: if set to True, we reset the nodes after the computation.
+        """
+        # maps each mutually recursive relation to the tuples that were added to it in the last iteration
+        delta_relations: Dict[str, Relation] = {}
 
-    parse_node_ids = parse_graph.post_order_dfs()
-    query_result = None
-    # execute each non computed statement in the parse graph
-    for parse_id in parse_node_ids:
-        parse_node_attrs = parse_graph[parse_id]
+        def compute_postorder(node_id: GraphBase.NodeIdType, visited_nodes: set,
+                              delta_node_id: Optional[GraphBase.NodeIdType]) -> None:
+            """
+            Runs postorder dfs over a rule body and evaluates it.
 
-        if parse_node_attrs[STATE] is EvalState.COMPUTED:
-            continue
+            @param node_id: the current node.
+            @param visited_nodes: the nodes that were already evaluated during this dfs.
+            @param delta_node_id: a get_rel node that should read the delta of its relation instead of the full relation.
+            """
+            term_attrs = term_graph[node_id]
+            if node_id in visited_nodes or term_attrs[STATE] is EvalState.COMPUTED:
+                return
 
-        # mark node as "computed"
-        
-        parse_graph.set_node_attribute(parse_id, STATE, EvalState.COMPUTED)
+            if term_attrs[TYPE] is TermNodeType.RULE_REL:
+                # we get here through a get_rel node. the mutually recursive relations are read as they are right now
+                rule_rel = term_attrs[VALUE]
+                if rule_rel.relation_name not in mutually_recursive:
+                    compute_rule(rule_rel.relation_name, do_reset=False)
+                return
 
+            visited_nodes.add(node_id)
+            for child in term_graph.get_children(node_id):
+                compute_postorder(child, visited_nodes, delta_node_id)
+
+            if node_id == delta_node_id:
+                relation = term_attrs[VALUE]
+                delta_relation = delta_relations[relation.relation_name]
+                delta_relation = Relation(delta_relation.relation_name, relation.term_list, relation.type_list)
+                term_graph.set_node_attribute(node_id, OUT_REL_ATTRIBUTE, delta_relation)
+                term_graph.set_node_attribute(node_id, STATE, EvalState.VISITED)
+            else:
+                _compute_node(node_id, term_graph, symbol_table, spannerlog_engine)
+
+        def compute_delta(relation: str, is_first_iteration: bool) -> Optional[Relation]:
+            """
+            Computes the tuples of the relation that weren't derived in the previous iterations.
 
-        # the parse node is not computed, get its type and compute it accordingly
-        parse_node_type = parse_node_attrs[TYPE]
+            @param relation: a mutually recursive relation.
+            @param is_first_iteration: in the first iteration only the non recursive rule bodies are computed.
+            @return: the new tuples of the relation, or None if no rule body was computed.
+            """
+            new_relations = []
+            for branch_id in term_graph.get_children(term_graph.get_child(relation)):
+                recursive_nodes = _get_get_rel_nodes(term_graph, branch_id, mutually_recursive)
+                if is_first_iteration:
+                    if not recursive_nodes:
+                        compute_postorder(branch_id, set(), None)
+                        new_relations.append(term_graph[branch_id][OUT_REL_ATTRIBUTE])
+                    continue
+
+                for delta_node_id in recursive_nodes:
+                    # there is nothing new to derive from an empty delta
+                    if term_graph[delta_node_id][VALUE].relation_name not in delta_relations:
+                        continue
+                    compute_postorder(branch_id, set(), delta_node_id)
+                    new_relations.append(term_graph[branch_id][OUT_REL_ATTRIBUTE])
+
+            if not new_relations:
+                return None
+
+            rule_rel = term_graph[relation][VALUE]
+            with spannerlog_engine.lock:
+                united_relation = spannerlog_engine.operator_union(new_relations)
+                return spannerlog_engine.operator_difference([united_relation, rule_rel])
 
-        if parse_node_type == ParseNodeType.QUERY:
-            # we return the query as well as the result, because we print as part of the output
-            query: Query = parse_node_attrs[VALUE]
-            compute_rule(query.relation_name)
-            query_result = (query, spannerlog_engine.query(query))
+        # clear all the mutually recursive tables.
+        with spannerlog_engine.lock:
+            spannerlog_engine.clear_tables(mutually_recursive)
 
+        is_first_iteration = True
+        while is_first_iteration or delta_relations:
+            # compute the deltas of all the relations based on the deltas of the previous iteration
+            new_delta_relations = {}
+            for relation in mutually_recursive:
+                delta_relation = compute_delta(relation, is_first_iteration)
+                if delta_relation is not None:
+                    new_delta_relations[relation] = delta_relation
+
+            # add the new tuples to the relations, and keep only the non empty deltas for the next iteration
+            with spannerlog_engine.lock:
+                spannerlog_engine.remove_tables(delta.relation_name for delta in delta_relations.values())
+                delta_relations = {}
+                for relation, delta_relation in new_delta_relations.items():
+                    if spannerlog_engine.get_table_len(delta_relation.relation_name) == 0:
+                        spannerlog_engine.remove_tables([delta_relation.relation_name])
+                        continue
+
+                    spannerlog_engine.insert_relation(delta_relation, term_graph[relation][VALUE])
+                    delta_relations[relation] = delta_relation
+
+            is_first_iteration = False
+
+        for relation in mutually_recursive:
+            term_graph.set_node_attribute(relation, OUT_REL_ATTRIBUTE, term_graph[relation][VALUE])
+
+        if do_reset:
+            for term_id in term_graph.post_order_dfs_from(relation_name):
+                term_graph.set_node_attribute(term_id, STATE, EvalState.NOT_COMPUTED)
         else:
-            action = node_type_to_action[parse_node_type]
-            action(parse_node_attrs.get(VALUE))
+            # the nodes of the rule bodies keep their states, since some of them were computed using the deltas
+            for relation in mutually_recursive:
+                term_graph.set_node_attribute(relation, STATE, EvalState.COMPUTED)
 
-    return query_result
+    # the rewritten program is computed without magic sets, otherwise its query would be rewritten again
+    demand_execution = partial(semi_naive_execution, workers=workers, magic_sets=False) if magic_sets else None
+    return _execute_parse_graph(parse_graph, term_graph, symbol_table, spannerlog_engine, compute_rule, stream_query,
+                                demand_execution)
@@ -382,12 +382,20 @@ class NetxStateGraph(NetxGraph):
         # if the son node is not computed, mark all of its ancestor as not computed as well
         son_term_state = self._graph.nodes[son_id][STATE]
         if son_term_state is EvalState.NOT_COMPUTED:
-            # get all of the ancestors by reversing the graph and using a dfs algorithm from the son term
-            ancestors_graph = nx.dfs_tree(self._graph.reverse(), source=son_id)
-            ancestors_ids = list(ancestors_graph.nodes)
-            # mark all of the ancestors as not computed
-            for ancestor_id in ancestors_ids:
-                self._graph.nodes[ancestor_id][STATE] = EvalState.NOT_COMPUTED
+            self.mark_ancestors_not_computed(son_id)
+
+    def mark_ancestors_not_computed(self, node_id: GraphBase.NodeIdType) -> None:
+        """
+        Marks the node and all of its ancestors as not computed.
+
+        @param node_id: the node to start from.
+        """
+        # get all of the ancestors by reversing the graph and using a dfs algorithm from the node
+        ancestors_graph = nx.dfs_tree(self._graph.reverse(), source=node_id)
+        ancestors_ids = list(ancestors_graph.nodes)
+        # mark all of the ancestors as not computed
+        for ancestor_id in ancestors_ids:
+            self._graph.nodes[ancestor_id][STATE] = EvalState.NOT_COMPUTED
 
     def _get_node_string(self, node_id: GraphBase.NodeIdType) -> str:
         node_attrs = self.get_node_attributes(node_id)
@@ -423,12 +431,86 @@ class DependencyGraph(NetxGraph):
     In this case the dependency graph will be: <br>
     **Nodes** = {A, B, C, D} (all the rule relations) <br>
     **Edges** = {(B, C), (C, B), (D, C)}
+
+    The graph keeps its condensation (the DAG of its strongly connected components), which is computed once and is
+    updated when dependencies are added, so the recursion structure of the program isn't computed again on every query.
     """
     
     
 
     def __init__(self) -> None:
         super().__init__()
+        # the condensation of the graph, computed on the first use. it is recomputed only after dependencies are removed
+        self._condensation: Optional[nx.DiGraph] = None
+        self._component_ids = count()
+        # maps a relation name to its strata, see `get_strata`
+        self._strata: Dict[str, List[Set[str]]] = {}
+
+    def _get_condensation(self) -> nx.DiGraph:
+        """
+        @return: the condensation of the graph. its nodes are the components, the `members` attribute of a component
+        is the set of its relations, and the `mapping` attribute of the condensation maps each relation to its component.
+        """
+        if self._condensation is None:
+            self._condensation = nx.condensation(self._graph)
+            self._component_ids = count(len(self._condensation))
+        return self._condensation
+
+    def _invalidate_condensation(self) -> None:
+        self._condensation = None
+        self._strata.clear()
+
+    def _add_condensation_node(self, node_id: GraphBase.NodeIdType) -> None:
+        """
+        Adds a new node to the condensation (if it was computed), as a component of its own.
+
+        @param node_id: the node that was added to the graph.
+        """
+        condensation = self._condensation
+        if condensation is None or node_id in condensation.graph["mapping"]:
+            return
+
+        component = next(self._component_ids)
+        condensation.add_node(component, members={node_id})
+        condensation.graph["mapping"][node_id] = component
+
+    def _add_condensation_edge(self, source_id: GraphBase.NodeIdType, target_id: GraphBase.NodeIdType) -> None:
+        """
+        Updates the condensation (if it was computed) after an edge was added to the graph.
+        if the edge closes a cycle, all the components on the cycle are merged into a single component.
+
+        @param source_id: the source of the new edge.
+        @param target_id: the target of the new edge.
+        """
+        condensation = self._condensation
+        if condensation is None:
+            return
+
+        mapping = condensation.graph["mapping"]
+        source_component, target_component = mapping[source_id], mapping[target_id]
+        if source_component == target_component or condensation.has_edge(source_component, target_component):
+            return
+
+        self._strata.clear()
+        if not nx.has_path(condensation, target_component, source_component):
+            condensation.add_edge(source_component, target_component)
+            return
+
+        # the components on the paths from the target to the source are on a cycle with the new edge
+        cycle_components = ((nx.descendants(condensation, target_component) | {target_component}) &
+                            (nx.ancestors(condensation, source_component) | {source_component}))
+        merged_component = next(self._component_ids)
+        members = set().union(*(condensation.nodes[component]["members"] for component in cycle_components))
+        edges = ([(predecessor, merged_component) for component in cycle_components
+                  for predecessor in condensation.predecessors(component) if predecessor not in cycle_components] +
+                 [(merged_component, successor) for component in cycle_components
+                  for successor in condensation.successors(component) if successor not in cycle_components])
+
+        condensation.remove_nodes_from(cycle_components)
+        condensation.add_node(merged_component, members=members)
+        condensation.add_edges_from(edges)
+        for member in members:
+            mapping[member] = merged_component
 
     def _add_relation(self, relation: Relation) -> None:
         """
@@ -443,6 +525,8 @@ class DependencyGraph(NetxGraph):
 
         self.add_node(node_id=relation.relation_name)
         self.add_edge(self._root_id, relation.relation_name)
+        self._add_condensation_node(relation.relation_name)
+        self._add_condensation_edge(self._root_id, relation.relation_name)
 
     def is_dependent(self, head_rel: Relation, body_rel: Relation) -> bool:
         """
@@ -456,6 +540,9 @@ class DependencyGraph(NetxGraph):
             is_dependent(A, B), is_dependent(A, C) and is_dependent(B, A) will return True.
             On the other hand, is_dependent(C, A) will return False.
 
+        a body relation is a dependency even if it has no free var in common with the head (e.g. `C` in
+        `A(X) <- B(X), C(Y)`), since it has to be computed before the head.
+
         @param head_rel: the head relation.
         @param body_rel: a body relation.
         @return: True if they are dependent, False otherwise.
@@ -464,8 +551,7 @@ class DependencyGraph(NetxGraph):
         if head_rel.relation_name == body_rel.relation_name:
             return False
 
-        common_free_vars = set(head_rel.term_list).intersection(body_rel.term_list)
-        return self.is_contains_node(body_rel.relation_name) and len(common_free_vars) > 0
+        return self.is_contains_node(body_rel.relation_name)
 
     def add_dependencies(self, head_relation: Relation, body_relations: Set[Relation]) -> None:
         """
@@ -479,11 +565,12 @@ class DependencyGraph(NetxGraph):
 
         for body_relation in body_relations:
 
-            # add edge only if there is at least one free var in relation
+            # add edge only if the body relation is a rule relation
             if self.is_dependent(head_relation, body_relation):
                 edge = (head_relation.relation_name, body_relation.relation_name)
                 num_of_edges = 1 + self._graph.get_edge_data(*edge, default={"amount": 0})["amount"]
                 self.add_edge(*edge, amount=num_of_edges)
+                self._add_condensation_edge(*edge)
 
     def remove_relation(self, relation_name: str) -> None:
         """
@@ -493,6 +580,7 @@ class DependencyGraph(NetxGraph):
         """
 
         self._graph.remove_node(relation_name)
+        self._invalidate_condensation()
 
     def remove_rule(self, rule: Rule) -> None:
         """
@@ -510,6 +598,8 @@ class DependencyGraph(NetxGraph):
                 num_of_edges = self._graph.get_edge_data(*edge)["amount"]
                 if num_of_edges == 1:
                     self._graph.remove_edge(*edge)
+                    # removing an edge might split a component
+                    self._invalidate_condensation()
                 else:
                     self.add_edge(*edge, amount=num_of_edges - 1)
 
@@ -521,9 +611,27 @@ class DependencyGraph(NetxGraph):
         @return: a set of relations names (including the input relation).
         """
 
-        scc = nx.strongly_connected_components(self._graph)
-        names_component, = filter(lambda component: relation_name in component, scc)
-        return set(names_component)
+        condensation = self._get_condensation()
+        return set(condensation.nodes[condensation.graph["mapping"][relation_name]]["members"])
+
+    def get_strata(self, relation_name: str) -> List[Set[str]]:
+        """
+        Finds the strata of the relation, i.e. the sets of mutually recursive relations that it depends on (including
+        its own set), in the order they should be computed: each set only depends on the sets that come before it.
+        the strata are cached until the dependencies change.
+
+        @param relation_name: the name of the relation.
+        @return: a list of sets of relations names, the last one is the set of the input relation.
+        """
+        if relation_name not in self._strata:
+            condensation = self._get_condensation()
+            component = condensation.graph["mapping"][relation_name]
+            components = nx.descendants(condensation, component) | {component}
+            # a relation points to the relations it depends on, so they come after it in a topological sort
+            sorted_components = reversed(list(nx.topological_sort(condensation.subgraph(components))))
+            self._strata[relation_name] = [condensation.nodes[component]["members"] for component in sorted_components]
+
+        return self._strata[relation_name]
 
     def _get_node_string(self, node_id: GraphBase.NodeIdType) -> str:
         # for nicer printing format
@@ -543,7 +651,7 @@ class DependencyGraph(NetxGraph):
     def __str__(self) -> str:
         return self.__class__.__name__ + " is:\n" + super().__str__()
 
-# %% ../nbs/03c_graphs.ipynb 36
+# %% ../nbs/03c_graphs.ipynb 38
 class TermGraphBase(NetxStateGraph, metaclass=ABCMeta):
     """
     A wrapper to `NetxStateGraph` that adds utility functions which are independent
@@ -636,6 +744,14 @@ class TermGraphBase(NetxStateGraph, metaclass=ABCMeta):
                 print(f"\t{i + 1}. {rule}")
                 i += 1
 
+    def get_rules(self,
+                  relation_name: str # the name of a rule relation
+                  ) -> List[Rule]: # the rules with the given head, an empty list if it isn't a rule relation
+        """
+        Gets all the registered rules with the given head.
+        """
+        return [rule for rule, _ in self._rule_to_nodes.values() if rule.head_relation.relation_name == relation_name]
+
     def get_mutually_recursive_relations(self, 
                                          relation_name: str # relation name that you want to get its mutually recursive relations
                                          ) -> Set[str]: # A set of mutually recursive relations with the given relation name
@@ -644,11 +760,68 @@ class TermGraphBase(NetxStateGraph, metaclass=ABCMeta):
         """
         return self._dependency_graph.get_mutually_recursive_relations(relation_name)
 
+    def get_strata(self,
+                   relation_name: str # the name of a rule relation
+                   ) -> List[Set[str]]: # sets of mutually recursive relations, in the order they should be computed
+        """
+        See documentation of `get_strata` in `DependencyGraph`
+        """
+        return self._dependency_graph.get_strata(relation_name)
+
+    def invalidate_relation(self,
+                            relation_name: str # the name of a changed relation (a base relation, a rule relation or an ie function)
+                            ) -> None:
+        """
+        Marks all the nodes that depend on the given relation as not computed. <br>
+        The execution keeps the computed rule relations between queries, so this function must be called whenever
+        a relation is changed (e.g. a fact was added, or an ie function was registered again).
+        rule relations that don't depend on the relation are not affected.
+        """
+        changed_nodes = []
+        for node_id in self.post_order_dfs():
+            node_attrs = self[node_id]
+            if node_attrs[TYPE] in (TermNodeType.GET_REL, TermNodeType.CALC) and \
+                    node_attrs[VALUE].relation_name == relation_name:
+                changed_nodes.append(node_id)
+
+        # the rules of a rule relation might have changed, so we start from its union node
+        if self.is_contains_node(relation_name):
+            changed_nodes.extend(self.get_children(relation_name))
+
+        for node_id in changed_nodes:
+            self.mark_ancestors_not_computed(node_id)
+
+    def get_dependent_relations(self,
+                                relation_name: str # the name of a relation (a base relation or a rule relation)
+                                ) -> List[Set[str]]: # sets of mutually recursive rule relations, in the order they should be computed
+        """
+        Finds all the rule relations that use the given relation, directly or through other rule relations. <br>
+        The relations are grouped into sets of mutually recursive relations, and each set only depends on the
+        sets that come before it.
+        """
+        dependencies = nx.DiGraph()
+        dependencies.add_node(relation_name)
+        relations_to_visit = [relation_name]
+        while relations_to_visit:
+            body_relation_name = relations_to_visit.pop()
+            for rule, _ in self._rule_to_nodes.values():
+                if all(relation.relation_name != body_relation_name for relation in rule.body_relation_list):
+                    continue
+
+                head_relation_name = rule.head_relation.relation_name
+                if head_relation_name not in dependencies:
+                    relations_to_visit.append(head_relation_name)
+                dependencies.add_edge(body_relation_name, head_relation_name)
+
+        condensed_dependencies = nx.condensation(dependencies)
+        components = [condensed_dependencies.nodes[component_id]["members"]
+                      for component_id in nx.topological_sort(condensed_dependencies)]
+        return [component for component in components if component != {relation_name}]
+
     def __str__(self) -> str:
         return super().__str__() + "\n" + str(self._dependency_graph)
 
-
-# %% ../nbs/03c_graphs.ipynb 45
+# %% ../nbs/03c_graphs.ipynb 50
 class TermGraph(TermGraphBase):
     """
         This class is designed to transform each rule node in an spannerlog program into an execution graph. These execution graphs are then added to a term graph. <br>
@@ -686,7 +859,7 @@ class TermGraph(TermGraphBase):
         * **`join_node`**: This node is under the `project_node` and joins all the body relations of the rule. Special cases where this node isn't used include:
             - There's only one relation in the rule's body.
             - None of the body relations have free variables.
-        * **`calc_node`**: Connects each IE relation in the rule's body to the `join_node`. This node itself connects to another `join_node` that links all the bounding relations of the IE relation.
+        * **`calc_node`**: Connects each IE relation in the rule's body to the `join_node`. This node itself connects to another `join_node` that links all the bounding relations of the IE relation, and the body relations that filter them (relations whose free variables all appear in the bounding relations, e.g. a relation with a constant).
         * **`get_rel node`**: Connects each rule relation in the rule's body to the `join_node`. This node is linked to the corresponding rule root.
         * **`select_node`**: Used for relations with the same free variable (e.g., `A(X, X)`) or relations with some constant value (e.g., `A(1, X)`). This node deals with filtering tuples and is connected to the `join_node`.
 
@@ -727,7 +900,8 @@ class TermGraph(TermGraphBase):
                                  ie_relations: Set[IERelation] # set of the ie relations in the rule body
                                  ) -> OrderedDictType[IERelation, Set[Union[Relation, IERelation]]]: # a dictionary that maps each ie function to a set of it's bounding relations
         """
-        This function gets body relations of a rule and computes for each ie relation the relations that bound it.
+        This function gets body relations of a rule and computes for each ie relation the relations that bound it,
+        including the relations that filter the bounding relations.
         """
 
         # holds the ie relation that are bounded
@@ -760,6 +934,14 @@ class TermGraph(TermGraphBase):
 
             # check whether all ie relation's free vars are bounded
             if bounded_vars == ie_input_terms:
+                # the relations whose free vars all appear in the bounding relations only filter them (e.g. `B(X, 1)`
+                # in `C(Z) <- A(X, Y), B(X, 1), ID(Y) -> (Z)`). they are pushed down to the input of the ie relation,
+                # so the ie function only runs on inputs that can contribute to the rule's result
+                bounding_vars = set().union(*map(get_output_free_var_names, bounding_relations_))
+                for relation in relations - bounding_relations_:
+                    rel_terms = get_output_free_var_names(relation)
+                    if rel_terms and rel_terms <= bounding_vars:
+                        bounding_relations_.add(relation)
                 return bounding_relations_
             else:
                 # the ie relation can't be bounded yet
@@ -782,7 +964,7 @@ class TermGraph(TermGraphBase):
 
         return bounding_graph
 
-# %% ../nbs/03c_graphs.ipynb 46
+# %% ../nbs/03c_graphs.ipynb 51
 @patch_method
 def add_relation(self: TermGraph, 
                     relation: Relation # the relation to add
@@ -802,10 +984,12 @@ def add_relation(self: TermGraph,
     self.add_edge(self.get_root_id(), relation_name)
     union_id: GraphBase.NodeIdType = self.add_node(type=TermNodeType.UNION)
     self.add_edge(relation_name, union_id)
+    # the relation is a dependency of the rules that use it, even if they are added before its own rules
+    self._dependency_graph._add_relation(relation)
 
     return union_id
 
-# %% ../nbs/03c_graphs.ipynb 47
+# %% ../nbs/03c_graphs.ipynb 52
 @patch_method
 def get_relation_union_node(self: TermGraph, 
                             relation_name: str # name of a relation
@@ -814,7 +998,7 @@ def get_relation_union_node(self: TermGraph,
     union_id, = self.get_children(relation_name)  # relation has only one child (the union node).
     return union_id
 
-# %% ../nbs/03c_graphs.ipynb 48
+# %% ../nbs/03c_graphs.ipynb 53
 @patch_method
 def add_rule_to_term_graph(self: TermGraph, 
                             rule: Rule # the rule to add
@@ -963,7 +1147,7 @@ def add_rule_to_term_graph(self: TermGraph,
     self._dependency_graph.add_dependencies(head_relation, relations)
 
 
-# %% ../nbs/03c_graphs.ipynb 49
+# %% ../nbs/03c_graphs.ipynb 54
 @patch_method
 def remove_rule(self: TermGraph, 
                 rule: str # the rule to remove. unlike add_rule, here rule should be string as it is a user input
@@ -1000,4 +1184,6 @@ def remove_rule(self: TermGraph,
         self._dependency_graph.remove_relation(rule_name)
         return True
 
+    # the relation lost one of its rules, so it (and everything that depends on it) must be recomputed
+    self.invalidate_relation(rule_name)
     return False
@@ -0,0 +1,192 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../../nbs/ie_func/04e_lexicon.ipynb.
+
+# %% auto 0
+__all__ = ['LEXICON_CACHE_SIZE', 'LEXICON_OUT_TYPES', 'LEXICON', 'LEXICON_IGNORE_CASE', 'Lexicon', 'load_lexicon',
+           'lexicon_match', 'lexicon_match_ignore_case', 'lexicon_ie']
+
+# %% ../../nbs/ie_func/04e_lexicon.ipynb 3
+import hashlib
+import os
+from collections import deque
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Iterator, Sequence, Dict, List, Tuple, Union
+
+from ..primitive_types import DataTypes
+
+# %% ../../nbs/ie_func/04e_lexicon.ipynb 4
+# the maximal number of lexicon files whose automatons are kept for reuse
+LEXICON_CACHE_SIZE = 32
+
+LEXICON_OUT_TYPES = [DataTypes.integer, DataTypes.span]
+
+# %% ../../nbs/ie_func/04e_lexicon.ipynb 5
+class Lexicon:
+    """
+    An Aho-Corasick automaton, which finds all of the occurrences of a set of terms in a text in a single pass.
+    the time it takes to search a text depends on the length of the text and the number of matches,
+    but not on the number of terms, so it scales to lexicons with many thousands of terms.
+    """
+
+    def __init__(self,
+                 terms: Iterable[str], # the terms of the lexicon, the id of each term is its index. empty terms are ignored
+                 ignore_case: bool = False, # whether the terms are matched regardless of their case
+                 whole_words: bool = False # whether only matches which are not part of a longer word are found
+                 ):
+        self.ignore_case = ignore_case
+        self.whole_words = whole_words
+
+        # the transitions of each state of the trie, the failure link of each state,
+        # and the (term id, term length) pairs of the terms which end at each state
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._outputs: List[List[Tuple[int, int]]] = [[]]
+
+        digest = hashlib.sha256(f"{ignore_case} {whole_words}".encode())
+        self.term_count = 0
+        for term_id, term in enumerate(terms):
+            self.term_count += 1
+            digest.update(f"\n{term}".encode())
+            if term:
+                self._add_term(term_id, self._fold(term))
+        self.digest = digest.hexdigest()
+
+        self._add_failure_links()
+
+    def __repr__(self) -> str:
+        # the digest identifies the lexicon's terms and options
+        return f"Lexicon({self.term_count} terms, {self.digest})"
+
+    def _fold(self, text: str) -> str:
+        # case folding may change the length of a string (e.g. "ß" becomes "ss"), but the spans of the matches
+        # must refer to the original text, so characters whose folded form is longer are kept as is
+        if not self.ignore_case:
+            return text
+        folded = text.casefold()
+        if len(folded) == len(text):
+            return folded
+        return "".join(char if len(folded_char := char.casefold()) != 1 else folded_char for char in text)
+
+    def _add_term(self, term_id: int, term: str) -> None:
+        state = 0
+        for char in term:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+                self._goto[state][char] = next_state
+            state = next_state
+        self._outputs[state].append((term_id, len(term)))
+
+    def _add_failure_links(self) -> None:
+        # the failure link of a state points to the state of its longest proper suffix that is in the trie.
+        # the states are visited in breadth first order, so the failure links of shorter prefixes are already known
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail != 0 and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                # a state also outputs the terms of the states its failure link points to
+                self._outputs[next_state] = self._outputs[next_state] + self._outputs[self._fail[next_state]]
+
+    def find(self, text: str # the text in which the terms are searched
+             ) -> Iterator[Tuple[int, Tuple[int, int]]]: # (term id, span) pairs, ordered by the end of the span
+        """
+        Finds all of the occurrences of the lexicon's terms in the text, including overlapping occurrences.
+        """
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        state = 0
+        for end, char in enumerate(self._fold(text), start=1):
+            while state != 0 and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for term_id, term_length in outputs[state]:
+                start = end - term_length
+                if self.whole_words and not _is_whole_word(text, start, end):
+                    continue
+                yield term_id, (start, end)
+
+# %% ../../nbs/ie_func/04e_lexicon.ipynb 7
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+def _is_whole_word(text: str, start: int, end: int) -> bool:
+    return (start == 0 or not _is_word_char(text[start - 1])) and (end == len(text) or not _is_word_char(text[end]))
+
+# %% ../../nbs/ie_func/04e_lexicon.ipynb 8
+@lru_cache(maxsize=LEXICON_CACHE_SIZE)
+def _load_lexicon(lexicon_file: str, modified_time: int, size: int, ignore_case: bool, whole_words: bool) -> Lexicon:
+    # the modification time and size are a part of the key, so a lexicon file that was changed is loaded again
+    with open(lexicon_file, encoding="utf-8") as f:
+        return Lexicon((line.strip() for line in f), ignore_case, whole_words)
+
+def load_lexicon(lexicon_file: Union[str, Path], # a file with a term in each line
+                 ignore_case: bool = False, # whether the terms are matched regardless of their case
+                 whole_words: bool = True # whether only matches which are not part of a longer word are found
+                 ) -> Lexicon: # the automaton of the lexicon
+    """
+    Loads a lexicon file. the automaton of each file is built once, and built again only if the file is changed.
+    the id of a term is the index of its line (starting at 0).
+    """
+    lexicon_path = Path(lexicon_file).resolve()
+    stat = lexicon_path.stat()
+    return _load_lexicon(str(lexicon_path), stat.st_mtime_ns, stat.st_size, ignore_case, whole_words)
+
+# %% ../../nbs/ie_func/04e_lexicon.ipynb 9
+def lexicon_match(text: str, lexicon_file: str) -> Iterable[Sequence]:
+    """
+    An IE function which finds the terms of a lexicon file as whole words in the text.
+
+    @param text: The input text.
+    @param lexicon_file: a file with a term in each line.
+    @return: tuples of the id of a term (the index of its line) and the span of its occurrence.
+    """
+    return load_lexicon(lexicon_file).find(text)
+
+# %% ../../nbs/ie_func/04e_lexicon.ipynb 10
+LEXICON = dict(ie_function=lexicon_match,
+               ie_function_name='lexicon_match',
+               in_rel=[DataTypes.string, DataTypes.string],
+               out_rel=LEXICON_OUT_TYPES,
+               # the outputs depend on the content of the file, not only on its name
+               cacheable=False)
+
+# %% ../../nbs/ie_func/04e_lexicon.ipynb 11
+def lexicon_match_ignore_case(text: str, lexicon_file: str) -> Iterable[Sequence]:
+    """
+    Same as `lexicon_match`, but the terms are matched regardless of their case.
+    """
+    return load_lexicon(lexicon_file, ignore_case=True).find(text)
+
+# %% ../../nbs/ie_func/04e_lexicon.ipynb 12
+LEXICON_IGNORE_CASE = dict(ie_function=lexicon_match_ignore_case,
+                           ie_function_name='lexicon_match_ignore_case',
+                           in_rel=[DataTypes.string, DataTypes.string],
+                           out_rel=LEXICON_OUT_TYPES,
+                           cacheable=False)
+
+# %% ../../nbs/ie_func/04e_lexicon.ipynb 13
+def lexicon_ie(terms: Iterable[str], # the terms of the lexicon, e.g. a column of a relation. the id of each term is its index
+               ie_function_name: str, # the name under which the ie function is registered
+               ignore_case: bool = False, # whether the terms are matched regardless of their case
+               whole_words: bool = True # whether only matches which are not part of a longer word are found
+               ) -> Dict: # the arguments of `Session.register`
+    """
+    Creates an ie function which finds the given terms in a text, and returns (term id, span) tuples.
+    the automaton is built once, when the function is created.
+    """
+    lexicon = Lexicon(terms, ignore_case, whole_words)
+
+    def lexicon_ie_function(text: str) -> Iterable[Sequence]:
+        return lexicon.find(text)
+
+    return dict(ie_function=lexicon_ie_function,
+                ie_function_name=ie_function_name,
+                in_rel=[DataTypes.string],
+                out_rel=LEXICON_OUT_TYPES)
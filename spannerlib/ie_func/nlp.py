@@ -1,29 +1,44 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../../nbs/ie_func/04b_nlp.ipynb.
 
 # %% auto 0
-__all__ = ['JAVA_MIN_VERSION', 'NLP_URL', 'NLP_DIR_NAME', 'CURR_DIR', 'NLP_DIR_PATH', 'JAVA_DOWNLOADER', 'INSTALLATION_PATH',
-           'STANFORD_ZIP_GOOGLE_DRIVE_ID', 'STANFORD_ZIP_NAME', 'STANFORD_ZIP_PATH', 'logger', 'CoreNLPEngine',
-           'Tokenize', 'SSplit', 'POS', 'Lemma', 'NER', 'EntityMentions', 'RGXNer', 'TokensRegex', 'CleanXML', 'Parse',
-           'DepParse', 'Coref', 'OpenIE', 'KBP', 'Quote', 'Sentiment', 'TrueCase', 'UDFeats',
-           'download_and_install_nlp', 'tokenize_wrapper', 'ssplit_wrapper', 'pos_wrapper', 'lemma_wrapper',
-           'ner_wrapper', 'entitymentions_wrapper', 'regexner_wrapper', 'tokensregex_wrapper', 'cleanxml_wrapper',
-           'parse_wrapper', 'dependency_parse_wrapper', 'coref_wrapper', 'openie_wrapper', 'kbp_wrapper',
-           'quote_wrapper', 'sentiment_wrapper', 'truecase_wrapper', 'udfeats_wrapper']
+__all__ = ['JAVA_MIN_VERSION', 'NLP_URL', 'NLP_DIR_NAME', 'CURR_DIR', 'NLP_DIR_PATH', 'JAVA_DOWNLOADER',
+           'INSTALLATION_PATH', 'STANFORD_ZIP_GOOGLE_DRIVE_ID', 'STANFORD_ZIP_NAME', 'STANFORD_ZIP_PATH',
+           'DEFAULT_ANNOTATION_CACHE_SIZE', 'SHARED_ANNOTATORS', 'REQUIRED_ANNOTATORS', 'DEFAULT_NLP_BATCH_SIZE',
+           'DEFAULT_NLP_WORKERS', 'MAX_NLP_REQUEST_CHARS', 'DOCUMENT_SEPARATOR', 'DOCUMENT_ANNOTATORS',
+           'DEFAULT_NLP_POOL_SIZE', 'DEFAULT_NLP_MEMORY', 'DEFAULT_NLP_HEALTH_CHECK_INTERVAL',
+           'NLP_HEALTH_CHECK_TIMEOUT', 'NLP_WARM_UP_TEXT', 'logger', 'CoreNLPEngine', 'annotation_cache', 'Tokenize',
+           'SSplit', 'POS', 'Lemma', 'NER', 'EntityMentions', 'RGXNer', 'TokensRegex', 'CleanXML', 'Parse',
+           'DepParse', 'Coref', 'OpenIE', 'KBP', 'Quote', 'Sentiment', 'TrueCase', 'UDFeats', 'CoreNLPPool',
+           'download_and_install_nlp', 'AnnotationCache', 'set_annotation_cache', 'tokenize_wrapper',
+           'tokenize_batch', 'ssplit_wrapper', 'ssplit_batch', 'pos_wrapper', 'pos_batch', 'lemma_wrapper',
+           'lemma_batch', 'ner_wrapper', 'ner_batch', 'entitymentions_wrapper', 'entitymentions_batch',
+           'regexner_wrapper', 'tokensregex_wrapper', 'cleanxml_wrapper', 'parse_wrapper', 'parse_batch',
+           'dependency_parse_wrapper', 'dependency_parse_batch', 'coref_wrapper', 'openie_wrapper', 'openie_batch',
+           'kbp_wrapper', 'quote_wrapper', 'sentiment_wrapper', 'sentiment_batch', 'truecase_wrapper',
+           'truecase_batch', 'udfeats_wrapper']
 
 # %% ../../nbs/ie_func/04b_nlp.ipynb 3
+import hashlib
 import json
 import logging
+import sqlite3 as sqlite
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
 from io import BytesIO
+from itertools import accumulate
 from os import popen
 from pathlib import Path
-from typing import Iterator
+from typing import Iterator, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
 from zipfile import ZipFile
 import os
 import configparser
 
 import jdk
+import requests
 from spanner_nlp.StanfordCoreNLP import StanfordCoreNLP
 
+from ..ie_function import IEFunction
 from ..primitive_types import DataTypes
 from ..utils import download_file_from_google_drive, get_base_file_path, get_lib_name
 
@@ -42,6 +57,31 @@ STANFORD_ZIP_GOOGLE_DRIVE_ID = "1QixGiHD2mHKuJtB69GHDQA0wTyXtHzjl"
 STANFORD_ZIP_NAME = "stanford-corenlp-4.1.0.zip"
 STANFORD_ZIP_PATH = CURR_DIR / STANFORD_ZIP_NAME
 
+DEFAULT_ANNOTATION_CACHE_SIZE = 256
+# the annotators of the token level wrappers, whose models are loaded when a server starts
+SHARED_ANNOTATORS = ('tokenize', 'ssplit', 'pos', 'lemma', 'ner')
+# the annotators that every other annotator requires, so CoreNLP runs them along with any of them
+REQUIRED_ANNOTATORS = ('tokenize', 'ssplit')
+
+# the number of documents that are sent to CoreNLP in a single request, and the number of requests in flight
+DEFAULT_NLP_BATCH_SIZE = 32
+DEFAULT_NLP_WORKERS = 4
+# the server refuses to annotate longer texts (its `maxCharLength`), so larger batches are sent in several requests
+MAX_NLP_REQUEST_CHARS = 100000
+# documents in a request are joined by a blank line, which CoreNLP always treats as a sentence break
+DOCUMENT_SEPARATOR = '\n\n'
+# annotators whose outputs refer to the whole document, documents that need them get a request of their own
+DOCUMENT_ANNOTATORS = ('coref', 'kbp', 'quote')
+
+# the number of CoreNLP servers that are started by `download_and_install_nlp`, and the jvm heap of each one
+DEFAULT_NLP_POOL_SIZE = 1
+DEFAULT_NLP_MEMORY = '4g'
+# seconds between the health checks of the servers, and the time a server has to answer one
+DEFAULT_NLP_HEALTH_CHECK_INTERVAL = 30
+NLP_HEALTH_CHECK_TIMEOUT = 5
+# annotated by every server on startup, so the models of its annotators are loaded before the first real request
+NLP_WARM_UP_TEXT = 'Warm up the server.'
+
 # %% ../../nbs/ie_func/04b_nlp.ipynb 5
 logger = logging.getLogger(__name__)
 
@@ -86,151 +126,618 @@ def _run_installation() -> None:
             raise IOError("installation failed")
 
 # %% ../../nbs/ie_func/04b_nlp.ipynb 10
-CoreNLPEngine = None
-def download_and_install_nlp():
+class CoreNLPPool:
+    """
+    A pool of warm CoreNLP servers on localhost.
+
+    every request is sent to the least loaded server (or to the next one, round robin).
+    a server that fails a request or a health check is restarted, and the failed request is retried.
+    a new server annotates `NLP_WARM_UP_TEXT` before it gets requests, so its models are already loaded.
+    """
+    DISPATCH_LEAST_LOADED = 'least_loaded'
+    DISPATCH_ROUND_ROBIN = 'round_robin'
+    DISPATCHES = (DISPATCH_LEAST_LOADED, DISPATCH_ROUND_ROBIN)
+
+    def __init__(self,
+                 size: int = DEFAULT_NLP_POOL_SIZE, # the number of servers
+                 memory: str = DEFAULT_NLP_MEMORY, # the maximal heap of every server, e.g. '4g'
+                 preload_annotators: Sequence[str] = SHARED_ANNOTATORS, # the annotators whose models are loaded on startup
+                 dispatch: str = DISPATCH_LEAST_LOADED, # how a server is chosen for a request, one of `DISPATCHES`
+                 health_check_interval: Optional[float] = DEFAULT_NLP_HEALTH_CHECK_INTERVAL, # seconds between health checks, None disables them
+                 max_retries: int = 2, # the number of times a failed request is retried after restarting its server
+                 server_factory: Optional[Callable[[], StanfordCoreNLP]] = None # starts a server, by default from `NLP_DIR_PATH`
+                 ):
+        if size < 1:
+            raise ValueError(f"a pool needs at least one server, got {size}")
+        if dispatch not in CoreNLPPool.DISPATCHES:
+            raise ValueError(f"unknown dispatch {dispatch}, expected one of {CoreNLPPool.DISPATCHES}")
+        self.size = size
+        self.memory = memory
+        self.preload_annotators = tuple(preload_annotators)
+        self.dispatch = dispatch
+        self.health_check_interval = health_check_interval
+        self.max_retries = max_retries
+        self.restarts = 0
+        self._server_factory = server_factory or (lambda: StanfordCoreNLP(NLP_DIR_PATH, memory=memory))
+        self._lock = threading.Lock()
+        # servers are started one by one, so that each one picks a port that is still free
+        self._servers = [self._start_server() for _ in range(size)]
+        self._loads = [0] * size
+        self._restarting = set()
+        self._next = 0
+        self._closed = threading.Event()
+        self._health_thread: Optional[threading.Thread] = None
+        if health_check_interval is not None:
+            self._health_thread = threading.Thread(target=self._check_health_periodically, daemon=True)
+            self._health_thread.start()
+
+    def __len__(self) -> int:
+        return len(self._servers)
+
+    def _start_server(self) -> StanfordCoreNLP:
+        server = self._server_factory()
+        server.getDataForAnnotatorsWrapper(server.url, ','.join(self.preload_annotators), NLP_WARM_UP_TEXT)
+        return server
+
+    def _acquire(self) -> Tuple[int, StanfordCoreNLP]:
+        with self._lock:
+            # a server that is being restarted gets no requests, unless all of them are
+            candidates = [index for index in range(self.size) if index not in self._restarting] or list(range(self.size))
+            if self.dispatch == CoreNLPPool.DISPATCH_ROUND_ROBIN:
+                index = min(candidates, key=lambda index: (index - self._next) % self.size)
+            else:
+                # ties are broken round robin, so an idle pool still spreads its requests
+                index = min(candidates, key=lambda index: (self._loads[index], (index - self._next) % self.size))
+            self._next = (index + 1) % self.size
+            self._loads[index] += 1
+            return index, self._servers[index]
+
+    def _release(self, index: int) -> None:
+        with self._lock:
+            self._loads[index] -= 1
+
+    def restart(self, index: int # the index of the server to restart
+                ) -> None:
+        """
+        Replaces a server with a new one, unless it is already being restarted.
+        """
+        with self._lock:
+            if index in self._restarting:
+                return
+            self._restarting.add(index)
+            server = self._servers[index]
+        try:
+            server.close()
+            new_server = self._start_server()
+            with self._lock:
+                self._servers[index] = new_server
+                self.restarts += 1
+        finally:
+            with self._lock:
+                self._restarting.discard(index)
+
+    def annotate(self,
+                 text: str, # the text to annotate
+                 annotators: str # comma separated annotators
+                 ) -> Dict: # the json annotation of the text
+        """
+        Annotates a text on one of the servers, restarting the server and retrying if it can't be reached.
+        """
+        for attempt in range(self.max_retries + 1):
+            index, server = self._acquire()
+            try:
+                return server.getDataForAnnotatorsWrapper(server.url, annotators, text)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.max_retries:
+                    raise
+                logger.warning(f"CoreNLP server {server.url} failed, restarting it")
+            finally:
+                self._release(index)
+            self.restart(index)
+
+    @staticmethod
+    def _is_healthy(server: StanfordCoreNLP) -> bool:
+        process = getattr(server, 'p', None)
+        if process is not None and process.poll() is not None:
+            return False
+        try:
+            return requests.get(f"{server.url}/live", timeout=NLP_HEALTH_CHECK_TIMEOUT).ok
+        except requests.RequestException:
+            return False
+
+    def check_health(self) -> List[bool]: # whether each server was healthy
+        """
+        Checks that every server is alive and answers, restarting the ones that don't.
+        """
+        health = [self._is_healthy(server) for server in list(self._servers)]
+        for index, is_healthy in enumerate(health):
+            if not is_healthy:
+                logger.warning(f"CoreNLP server {self._servers[index].url} failed a health check, restarting it")
+                self.restart(index)
+        return health
+
+    def _check_health_periodically(self) -> None:
+        while not self._closed.wait(self.health_check_interval):
+            try:
+                self.check_health()
+            except Exception:
+                logger.exception("CoreNLP health check failed")
+
+    def close(self) -> None:
+        """
+        Stops the health checks and all of the servers.
+        """
+        self._closed.set()
+        for server in self._servers:
+            server.close()
+
+# %% ../../nbs/ie_func/04b_nlp.ipynb 15
+CoreNLPEngine: Optional[CoreNLPPool] = None
+def download_and_install_nlp(pool_size: int = DEFAULT_NLP_POOL_SIZE, # the number of CoreNLP servers to run
+                             memory: str = DEFAULT_NLP_MEMORY, # the maximal heap of every server, e.g. '4g'
+                             **pool_kwargs # more arguments of `CoreNLPPool`
+                             ):
+    """
+    Installs CoreNLP and java if needed, and starts the pool of servers that the nlp ie functions use.
+    """
     global CoreNLPEngine
     try:
         _run_installation()
-        CoreNLPEngine = StanfordCoreNLP(NLP_DIR_PATH)
+        if CoreNLPEngine is not None:
+            CoreNLPEngine.close()
+        CoreNLPEngine = CoreNLPPool(pool_size, memory, **pool_kwargs)
     except:
         logger.error("Installation NLP failed")
 
-# %% ../../nbs/ie_func/04b_nlp.ipynb 11
+# %% ../../nbs/ie_func/04b_nlp.ipynb 16
+class AnnotationCache:
+    """
+    A per document cache of CoreNLP annotations that is shared by all of the nlp wrappers.
+
+    a document is annotated with the union of the annotators that were requested for it so far, so no annotator runs
+    unless a wrapper needs it, and every wrapper reads its own layer out of the same json.
+    annotations are kept in a bounded in-memory LRU and, if a path is given, also in an sqlite file,
+    keyed by a hash of the document's content.
+    """
+
+    def __init__(self,
+                 max_size: int = DEFAULT_ANNOTATION_CACHE_SIZE, # the maximal number of documents that are kept in memory
+                 path: Optional[Union[str, Path]] = None # an sqlite file in which all of the annotations are persisted
+                 ):
+        if max_size < 0:
+            raise ValueError(f"cache size can't be negative, got {max_size}")
+        self.max_size = max_size
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, Tuple[Tuple[str, ...], Dict]] = OrderedDict()
+        # wrappers may be called from the threads of an ie function executor
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite.Connection] = None
+        if path is not None:
+            self._connection = sqlite.connect(str(path), check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS nlp_annotations (key TEXT PRIMARY KEY, annotators TEXT, annotation TEXT)")
+            self._connection.commit()
+
+    def __del__(self) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def get_key(text: str # a document
+                ) -> str: # the key of the document's annotation
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def _get(self, key: str) -> Optional[Tuple[Tuple[str, ...], Dict]]:
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+        if self._connection is not None:
+            row = self._connection.execute(
+                "SELECT annotators, annotation FROM nlp_annotations WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                entry = tuple(row[0].split(',')), json.loads(row[1])
+                self._put_in_memory(key, entry)
+                return entry
+        return None
+
+    def _put_in_memory(self, key: str, entry: Tuple[Tuple[str, ...], Dict]) -> None:
+        if self.max_size == 0:
+            return
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def _put_many(self, entries: Dict[str, Tuple[Tuple[str, ...], Dict]]) -> None:
+        for key, entry in entries.items():
+            self._put_in_memory(key, entry)
+        if self._connection is not None and len(entries) != 0:
+            self._connection.executemany("INSERT OR REPLACE INTO nlp_annotations VALUES (?, ?, ?)",
+                                         [(key, ','.join(annotators), json.dumps(annotation))
+                                          for key, (annotators, annotation) in entries.items()])
+            self._connection.commit()
+
+    @staticmethod
+    def _get_covered_annotators(annotators: Iterable[str]) -> Set[str]:
+        # the layers of an annotation, including those of the annotators that CoreNLP ran as requirements
+        covered_annotators = set(annotators)
+        if covered_annotators - {'tokenize'}:
+            covered_annotators.update(REQUIRED_ANNOTATORS)
+        return covered_annotators
+
+    def annotate_many(self,
+                      texts: Sequence[str], # the documents to annotate
+                      annotators: Iterable[str], # the annotators whose layers are needed
+                      annotate_func: Callable[[List[str], str], List[Dict]] # runs CoreNLP on documents with comma separated annotators
+                      ) -> List[Dict]: # the json annotation of each document
+        """
+        Returns the annotations of documents, calling `annotate_func` once per set of annotators on all of the documents
+        whose cached annotators don't cover `annotators`.
+        """
+        annotators = tuple(annotators)
+        keys = [self.get_key(text) for text in texts]
+        annotations: Dict[str, Dict] = {}
+        # the documents to annotate, grouped by the annotators that they will be annotated with
+        missing: Dict[Tuple[str, ...], Dict[str, str]] = {}
+        with self._lock:
+            for key, text in dict(zip(keys, texts)).items():
+                entry = self._get(key)
+                if entry is not None and set(annotators) <= self._get_covered_annotators(entry[0]):
+                    self.hits += 1
+                    annotations[key] = entry[1]
+                    continue
+                self.misses += 1
+                # re-annotating with the cached annotators as well keeps the layers other wrappers already read
+                cached_annotators = entry[0] if entry is not None else ()
+                union = tuple(dict.fromkeys([*cached_annotators, *annotators]))
+                missing.setdefault(union, {})[key] = text
+
+        for union, documents in missing.items():
+            new_annotations = dict(zip(documents, annotate_func(list(documents.values()), ','.join(union))))
+            with self._lock:
+                self._put_many({key: (union, annotation) for key, annotation in new_annotations.items()})
+            annotations.update(new_annotations)
+        return [annotations[key] for key in keys]
+
+    def annotate(self,
+                 text: str, # the document to annotate
+                 annotators: Iterable[str], # the annotators whose layers are needed
+                 annotate_func: Callable[[str, str], Dict] # runs CoreNLP on a document with comma separated annotators
+                 ) -> Dict: # the json annotation of the document
+        """
+        Returns the annotation of a document, running CoreNLP only if none of the cached annotators cover `annotators`.
+        """
+        return self.annotate_many([text], annotators,
+                                  lambda texts, annotators: [annotate_func(texts[0], annotators)])[0]
+
+    def clear(self) -> None:
+        """
+        Removes all of the annotations, from memory and from disk.
+        """
+        with self._lock:
+            self._entries.clear()
+            if self._connection is not None:
+                self._connection.execute("DELETE FROM nlp_annotations")
+                self._connection.commit()
+
+    def close(self) -> None:
+        """
+        Closes the sqlite file of the cache, if there is one.
+        """
+        if getattr(self, '_connection', None) is not None:
+            self._connection.close()
+            self._connection = None
+
+# %% ../../nbs/ie_func/04b_nlp.ipynb 18
+annotation_cache = AnnotationCache()
+
+def set_annotation_cache(cache: AnnotationCache # the cache that all of the nlp wrappers share from now on
+                         ) -> None:
+    """
+    Replaces the annotation cache of the nlp wrappers, e.g. with one that is persisted to disk.
+    """
+    global annotation_cache
+    annotation_cache = cache
+
+# %% ../../nbs/ie_func/04b_nlp.ipynb 19
+def _pack_documents(texts: List[str]) -> Iterator[List[str]]:
+    request: List[str] = []
+    request_length = 0
+    for text in texts:
+        if len(request) != 0 and request_length + len(text) > MAX_NLP_REQUEST_CHARS:
+            yield request
+            request, request_length = [], 0
+        request.append(text)
+        request_length += len(text) + len(DOCUMENT_SEPARATOR)
+    if len(request) != 0:
+        yield request
+
+# %% ../../nbs/ie_func/04b_nlp.ipynb 20
+def _split_annotation(annotation: Dict, # the annotation of documents that were joined by `DOCUMENT_SEPARATOR`
+                      texts: List[str] # the joined documents
+                      ) -> List[Dict]: # the annotation of each document, with offsets relative to that document
+    # CoreNLP counts offsets in utf-16 code units, like java strings do
+    starts = list(accumulate((len(text.encode('utf-16-le')) // 2 + len(DOCUMENT_SEPARATOR) for text in texts[:-1]),
+                             initial=0))
+    documents: List[Dict] = [{'sentences': []} for _ in texts]
+    first_tokens: List[Optional[int]] = [None] * len(texts)
+    token_count = 0
+    for sentence in annotation['sentences']:
+        # a sentence never crosses a separator, so its first token tells which document it belongs to
+        document = bisect_right(starts, sentence['tokens'][0]['characterOffsetBegin']) - 1
+        if first_tokens[document] is None:
+            first_tokens[document] = token_count
+        token_count += len(sentence['tokens'])
+
+        start = starts[document]
+        for item in [*sentence['tokens'], *sentence.get('entitymentions', [])]:
+            item['characterOffsetBegin'] -= start
+            item['characterOffsetEnd'] -= start
+        for mention in sentence.get('entitymentions', []):
+            mention['docTokenBegin'] -= first_tokens[document]
+            mention['docTokenEnd'] -= first_tokens[document]
+        sentence['index'] = len(documents[document]['sentences'])
+        documents[document]['sentences'].append(sentence)
+    return documents
+
+# %% ../../nbs/ie_func/04b_nlp.ipynb 21
+def _annotate_documents(texts: List[str], # the documents to annotate
+                        annotators: str # comma separated annotators
+                        ) -> List[Dict]: # the json annotation of each document
+    if any(annotator in DOCUMENT_ANNOTATORS for annotator in annotators.split(',')):
+        requests = [[text] for text in texts]
+    else:
+        requests = _pack_documents(texts)
+
+    annotations = []
+    for request in requests:
+        annotation = CoreNLPEngine.annotate(DOCUMENT_SEPARATOR.join(request), annotators)
+        annotations.extend(_split_annotation(annotation, request) if len(request) > 1 else [annotation])
+    return annotations
+
+def _annotate(text: str, *annotators: str) -> Dict:
+    return annotation_cache.annotate_many([text], annotators, _annotate_documents)[0]
+
+def _annotate_batch(inputs: Sequence[Tuple[str]], # the input tuples of a batched nlp ie function
+                    read: Callable[[Dict], Iterator], # yields the outputs of the ie function from a document's annotation
+                    *annotators: str
+                    ) -> Iterator[Tuple[int, Tuple]]:
+    annotations = annotation_cache.annotate_many([text for text, in inputs], annotators, _annotate_documents)
+    for index, annotation in enumerate(annotations):
+        for output in read(annotation):
+            yield index, output
+
+def _tokens(annotation: Dict) -> Iterator[Dict]:
+    for s in annotation['sentences']:
+        yield from s['tokens']
+
+def _token_span(token: Dict) -> Tuple[int, int]:
+    return token['characterOffsetBegin'], token['characterOffsetEnd']
+
+# %% ../../nbs/ie_func/04b_nlp.ipynb 24
+def _read_tokenize(annotation: Dict) -> Iterator:
+    for token in _tokens(annotation):
+        yield token['originalText'], _token_span(token)
+
 def tokenize_wrapper(sentence: str) -> Iterator:
-    for token in CoreNLPEngine.tokenize(sentence):
-        yield token["token"], token["span"]
+    yield from _read_tokenize(_annotate(sentence, 'tokenize'))
+
+def tokenize_batch(inputs: Sequence[Tuple[str]]) -> Iterator:
+    yield from _annotate_batch(inputs, _read_tokenize, 'tokenize')
 
-# %% ../../nbs/ie_func/04b_nlp.ipynb 12
-Tokenize = dict(ie_function=tokenize_wrapper,
+# %% ../../nbs/ie_func/04b_nlp.ipynb 25
+Tokenize = dict(ie_function=tokenize_batch,
                 ie_function_name='Tokenize',
                 in_rel=[DataTypes.string],
-                out_rel=[DataTypes.string, DataTypes.span])
+                out_rel=[DataTypes.string, DataTypes.span],
+                batched=True,
+                batch_size=DEFAULT_NLP_BATCH_SIZE,
+                executor=IEFunction.EXECUTOR_THREAD,
+                workers=DEFAULT_NLP_WORKERS)
+
+# %% ../../nbs/ie_func/04b_nlp.ipynb 26
+def _read_ssplit(annotation: Dict) -> Iterator:
+    for s in annotation['sentences']:
+        yield ' '.join(token['originalText'] for token in s['tokens']),
 
-# %% ../../nbs/ie_func/04b_nlp.ipynb 13
 def ssplit_wrapper(sentence: str) -> Iterator:
-    for s in CoreNLPEngine.ssplit(sentence):
-        yield s,
+    yield from _read_ssplit(_annotate(sentence, 'tokenize', 'ssplit'))
+
+def ssplit_batch(inputs: Sequence[Tuple[str]]) -> Iterator:
+    yield from _annotate_batch(inputs, _read_ssplit, 'tokenize', 'ssplit')
 
-# %% ../../nbs/ie_func/04b_nlp.ipynb 14
-SSplit = dict(ie_function=ssplit_wrapper,
+# %% ../../nbs/ie_func/04b_nlp.ipynb 27
+SSplit = dict(ie_function=ssplit_batch,
               ie_function_name='SSplit',
               in_rel=[DataTypes.string],
-              out_rel=[DataTypes.string])
+              out_rel=[DataTypes.string],
+              batched=True,
+              batch_size=DEFAULT_NLP_BATCH_SIZE,
+              executor=IEFunction.EXECUTOR_THREAD,
+              workers=DEFAULT_NLP_WORKERS)
+
+# %% ../../nbs/ie_func/04b_nlp.ipynb 28
+def _read_pos(annotation: Dict) -> Iterator:
+    for token in _tokens(annotation):
+        yield token['originalText'], token['pos'], _token_span(token)
 
-# %% ../../nbs/ie_func/04b_nlp.ipynb 15
 def pos_wrapper(sentence: str) -> Iterator:
-    for res in CoreNLPEngine.pos(sentence):
-        yield res["token"], res["pos"], res["span"]
+    yield from _read_pos(_annotate(sentence, 'pos'))
 
-# %% ../../nbs/ie_func/04b_nlp.ipynb 16
-POS = dict(ie_function=pos_wrapper,
+def pos_batch(inputs: Sequence[Tuple[str]]) -> Iterator:
+    yield from _annotate_batch(inputs, _read_pos, 'pos')
+
+# %% ../../nbs/ie_func/04b_nlp.ipynb 29
+POS = dict(ie_function=pos_batch,
            ie_function_name='POS',
            in_rel=[DataTypes.string],
-           out_rel=[DataTypes.string, DataTypes.string, DataTypes.span])
+           out_rel=[DataTypes.string, DataTypes.string, DataTypes.span],
+           batched=True,
+           batch_size=DEFAULT_NLP_BATCH_SIZE,
+           executor=IEFunction.EXECUTOR_THREAD,
+           workers=DEFAULT_NLP_WORKERS)
+
+# %% ../../nbs/ie_func/04b_nlp.ipynb 30
+def _read_lemma(annotation: Dict) -> Iterator:
+    for token in _tokens(annotation):
+        yield token['originalText'], token['lemma'], _token_span(token)
 
-# %% ../../nbs/ie_func/04b_nlp.ipynb 17
 def lemma_wrapper(sentence: str) -> Iterator:
-    for res in CoreNLPEngine.lemma(sentence):
-        yield res["token"], res["lemma"], res["span"]
+    yield from _read_lemma(_annotate(sentence, 'lemma'))
 
-# %% ../../nbs/ie_func/04b_nlp.ipynb 18
-Lemma = dict(ie_function=lemma_wrapper,
+def lemma_batch(inputs: Sequence[Tuple[str]]) -> Iterator:
+    yield from _annotate_batch(inputs, _read_lemma, 'lemma')
+
+# %% ../../nbs/ie_func/04b_nlp.ipynb 31
+Lemma = dict(ie_function=lemma_batch,
              ie_function_name='Lemma',
              in_rel=[DataTypes.string],
-             out_rel=[DataTypes.string, DataTypes.string, DataTypes.span])
+             out_rel=[DataTypes.string, DataTypes.string, DataTypes.span],
+             batched=True,
+             batch_size=DEFAULT_NLP_BATCH_SIZE,
+             executor=IEFunction.EXECUTOR_THREAD,
+             workers=DEFAULT_NLP_WORKERS)
+
+# %% ../../nbs/ie_func/04b_nlp.ipynb 32
+def _read_ner(annotation: Dict) -> Iterator:
+    for token in _tokens(annotation):
+        if token['ner'] != 'O':
+            yield token['originalText'], token['ner'], _token_span(token)
 
-# %% ../../nbs/ie_func/04b_nlp.ipynb 19
 def ner_wrapper(sentence: str) -> Iterator:
-    for res in CoreNLPEngine.ner(sentence):
-        if res["ner"] != 'O':
-            yield res["token"], res["ner"], res["span"]
+    yield from _read_ner(_annotate(sentence, 'ner'))
 
-# %% ../../nbs/ie_func/04b_nlp.ipynb 20
-NER = dict(ie_function=ner_wrapper,
+def ner_batch(inputs: Sequence[Tuple[str]]) -> Iterator:
+    yield from _annotate_batch(inputs, _read_ner, 'ner')
+
+# %% ../../nbs/ie_func/04b_nlp.ipynb 33
+NER = dict(ie_function=ner_batch,
            ie_function_name='NER',
            in_rel=[DataTypes.string],
-           out_rel=[DataTypes.string, DataTypes.string, DataTypes.span])
+           out_rel=[DataTypes.string, DataTypes.string, DataTypes.span],
+           batched=True,
+           batch_size=DEFAULT_NLP_BATCH_SIZE,
+           executor=IEFunction.EXECUTOR_THREAD,
+           workers=DEFAULT_NLP_WORKERS)
+
+# %% ../../nbs/ie_func/04b_nlp.ipynb 34
+def _read_entitymentions(annotation: Dict) -> Iterator:
+    for s in annotation['sentences']:
+        for res in s['entitymentions']:
+            confidence = json.dumps(res["nerConfidences"]).replace("\"", "'")
+            yield (res["docTokenBegin"], res["docTokenEnd"], res["tokenBegin"], res["tokenEnd"], res["text"],
+                   res["characterOffsetBegin"], res["characterOffsetEnd"], res["ner"], confidence)
 
-# %% ../../nbs/ie_func/04b_nlp.ipynb 21
 def entitymentions_wrapper(sentence: str) -> Iterator:
-    for res in CoreNLPEngine.entitymentions(sentence):
-        confidence = json.dumps(res["nerConfidences"]).replace("\"", "'")
-        yield (res["docTokenBegin"], res["docTokenEnd"], res["tokenBegin"], res["tokenEnd"], res["text"],
-               res["characterOffsetBegin"], res["characterOffsetEnd"], res["ner"], confidence)
+    yield from _read_entitymentions(_annotate(sentence, 'entitymentions'))
+
+def entitymentions_batch(inputs: Sequence[Tuple[str]]) -> Iterator:
+    yield from _annotate_batch(inputs, _read_entitymentions, 'entitymentions')
 
-# %% ../../nbs/ie_func/04b_nlp.ipynb 22
-EntityMentions = dict(ie_function=entitymentions_wrapper,
+# %% ../../nbs/ie_func/04b_nlp.ipynb 35
+EntityMentions = dict(ie_function=entitymentions_batch,
                       ie_function_name='EntityMentions',
                       in_rel=[DataTypes.string],
                       out_rel=[DataTypes.integer, DataTypes.integer, DataTypes.integer, DataTypes.integer,
                                DataTypes.string, DataTypes.integer, DataTypes.integer, DataTypes.string,
-                               DataTypes.string])
+                               DataTypes.string],
+                      batched=True,
+                      batch_size=DEFAULT_NLP_BATCH_SIZE,
+                      executor=IEFunction.EXECUTOR_THREAD,
+                      workers=DEFAULT_NLP_WORKERS)
 
-# %% ../../nbs/ie_func/04b_nlp.ipynb 23
+# %% ../../nbs/ie_func/04b_nlp.ipynb 36
 def regexner_wrapper(sentence: str, pattern: str) -> Iterator:
     # for res in CoreNLPEngine.regexner(sentence, pattern):
     raise NotImplementedError()
 
-# %% ../../nbs/ie_func/04b_nlp.ipynb 24
+# %% ../../nbs/ie_func/04b_nlp.ipynb 37
 RGXNer = dict(ie_function=regexner_wrapper,
               ie_function_name='RGXNer',
               in_rel=[DataTypes.string, DataTypes.string],
               out_rel=None)
 
-# %% ../../nbs/ie_func/04b_nlp.ipynb 25
+# %% ../../nbs/ie_func/04b_nlp.ipynb 38
 def tokensregex_wrapper(sentence: str, pattern: str) -> Iterator:
     # for res in CoreNLPEngine.tokensregex(sentence, pattern):
     raise NotImplementedError()
 
-# %% ../../nbs/ie_func/04b_nlp.ipynb 26
+# %% ../../nbs/ie_func/04b_nlp.ipynb 39
 TokensRegex = dict(ie_function=tokensregex_wrapper,
                    ie_function_name='TokensRegex',
                    in_rel=[DataTypes.string, DataTypes.string],
                    out_rel=None)
 
-# %% ../../nbs/ie_func/04b_nlp.ipynb 27
+# %% ../../nbs/ie_func/04b_nlp.ipynb 40
 def cleanxml_wrapper(sentence: str) -> Iterator:
-    for res in CoreNLPEngine.cleanxml(sentence)["tokens"]:
+    for res in CoreNLPEngine.annotate(sentence, 'cleanxml')["tokens"]:
         yield res['index'], res['word'], res['originalText'], res['characterOffsetBegin'], res['characterOffsetEnd']
 
-# %% ../../nbs/ie_func/04b_nlp.ipynb 28
+# %% ../../nbs/ie_func/04b_nlp.ipynb 41
 CleanXML = dict(ie_function=cleanxml_wrapper,
                 ie_function_name='CleanXML',
                 in_rel=[DataTypes.string],
                 out_rel=[DataTypes.integer, DataTypes.string, DataTypes.string, DataTypes.integer, DataTypes.integer])
 
-# %% ../../nbs/ie_func/04b_nlp.ipynb 29
-def parse_wrapper(sentence: str) -> Iterator:
-    for res in CoreNLPEngine.parse(sentence):
+# %% ../../nbs/ie_func/04b_nlp.ipynb 42
+def _read_parse(annotation: Dict) -> Iterator:
+    for s in annotation['sentences']:
         # note #1: this yields a tuple
         # note #2: we replace the newlines with `<nl> because it is difficult to tell the results apart otherwise
-        yield res.replace("\n", "<nl>").replace("\r", ""),
+        yield s['parse'].replace("\n", "<nl>").replace("\r", ""),
 
-# %% ../../nbs/ie_func/04b_nlp.ipynb 30
-Parse = dict(ie_function=parse_wrapper,
+def parse_wrapper(sentence: str) -> Iterator:
+    yield from _read_parse(_annotate(sentence, 'parse'))
+
+def parse_batch(inputs: Sequence[Tuple[str]]) -> Iterator:
+    yield from _annotate_batch(inputs, _read_parse, 'parse')
+
+# %% ../../nbs/ie_func/04b_nlp.ipynb 43
+Parse = dict(ie_function=parse_batch,
              ie_function_name='Parse',
              in_rel=[DataTypes.string],
-             out_rel=[DataTypes.string])
+             out_rel=[DataTypes.string],
+             batched=True,
+             batch_size=DEFAULT_NLP_BATCH_SIZE,
+             executor=IEFunction.EXECUTOR_THREAD,
+             workers=DEFAULT_NLP_WORKERS)
+
+# %% ../../nbs/ie_func/04b_nlp.ipynb 44
+def _read_dependency_parse(annotation: Dict) -> Iterator:
+    for s in annotation['sentences']:
+        for res in s['basicDependencies']:
+            yield res['dep'], res['governor'], res['governorGloss'], res['dependent'], res['dependentGloss']
 
-# %% ../../nbs/ie_func/04b_nlp.ipynb 31
 def dependency_parse_wrapper(sentence: str) -> Iterator:
-    for res in CoreNLPEngine.dependency_parse(sentence):
-        yield res['dep'], res['governor'], res['governorGloss'], res['dependent'], res['dependentGloss']
+    yield from _read_dependency_parse(_annotate(sentence, 'depparse'))
 
-# %% ../../nbs/ie_func/04b_nlp.ipynb 32
-DepParse = dict(ie_function=dependency_parse_wrapper,
+def dependency_parse_batch(inputs: Sequence[Tuple[str]]) -> Iterator:
+    yield from _annotate_batch(inputs, _read_dependency_parse, 'depparse')
+
+# %% ../../nbs/ie_func/04b_nlp.ipynb 45
+DepParse = dict(ie_function=dependency_parse_batch,
                 ie_function_name='DepParse',
                 in_rel=[DataTypes.string],
-                out_rel=[DataTypes.string, DataTypes.integer, DataTypes.string, DataTypes.integer, DataTypes.string])
+                out_rel=[DataTypes.string, DataTypes.integer, DataTypes.string, DataTypes.integer, DataTypes.string],
+                batched=True,
+                batch_size=DEFAULT_NLP_BATCH_SIZE,
+                executor=IEFunction.EXECUTOR_THREAD,
+                workers=DEFAULT_NLP_WORKERS)
 
-# %% ../../nbs/ie_func/04b_nlp.ipynb 33
+# %% ../../nbs/ie_func/04b_nlp.ipynb 46
 def coref_wrapper(sentence: str) -> Iterator:
-    for res in CoreNLPEngine.coref(sentence):
-        yield (res['id'], res['text'], res['type'], res['number'], res['gender'], res['animacy'], res['startIndex'],
-               res['endIndex'], res['headIndex'], res['sentNum'],
-               tuple(res['position']), str(res['isRepresentativeMention']))
+    for mentions in _annotate(sentence, 'coref')['corefs'].values():
+        for res in mentions:
+            yield (res['id'], res['text'], res['type'], res['number'], res['gender'], res['animacy'],
+                   res['startIndex'], res['endIndex'], res['headIndex'], res['sentNum'],
+                   tuple(res['position']), str(res['isRepresentativeMention']))
 
-# %% ../../nbs/ie_func/04b_nlp.ipynb 34
+# %% ../../nbs/ie_func/04b_nlp.ipynb 47
 Coref = dict(ie_function=coref_wrapper,
              ie_function_name='Coref',
              in_rel=[DataTypes.string],
@@ -238,76 +745,106 @@ Coref = dict(ie_function=coref_wrapper,
                       DataTypes.string, DataTypes.integer, DataTypes.integer, DataTypes.integer, DataTypes.integer,
                       DataTypes.span, DataTypes.string])
 
-# %% ../../nbs/ie_func/04b_nlp.ipynb 35
-def openie_wrapper(sentence: str) -> Iterator:
-    for lst in CoreNLPEngine.openie(sentence):
-        for res in lst:
+# %% ../../nbs/ie_func/04b_nlp.ipynb 48
+def _read_openie(annotation: Dict) -> Iterator:
+    for s in annotation['sentences']:
+        for res in s['openie']:
             yield (res['subject'], tuple(res['subjectSpan']), res['relation'], tuple(res['relationSpan']),
                    res['object'], tuple(res['objectSpan']))
 
-# %% ../../nbs/ie_func/04b_nlp.ipynb 36
-OpenIE = dict(ie_function=openie_wrapper,
+def openie_wrapper(sentence: str) -> Iterator:
+    yield from _read_openie(_annotate(sentence, 'depparse', 'natlog', 'openie'))
+
+def openie_batch(inputs: Sequence[Tuple[str]]) -> Iterator:
+    yield from _annotate_batch(inputs, _read_openie, 'depparse', 'natlog', 'openie')
+
+# %% ../../nbs/ie_func/04b_nlp.ipynb 49
+OpenIE = dict(ie_function=openie_batch,
               ie_function_name='OpenIE',
               in_rel=[DataTypes.string],
               out_rel=[DataTypes.string, DataTypes.span, DataTypes.string, DataTypes.span, DataTypes.string,
-                       DataTypes.span])
+                       DataTypes.span],
+              batched=True,
+              batch_size=DEFAULT_NLP_BATCH_SIZE,
+              executor=IEFunction.EXECUTOR_THREAD,
+              workers=DEFAULT_NLP_WORKERS)
 
-# %% ../../nbs/ie_func/04b_nlp.ipynb 37
+# %% ../../nbs/ie_func/04b_nlp.ipynb 50
 def kbp_wrapper(sentence: str) -> Iterator:
-    for lst in CoreNLPEngine.kbp(sentence):
-        for res in lst:
+    for s in _annotate(sentence, 'parse', 'coref', 'kbp')['sentences']:
+        for res in s['kbp']:
             yield (res['subject'], tuple(res['subjectSpan']), res['relation'], tuple(res['relationSpan']),
                    res['object'], tuple(res['objectSpan']))
 
-# %% ../../nbs/ie_func/04b_nlp.ipynb 38
+# %% ../../nbs/ie_func/04b_nlp.ipynb 51
 KBP = dict(ie_function=kbp_wrapper,
            ie_function_name='KBP',
            in_rel=[DataTypes.string],
            out_rel=[DataTypes.string, DataTypes.span, DataTypes.string, DataTypes.span, DataTypes.string,
                     DataTypes.span])
 
-# %% ../../nbs/ie_func/04b_nlp.ipynb 39
+# %% ../../nbs/ie_func/04b_nlp.ipynb 52
 def quote_wrapper(sentence: str) -> Iterator:
-    for res in CoreNLPEngine.quote(sentence):
+    for res in _annotate(sentence, 'depparse', 'coref', 'quote')['quotes']:
         yield (res['id'], res['text'], res['beginIndex'], res['endIndex'], res['beginToken'], res['endToken'],
                res['beginSentence'], res['endSentence'], res['speaker'], res['canonicalSpeaker'])
 
-# %% ../../nbs/ie_func/04b_nlp.ipynb 40
+# %% ../../nbs/ie_func/04b_nlp.ipynb 53
 Quote = dict(ie_function=quote_wrapper,
              ie_function_name='Quote',
              in_rel=[DataTypes.string],
              out_rel=[DataTypes.integer, DataTypes.string, DataTypes.integer, DataTypes.integer, DataTypes.integer,
                       DataTypes.integer, DataTypes.integer, DataTypes.integer, DataTypes.string, DataTypes.string])
 
-# %% ../../nbs/ie_func/04b_nlp.ipynb 41
+# %% ../../nbs/ie_func/04b_nlp.ipynb 54
 # currently ignoring sentimentTree
+def _read_sentiment(annotation: Dict) -> Iterator:
+    for s in annotation['sentences']:
+        yield int(s['sentimentValue']), s['sentiment'], json.dumps(s['sentimentDistribution'])
+
 def sentiment_wrapper(sentence: str) -> Iterator:
-    for res in CoreNLPEngine.sentiment(sentence):
-        yield int(res['sentimentValue']), res['sentiment'], json.dumps(res['sentimentDistribution'])
+    yield from _read_sentiment(_annotate(sentence, 'sentiment'))
 
-# %% ../../nbs/ie_func/04b_nlp.ipynb 42
-Sentiment = dict(ie_function=sentiment_wrapper,
+def sentiment_batch(inputs: Sequence[Tuple[str]]) -> Iterator:
+    yield from _annotate_batch(inputs, _read_sentiment, 'sentiment')
+
+# %% ../../nbs/ie_func/04b_nlp.ipynb 55
+Sentiment = dict(ie_function=sentiment_batch,
                  ie_function_name='Sentiment',
                  in_rel=[DataTypes.string],
-                 out_rel=[DataTypes.integer, DataTypes.string, DataTypes.string])
+                 out_rel=[DataTypes.integer, DataTypes.string, DataTypes.string],
+                 batched=True,
+                 batch_size=DEFAULT_NLP_BATCH_SIZE,
+                 executor=IEFunction.EXECUTOR_THREAD,
+                 workers=DEFAULT_NLP_WORKERS)
+
+# %% ../../nbs/ie_func/04b_nlp.ipynb 56
+def _read_truecase(annotation: Dict) -> Iterator:
+    for token in _tokens(annotation):
+        yield token['originalText'], _token_span(token), token['truecase'], token['truecaseText']
 
-# %% ../../nbs/ie_func/04b_nlp.ipynb 43
 def truecase_wrapper(sentence: str) -> Iterator:
-    for res in CoreNLPEngine.truecase(sentence):
-        yield res['token'], res['span'], res['truecase'], res['truecaseText']
+    yield from _read_truecase(_annotate(sentence, 'truecase'))
 
-# %% ../../nbs/ie_func/04b_nlp.ipynb 44
-TrueCase = dict(ie_function=truecase_wrapper,
+def truecase_batch(inputs: Sequence[Tuple[str]]) -> Iterator:
+    yield from _annotate_batch(inputs, _read_truecase, 'truecase')
+
+# %% ../../nbs/ie_func/04b_nlp.ipynb 57
+TrueCase = dict(ie_function=truecase_batch,
                 ie_function_name='TrueCase',
                 in_rel=[DataTypes.string],
-                out_rel=[DataTypes.string, DataTypes.span, DataTypes.string, DataTypes.string])
+                out_rel=[DataTypes.string, DataTypes.span, DataTypes.string, DataTypes.string],
+                batched=True,
+                batch_size=DEFAULT_NLP_BATCH_SIZE,
+                executor=IEFunction.EXECUTOR_THREAD,
+                workers=DEFAULT_NLP_WORKERS)
 
-# %% ../../nbs/ie_func/04b_nlp.ipynb 45
+# %% ../../nbs/ie_func/04b_nlp.ipynb 58
 def udfeats_wrapper(sentence: str) -> Iterator:
     # for token in CoreNLPEngine.udfeats(sentence):
     raise NotImplementedError()
 
-# %% ../../nbs/ie_func/04b_nlp.ipynb 46
+# %% ../../nbs/ie_func/04b_nlp.ipynb 59
 UDFeats = dict(ie_function=udfeats_wrapper,
                ie_function_name='UDFeats',
                in_rel=[DataTypes.string],
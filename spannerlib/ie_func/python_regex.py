@@ -1,15 +1,36 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../../nbs/ie_func/04c_python_regex.ipynb.
 
 # %% auto 0
-__all__ = ['PYRGX_STRING', 'PYRGX', 'py_rgx_string', 'py_rgx_string_out_types', 'py_rgx', 'py_rgx_out_type']
+__all__ = ['PATTERN_CACHE_SIZE', 'NUMBERED_BACKREFERENCE_PATTERN', 'GLOBAL_FLAGS_PATTERN', 'GROUP_NAME_PATTERN',
+           'PYRGX_STRING', 'PYRGX', 'py_rgx_string', 'py_rgx_string_out_types', 'py_rgx', 'py_rgx_out_type',
+           'py_rgx_multi', 'py_rgx_multi_ie']
 
 # %% ../../nbs/ie_func/04c_python_regex.ipynb 3
 import re
-from typing import Iterable, Sequence
+from functools import lru_cache
+from typing import Iterable, Sequence, Dict, Tuple
 
 from ..primitive_types import DataTypes
 
+# the maximal number of compiled patterns (or sets of patterns) that are kept for reuse
+PATTERN_CACHE_SIZE = 1024
+
+# a numbered backreference (e.g. `\1`) or conditional (e.g. `(?(1)a|b)`), whose group number would change once the
+# pattern is combined with other patterns
+NUMBERED_BACKREFERENCE_PATTERN = re.compile(r"\\[1-9]|(?<!\\)\(\?\(\d+\)")
+# global flags (e.g. `(?i)`), which are only allowed at the start of a pattern, so they are scoped once it is combined
+GLOBAL_FLAGS_PATTERN = re.compile(r"\(\?([aiLmsux]+)\)")
+# a named group (`(?P<name>`), a reference to it (`(?P=name)`) or a condition on it (`(?(name)`), which is renamed
+# once the pattern is combined, so patterns can use the same group names
+GROUP_NAME_PATTERN = re.compile(r"(?<!\\)\(\?(P<|P=|\()([A-Za-z_]\w*)")
+
 # %% ../../nbs/ie_func/04c_python_regex.ipynb 4
+@lru_cache(maxsize=PATTERN_CACHE_SIZE)
+def _compile_pattern(regex_pattern: str) -> re.Pattern:
+    # the same patterns are usually used on many texts, so they are compiled once
+    return re.compile(regex_pattern)
+
+# %% ../../nbs/ie_func/04c_python_regex.ipynb 5
 def py_rgx_string(text: str, regex_pattern: str) -> Iterable[Sequence]:
     """
     An IE function which runs regex using python's `re` and yields tuples of strings.
@@ -18,26 +39,26 @@ def py_rgx_string(text: str, regex_pattern: str) -> Iterable[Sequence]:
     @param regex_pattern: the pattern of the regex operation.
     @return: tuples of strings that represents the results.
     """
-    compiled_rgx = re.compile(regex_pattern)
+    compiled_rgx = _compile_pattern(regex_pattern)
     num_groups = compiled_rgx.groups
-    for match in re.finditer(compiled_rgx, text):
+    for match in compiled_rgx.finditer(text):
         if num_groups == 0:
             matched_strings = [match.group()]
         else:
             matched_strings = [group for group in match.groups()]
         yield matched_strings
 
-# %% ../../nbs/ie_func/04c_python_regex.ipynb 5
+# %% ../../nbs/ie_func/04c_python_regex.ipynb 6
 def py_rgx_string_out_types(output_arity: int) -> Sequence:
     return tuple([DataTypes.string] * output_arity)
 
-# %% ../../nbs/ie_func/04c_python_regex.ipynb 6
+# %% ../../nbs/ie_func/04c_python_regex.ipynb 7
 PYRGX_STRING = dict(ie_function=py_rgx_string,
                     ie_function_name='py_rgx_string',
                     in_rel=[DataTypes.string, DataTypes.string],
                     out_rel=py_rgx_string_out_types)
 
-# %% ../../nbs/ie_func/04c_python_regex.ipynb 7
+# %% ../../nbs/ie_func/04c_python_regex.ipynb 8
 def py_rgx(text: str, regex_pattern: str) -> Iterable[Sequence]:
     """
     An IE function which runs regex using python's `re` and yields tuples of spans.
@@ -46,21 +67,110 @@ def py_rgx(text: str, regex_pattern: str) -> Iterable[Sequence]:
     @param regex_pattern: the pattern of the regex operation.
     @return: tuples of spans that represents the results.
     """
-    compiled_rgx = re.compile(regex_pattern)
+    compiled_rgx = _compile_pattern(regex_pattern)
     num_groups = compiled_rgx.groups
-    for match in re.finditer(compiled_rgx, text):
+    for match in compiled_rgx.finditer(text):
         if num_groups == 0:
             matched_spans = [match.span()]
         else:
             matched_spans = [match.span(i) for i in range(1, num_groups + 1)]
         yield matched_spans
 
-# %% ../../nbs/ie_func/04c_python_regex.ipynb 8
+# %% ../../nbs/ie_func/04c_python_regex.ipynb 9
 def py_rgx_out_type(output_arity: int) -> Sequence:
     return tuple([DataTypes.span] * output_arity)
 
-# %% ../../nbs/ie_func/04c_python_regex.ipynb 9
+# %% ../../nbs/ie_func/04c_python_regex.ipynb 10
 PYRGX = dict(ie_function=py_rgx,
              ie_function_name='py_rgx_span',
              in_rel=[DataTypes.string, DataTypes.string],
              out_rel=py_rgx_out_type)
+
+# %% ../../nbs/ie_func/04c_python_regex.ipynb 11
+def _scope_pattern(pattern_index: int, regex_pattern: str) -> str:
+    # returns a pattern that matches like `regex_pattern` when it is a part of a combined pattern:
+    # its leading global flags only apply to it, and its group names are prefixed by its index
+    flags = ""
+    flags_match = GLOBAL_FLAGS_PATTERN.match(regex_pattern)
+    while flags_match is not None:
+        flags += flags_match.group(1)
+        regex_pattern = regex_pattern[flags_match.end():]
+        flags_match = GLOBAL_FLAGS_PATTERN.match(regex_pattern)
+
+    regex_pattern = GROUP_NAME_PATTERN.sub(lambda match: f"(?{match.group(1)}p{pattern_index}_{match.group(2)}", regex_pattern)
+    if not flags:
+        return regex_pattern
+    # in verbose mode, a comment at the end of the pattern would hide the closing parenthesis
+    return f"(?{flags}:{regex_pattern}\n)" if "x" in flags else f"(?{flags}:{regex_pattern})"
+
+@lru_cache(maxsize=PATTERN_CACHE_SIZE)
+def _compile_multi_pattern(regex_patterns: Tuple[str, ...]) -> Tuple[re.Pattern, Dict[int, int]]:
+    # combines the patterns into a single alternation, in which every pattern is wrapped by a group.
+    # returns the combined pattern and a mapping from the number of each wrapping group to the index of its pattern
+    for regex_pattern in regex_patterns:
+        if NUMBERED_BACKREFERENCE_PATTERN.search(regex_pattern):
+            raise ValueError(f"numbered backreferences and conditionals can't be used in a set of patterns, "
+                             f"use a named group instead: {regex_pattern}")
+
+    group_to_pattern_index = {}
+    group_number = 1
+    for pattern_index, regex_pattern in enumerate(regex_patterns):
+        group_to_pattern_index[group_number] = pattern_index
+        group_number += 1 + _compile_pattern(regex_pattern).groups
+
+    combined_pattern = "|".join(f"({_scope_pattern(pattern_index, regex_pattern)})"
+                                for pattern_index, regex_pattern in enumerate(regex_patterns))
+    return re.compile(combined_pattern), group_to_pattern_index
+
+# %% ../../nbs/ie_func/04c_python_regex.ipynb 12
+def py_rgx_multi(text: str, regex_patterns: Sequence[str], overlapping: bool = False) -> Iterable[Sequence]:
+    """
+    Runs a set of patterns in a single pass over the text, and yields (pattern index, span) tuples.
+
+    the patterns are combined into a single scanner, so, like a tokenizer, matches don't overlap:
+    at every position the leftmost match wins, and among matches that start at the same position the earliest pattern wins.
+    the global flags of each pattern (e.g. `(?i)`) only apply to it, and patterns may use the same group names.
+    with `overlapping`, each pattern is run separately instead, so the matches are the same as those of `py_rgx`
+    on each pattern (grouped by pattern).
+
+    @param text: The input text for the regex operation.
+    @param regex_patterns: the patterns of the regex operation, without numbered backreferences or conditionals
+        (unless `overlapping`).
+    @param overlapping: whether to find the matches of every pattern, even if they overlap the matches of other patterns.
+    @return: tuples of the index of the pattern that matched and the span of the match.
+    """
+    if overlapping:
+        for pattern_index, regex_pattern in enumerate(regex_patterns):
+            for match in _compile_pattern(regex_pattern).finditer(text):
+                yield pattern_index, match.span()
+        return
+
+    combined_rgx, group_to_pattern_index = _compile_multi_pattern(tuple(regex_patterns))
+    for match in combined_rgx.finditer(text):
+        # the group that wraps a pattern is the outermost group of the match, so it is the last one that was closed
+        yield group_to_pattern_index[match.lastindex], match.span()
+
+# %% ../../nbs/ie_func/04c_python_regex.ipynb 13
+def py_rgx_multi_ie(regex_patterns: Sequence[str], # the patterns that are run together
+                    ie_function_name: str, # the name under which the ie function is registered
+                    overlapping: bool = False # whether matches of different patterns may overlap (see `py_rgx_multi`)
+                    ) -> Dict: # the arguments of `Session.register`
+    """
+    Creates an ie function which runs a fixed set of patterns using `py_rgx_multi`, e.g. the patterns of a rule table.
+    the ie function gets a text and returns (pattern index, span) tuples, which can be joined with the patterns by their index.
+    """
+    regex_patterns = list(regex_patterns)
+    # compile the patterns now, so an invalid pattern is reported when the function is created
+    if overlapping:
+        for regex_pattern in regex_patterns:
+            _compile_pattern(regex_pattern)
+    else:
+        _compile_multi_pattern(tuple(regex_patterns))
+
+    def py_rgx_multi_ie_function(text: str) -> Iterable[Sequence]:
+        return py_rgx_multi(text, regex_patterns, overlapping)
+
+    return dict(ie_function=py_rgx_multi_ie_function,
+                ie_function_name=ie_function_name,
+                in_rel=[DataTypes.string],
+                out_rel=[DataTypes.integer, DataTypes.span])
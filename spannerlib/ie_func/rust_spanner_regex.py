@@ -5,18 +5,20 @@ __all__ = ['RUST_RGX_IN_TYPES', 'DOWNLOAD_RUST_URL', 'PACKAGE_GIT_URL', 'PACKAGE
            'REGEX_FOLDER_NAME', 'REGEX_FOLDER_PATH', 'REGEX_TEMP_PATH', 'REGEX_EXE_PATH_POSIX', 'REGEX_EXE_PATH_WIN',
            'RUSTUP_TOOLCHAIN', 'CARGO_CMD_ARGS', 'RUSTUP_CMD_ARGS', 'SHORT_TIMEOUT', 'CARGO_TIMEOUT', 'RUSTUP_TIMEOUT',
            'TIMEOUT_MINUTES', 'WINDOWS_OS', 'WHICH_WORD', 'REGEX_EXE_PATH', 'ESCAPED_STRINGS_PATTERN', 'SPAN_PATTERN',
-           'TEMP_FILE_NAME', 'logger', 'RGX', 'RGX_STRING', 'RGX_FROM_FILE', 'RGX_STRING_FROM_FILE',
-           'download_and_install_rust_regex', 'rgx_span_out_type', 'rgx_string_out_type', 'rgx', 'rgx_span',
-           'rgx_string', 'rgx_span_from_file', 'rgx_string_from_file']
+           'TEMP_FILE_NAME', 'MAX_RGX_PROCESSES', 'logger', 'RGX', 'RGX_STRING', 'RGX_FROM_FILE',
+           'RGX_STRING_FROM_FILE', 'download_and_install_rust_regex', 'rgx_span_out_type', 'rgx_string_out_type', 'rgx',
+           'rgx_batch', 'rgx_span', 'rgx_span_batch', 'rgx_string', 'rgx_string_batch', 'rgx_span_from_file',
+           'rgx_span_from_file_batch', 'rgx_string_from_file', 'rgx_string_from_file_batch']
 
 # %% ../../nbs/ie_func/04d_rust_spanner_regex.ipynb 4
 import logging
 import re
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from subprocess import Popen, PIPE
 from sys import platform
-from typing import Tuple, List, Union, Iterable, Sequence, no_type_check, Callable, Optional
+from typing import Tuple, List, Union, Iterable, Iterator, Sequence, no_type_check, Callable, Optional, Dict
 import os
 
 from ..primitive_types import DataTypes, Span
@@ -62,6 +64,9 @@ SPAN_PATTERN = re.compile(r"(?P<start>\d+), ?(?P<end>\d+)")
 # etc
 TEMP_FILE_NAME = "temp"
 
+# the maximal number of `enum-spanner-rs` processes that a batch runs at the same time
+MAX_RGX_PROCESSES = os.cpu_count() or 1
+
 logger = logging.getLogger(__name__)
 
 # %% ../../nbs/ie_func/04d_rust_spanner_regex.ipynb 20
@@ -133,6 +138,16 @@ def _format_spanner_span_output(output: Iterable[str]) -> List[List[Span]]:
     return output_lists
 
 # %% ../../nbs/ie_func/04d_rust_spanner_regex.ipynb 26
+def _get_rgx_command(regex_pattern: str, text_file: Path, out_type: str) -> Tuple[str, Callable]:
+    # returns the command that runs `enum-spanner-rs` on a file, and the function that formats its output
+    if out_type == "string":
+        return f"{REGEX_EXE_PATH} {regex_pattern} {text_file}", _format_spanner_string_output
+    elif out_type == "span":
+        return f"{REGEX_EXE_PATH} {regex_pattern} {text_file} --bytes-offset", _format_spanner_span_output
+    else:
+        assert False, "illegal out_type"
+
+# %% ../../nbs/ie_func/04d_rust_spanner_regex.ipynb 27
 def rgx(regex_pattern: str, # the pattern to run
         out_type: str, # string/span - decides which one will be returned
         text: Optional[str] = None, # the string on which regex is run
@@ -150,21 +165,49 @@ def rgx(regex_pattern: str, # the pattern to run
             with open(rgx_temp_file_name, "w+") as f:
                 f.write(text)
 
-        if out_type == "string":
-            rust_regex_args = f"{REGEX_EXE_PATH} {regex_pattern} {rgx_temp_file_name}"
-            format_function: Callable = _format_spanner_string_output
-        elif out_type == "span":
-            rust_regex_args = f"{REGEX_EXE_PATH} {regex_pattern} {rgx_temp_file_name} --bytes-offset"
-            format_function = _format_spanner_span_output
-        else:
-            assert False, "illegal out_type"
-
+        rust_regex_args, format_function = _get_rgx_command(regex_pattern, rgx_temp_file_name, out_type)
         regex_output = format_function(run_cli_command(rust_regex_args, stderr=True))
 
         for out in regex_output:
             yield out
 
-# %% ../../nbs/ie_func/04d_rust_spanner_regex.ipynb 27
+# %% ../../nbs/ie_func/04d_rust_spanner_regex.ipynb 28
+def rgx_batch(inputs: Sequence[Tuple[str, str]], # pairs of (text, pattern), or (text file, pattern) if `from_file` is True
+              out_type: str, # string/span - decides which one will be returned
+              from_file: bool = False # whether the texts are names of files which contain the actual texts
+              ) -> Iterator[Tuple[int, List[Union[str, Span]]]]: # pairs of an index into `inputs` and a tuple of strings/spans
+    """
+    A batched version of `rgx` (see `IEFunction.ie_function_batch`).
+
+    `enum-spanner-rs` handles a single pattern and file per process, so instead of a process and a temporary directory
+    per input, every distinct text of the batch is written once to a shared temporary directory,
+    and up to `MAX_RGX_PROCESSES` processes run at the same time.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        text_files: Dict[str, Path] = {}
+        commands = []
+        for text, regex_pattern in inputs:
+            if from_file:
+                text_file = Path(text)
+            else:
+                if text not in text_files:
+                    text_files[text] = Path(temp_dir) / f"{TEMP_FILE_NAME}{len(text_files)}"
+                    with open(text_files[text], "w+") as f:
+                        f.write(text)
+                text_file = text_files[text]
+            commands.append(_get_rgx_command(regex_pattern, text_file, out_type))
+
+        def run_command(command: Tuple[str, Callable]) -> List[List[Union[str, Span]]]:
+            rust_regex_args, format_function = command
+            return format_function(run_cli_command(rust_regex_args, stderr=True))
+
+        # the threads only wait for the processes, and `map` keeps the outputs in the order of the inputs
+        with ThreadPoolExecutor(max_workers=MAX_RGX_PROCESSES) as pool:
+            for index, regex_output in enumerate(pool.map(run_command, commands)):
+                for out in regex_output:
+                    yield index, out
+
+# %% ../../nbs/ie_func/04d_rust_spanner_regex.ipynb 30
 def rgx_span(text: str, # The input text for the regex operation
              regex_pattern: str # The pattern of the regex operation
              ) -> Iterable[Iterable[Union[str, Span]]]: # tuples of spans that represents the results
@@ -175,44 +218,71 @@ def rgx_span(text: str, # The input text for the regex operation
     """
     return rgx(regex_pattern, "span", text=text)
 
-# %% ../../nbs/ie_func/04d_rust_spanner_regex.ipynb 28
-RGX = dict(ie_function=rgx_span,
+# %% ../../nbs/ie_func/04d_rust_spanner_regex.ipynb 31
+def rgx_span_batch(inputs: Sequence[Tuple[str, str]] # pairs of (text, pattern)
+                   ) -> Iterator[Tuple[int, List[Union[str, Span]]]]: # pairs of an input index and a tuple of spans
+    return rgx_batch(inputs, "span")
+
+# %% ../../nbs/ie_func/04d_rust_spanner_regex.ipynb 32
+RGX = dict(ie_function=rgx_span_batch,
            ie_function_name='rgx_span',
            in_rel=RUST_RGX_IN_TYPES,
-           out_rel=rgx_span_out_type)
+           out_rel=rgx_span_out_type,
+           batched=True)
 
-# %% ../../nbs/ie_func/04d_rust_spanner_regex.ipynb 29
+# %% ../../nbs/ie_func/04d_rust_spanner_regex.ipynb 33
 def rgx_string(text: str, # The input text for the regex operation
                regex_pattern: str # he pattern of the regex operation
                ) -> Iterable[Iterable[Union[str, Span]]]: # tuples of strings that represents the results
     return rgx(regex_pattern, "string", text=text)
 
-# %% ../../nbs/ie_func/04d_rust_spanner_regex.ipynb 30
-RGX_STRING = dict(ie_function=rgx_string,
+# %% ../../nbs/ie_func/04d_rust_spanner_regex.ipynb 34
+def rgx_string_batch(inputs: Sequence[Tuple[str, str]] # pairs of (text, pattern)
+                     ) -> Iterator[Tuple[int, List[Union[str, Span]]]]: # pairs of an input index and a tuple of strings
+    return rgx_batch(inputs, "string")
+
+# %% ../../nbs/ie_func/04d_rust_spanner_regex.ipynb 35
+RGX_STRING = dict(ie_function=rgx_string_batch,
                   ie_function_name='rgx_string',
                   in_rel=RUST_RGX_IN_TYPES,
-                  out_rel=rgx_string_out_type)
+                  out_rel=rgx_string_out_type,
+                  batched=True)
 
-# %% ../../nbs/ie_func/04d_rust_spanner_regex.ipynb 31
+# %% ../../nbs/ie_func/04d_rust_spanner_regex.ipynb 36
 def rgx_span_from_file(text_file: str, # The input file for the regex operation
                        regex_pattern: str # The pattern of the regex operation
                        ) -> Iterable[Iterable[Union[str, Span]]]: # tuples of spans that represents the results
     return rgx(regex_pattern, "span", text_file=text_file)
 
-# %% ../../nbs/ie_func/04d_rust_spanner_regex.ipynb 32
-RGX_FROM_FILE = dict(ie_function=rgx_span_from_file,
+# %% ../../nbs/ie_func/04d_rust_spanner_regex.ipynb 37
+def rgx_span_from_file_batch(inputs: Sequence[Tuple[str, str]] # pairs of (text file, pattern)
+                             ) -> Iterator[Tuple[int, List[Union[str, Span]]]]: # pairs of an input index and a tuple of spans
+    return rgx_batch(inputs, "span", from_file=True)
+
+# %% ../../nbs/ie_func/04d_rust_spanner_regex.ipynb 38
+RGX_FROM_FILE = dict(ie_function=rgx_span_from_file_batch,
                      ie_function_name='rgx_span_from_file',
                      in_rel=RUST_RGX_IN_TYPES,
-                     out_rel=rgx_span_out_type)
+                     out_rel=rgx_span_out_type,
+                     batched=True,
+                     # the outputs depend on the content of the file, not only on its name
+                     cacheable=False)
 
-# %% ../../nbs/ie_func/04d_rust_spanner_regex.ipynb 33
+# %% ../../nbs/ie_func/04d_rust_spanner_regex.ipynb 39
 def rgx_string_from_file(text_file: str, # The input file for the regex operation
                          regex_pattern: str # The pattern of the regex operation
                          ) -> Iterable[Iterable[Union[str, Span]]]: # tuples of strings that represents the results
     return rgx(regex_pattern, "string", text_file=text_file)
 
-# %% ../../nbs/ie_func/04d_rust_spanner_regex.ipynb 34
-RGX_STRING_FROM_FILE = dict(ie_function=rgx_string_from_file,
+# %% ../../nbs/ie_func/04d_rust_spanner_regex.ipynb 40
+def rgx_string_from_file_batch(inputs: Sequence[Tuple[str, str]] # pairs of (text file, pattern)
+                               ) -> Iterator[Tuple[int, List[Union[str, Span]]]]: # pairs of an input index and a tuple of strings
+    return rgx_batch(inputs, "string", from_file=True)
+
+# %% ../../nbs/ie_func/04d_rust_spanner_regex.ipynb 41
+RGX_STRING_FROM_FILE = dict(ie_function=rgx_string_from_file_batch,
                             ie_function_name='rgx_string_from_file',
                             in_rel=RUST_RGX_IN_TYPES,
-                            out_rel=rgx_string_out_type)
+                            out_rel=rgx_string_out_type,
+                            batched=True,
+                            cacheable=False)
@@ -1,13 +1,34 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/03b_ie_function.ipynb.
 
 # %% auto 0
-__all__ = ['IEFunction']
+__all__ = ['DEFAULT_IE_BATCH_SIZE', 'DEFAULT_IE_CONCURRENCY', 'DEFAULT_IE_CACHE_SIZE', 'IEFunction', 'IECache']
 
 # %% ../nbs/03b_ie_function.ipynb 4
 #| output: false
-from typing import Iterable, Callable, Union, Tuple, List, Sequence, Any
+import asyncio
+import hashlib
+import inspect
+import os
+import pickle
+import sqlite3 as sqlite
+import threading
+from collections import OrderedDict
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from itertools import repeat
+from pathlib import Path
+from types import CodeType
+from typing import Iterable, Iterator, Callable, Union, Tuple, List, Sequence, Any, Optional, Dict, Set
 from .primitive_types import DataTypes
 
+# the default maximal number of input tuples that are passed to a batched ie function in a single call
+DEFAULT_IE_BATCH_SIZE = 1024
+
+# the default maximal number of calls of an async ie function that are awaited concurrently
+DEFAULT_IE_CONCURRENCY = 64
+
+# the default number of (ie function, input) pairs whose outputs are kept in memory by `IECache`
+DEFAULT_IE_CACHE_SIZE = 4096
+
 # %% ../nbs/03b_ie_function.ipynb 5
 class IEFunction:
     """
@@ -15,14 +36,65 @@ class IEFunction:
     needed for using a single information extraction function
     """
 
+    EXECUTOR_SERIAL = "serial" # run the batches one after the other, in the calling thread
+    EXECUTOR_THREAD = "thread" # run batches concurrently in a thread pool, useful for functions that release the GIL (e.g. io bound functions)
+    EXECUTOR_PROCESS = "process" # run batches concurrently in a process pool, the function, its inputs and its outputs must be picklable
+    EXECUTORS = (EXECUTOR_SERIAL, EXECUTOR_THREAD, EXECUTOR_PROCESS)
+
     def __init__(self,
             ie_function_def: Callable, # the user defined ie function implementation
             in_types: Sequence[DataTypes], # iterable of the input types to the function
-            out_types: Union[List[DataTypes],Callable[[int], Sequence[DataTypes]]] # either a function (int->iterable) or an iterable
+            out_types: Union[List[DataTypes],Callable[[int], Sequence[DataTypes]]], # either a function (int->iterable) or an iterable
+            batched: bool = False, # whether ie_function_def receives a list of input tuples instead of a single input (see `ie_function_batch`)
+            batch_size: int = DEFAULT_IE_BATCH_SIZE, # the maximal number of input tuples in a single batch
+            cacheable: bool = True, # whether the outputs may be memoized (see `IECache`), should be False for non deterministic functions
+            executor: str = EXECUTOR_SERIAL, # how the batches are run, one of `EXECUTORS`
+            workers: Optional[int] = None, # the number of threads/processes of a parallel executor, defaults to the number of cpus
+            concurrency: int = DEFAULT_IE_CONCURRENCY, # the maximal number of calls of an async function that are awaited concurrently
+            timeout: Optional[float] = None, # the number of seconds after which a call of an async function fails, no limit if None
+            version: Optional[Union[str, int]] = None # the version of the function, change it to invalidate the outputs that `IECache` memoized
             ):
+        if batch_size < 1:
+            raise ValueError(f"batch size must be positive, got {batch_size}")
+        if executor not in IEFunction.EXECUTORS:
+            raise ValueError(f"unknown executor: {executor}, expected one of {IEFunction.EXECUTORS}")
+        if workers is not None and workers < 1:
+            raise ValueError(f"the number of workers must be positive, got {workers}")
+        if concurrency < 1:
+            raise ValueError(f"concurrency must be positive, got {concurrency}")
+        is_async = _is_async_callable(ie_function_def)
+        if is_async and executor != IEFunction.EXECUTOR_SERIAL:
+            raise ValueError("async ie functions run on an event loop, so they can't use a parallel executor")
         self.ie_function_def = ie_function_def
         self.in_types = in_types
         self.out_types = out_types
+        self.batched = batched
+        self.batch_size = batch_size
+        self.cacheable = cacheable
+        self.executor = executor
+        self.workers = 1 if executor == IEFunction.EXECUTOR_SERIAL else (workers or os.cpu_count() or 1)
+        self.is_async = is_async
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.version = version
+        # the number of inputs that should be passed to `ie_function_batches` together, so all of the workers
+        # (or all of the concurrent calls of an async function) have inputs to work on
+        if not is_async:
+            self.chunk_size = batch_size * self.workers
+        else:
+            self.chunk_size = batch_size * concurrency if batched else max(batch_size, concurrency)
+        self._pool: Optional[Executor] = None
+        self._fingerprint: Optional[str] = None
+        self._is_fingerprinted = False
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # a pool can't be pickled, which happens when the function is sent to the processes of its own pool
+        state = self.__dict__.copy()
+        state['_pool'] = None
+        return state
+
+    def __del__(self) -> None:
+        self.shutdown()
     
     def ie_function(self, *args: Any) -> Iterable[Iterable[Union[str, int, Tuple[int, int]]]]:  # Tuple[int, int] represents a Span
         """
@@ -35,9 +107,172 @@ class IEFunction:
         an integer should be returned as an int instance
         a span could be returned either as a tuple of length 2, or as a datatypes.Span instance
         """
+        if self.batched or self.is_async:
+            return (output for _, output in self.ie_function_batch([args]))
         output = self.ie_function_def(*args)
         return output
 
+    def ie_function_batch(self, inputs: Sequence[tuple] # the input tuples of the function
+                          ) -> Iterator[Tuple[int, Any]]: # pairs of an index into `inputs` and an output computed for that input
+        """
+        Runs the information extraction function on a batch of inputs.
+
+        a batched function is called once with the list of input tuples, and must return (or yield) pairs of
+        (input index, output), where each output has the same format as an output of `ie_function`.
+        a function that is not batched is called once per input, and its outputs are tagged with the index of that input.
+        """
+        if self.is_async:
+            yield from self.ie_function_batches(inputs)
+            return
+
+        if not self.batched:
+            for index, ie_input in enumerate(inputs):
+                for output in self.ie_function(*ie_input):
+                    yield index, output
+            return
+
+        inputs = list(inputs)
+        for index, output in self.ie_function_def(inputs):
+            if not 0 <= index < len(inputs):
+                raise IndexError(f"batched ie function returned an output for input {index}, "
+                                 f"but the batch has {len(inputs)} inputs")
+            yield index, output
+
+    def ie_function_batches(self, inputs: Sequence[tuple] # the input tuples of the function
+                            ) -> Iterator[Tuple[int, Any]]: # pairs of an index into `inputs` and an output computed for that input
+        """
+        Runs the information extraction function on any number of inputs, by splitting them into batches of up to
+        `batch_size` inputs (see `ie_function_batch`).
+        a parallel executor runs up to `workers` batches concurrently; the outputs are still yielded in the order of the inputs.
+
+        an async function (an `async def` function or an async generator) is called on every input (or batch) separately,
+        and up to `concurrency` calls are awaited concurrently on an event loop. the outputs are yielded once all calls are done.
+        """
+        if self.is_async:
+            call_size = self.batch_size if self.batched else 1
+            call_starts = range(0, len(inputs), call_size)
+            calls = [inputs[start:start + call_size] for start in call_starts]
+            for start, outputs in zip(call_starts, _run_coroutine(self._await_async_calls(calls))):
+                for index, output in outputs:
+                    yield start + index, output
+            return
+
+        # smaller batches let all of the workers get some of the inputs
+        batch_size = min(self.batch_size, max(1, -(-len(inputs) // self.workers)))
+        batch_starts = range(0, len(inputs), batch_size)
+        if self.workers == 1 or len(batch_starts) <= 1:
+            for start in batch_starts:
+                for index, output in self.ie_function_batch(inputs[start:start + batch_size]):
+                    yield start + index, output
+            return
+
+        if self._pool is None:
+            pool_type = ThreadPoolExecutor if self.executor == IEFunction.EXECUTOR_THREAD else ProcessPoolExecutor
+            self._pool = pool_type(max_workers=self.workers)
+
+        batches = [inputs[start:start + batch_size] for start in batch_starts]
+        # `map` returns the results in the order of the batches, no matter which batch finished first
+        for start, outputs in zip(batch_starts, self._pool.map(_run_ie_function_batch, repeat(self), batches)):
+            for index, output in outputs:
+                yield start + index, output
+
+    async def _await_async_calls(self, calls: List[Sequence[tuple]]) -> List[List[Tuple[int, Any]]]:
+        # the semaphore bounds the number of calls in flight, the rest wait for their turn
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def await_call(inputs: Sequence[tuple]) -> List[Tuple[int, Any]]:
+            async with semaphore:
+                return await asyncio.wait_for(self._await_async_call(inputs), self.timeout)
+
+        return await asyncio.gather(*(await_call(inputs) for inputs in calls))
+
+    async def _await_async_call(self, inputs: Sequence[tuple]) -> List[Tuple[int, Any]]:
+        result = self.ie_function_def(list(inputs)) if self.batched else self.ie_function_def(*inputs[0])
+        if inspect.isasyncgen(result):
+            outputs = [output async for output in result]
+        else:
+            outputs = list(await result)
+
+        if not self.batched:
+            return [(0, output) for output in outputs]
+        for index, _ in outputs:
+            if not 0 <= index < len(inputs):
+                raise IndexError(f"batched ie function returned an output for input {index}, "
+                                 f"but the batch has {len(inputs)} inputs")
+        return outputs
+
+    def shutdown(self) -> None:
+        """
+        Stops the threads/processes of a parallel executor. they are started again if the function is used afterwards.
+        """
+        pool = getattr(self, '_pool', None)
+        if pool is not None:
+            self._pool = None
+            pool.shutdown(wait=False)
+
+    def get_fingerprint(self) -> Optional[str]:
+        """
+        @return: a hash that identifies the function's implementation, used as a part of the keys of `IECache`, or None
+        if the function has no stable fingerprint, in which case its outputs are not memoized.
+        it is computed from the function's name and source code (or bytecode, including the names it uses and its
+        nested functions, if the source is not available) and from the values the function closes over, so editing a
+        function changes its fingerprint. functions that are closed over are fingerprinted the same way, and other
+        values by their pickle, so a function that closes over a value that can't be pickled has no fingerprint.
+        the code that the function calls (e.g. its helpers, globals and libraries) is not a part of the fingerprint,
+        so when it changes, the function's `version` should be changed as well.
+        """
+        if not self._is_fingerprinted:
+            implementation = IEFunction._get_implementation(self.ie_function_def, set())
+            if implementation is not None:
+                fingerprint_source = "\n".join([str(self.batched), implementation])
+                self._fingerprint = hashlib.sha256(fingerprint_source.encode()).hexdigest()
+            self._is_fingerprinted = True
+        return self._fingerprint
+
+    @staticmethod
+    def _get_implementation(func: Callable, seen_functions: Set[int]) -> Optional[str]:
+        # a description of `func` that changes when it is edited, or None if it can't be described deterministically
+        name = f"{getattr(func, '__module__', '')}.{getattr(func, '__qualname__', type(func).__qualname__)}"
+        if id(func) in seen_functions:
+            # a recursive function that closes over itself
+            return name
+        seen_functions.add(id(func))
+
+        code = getattr(func, '__code__', None)
+        try:
+            implementation = inspect.getsource(func)
+        except (OSError, TypeError):
+            # e.g. a function that was created by `exec`, or a callable object
+            implementation = IEFunction._get_value_fingerprint(func) if code is None \
+                else IEFunction._get_code_fingerprint(code)
+            if implementation is None:
+                return None
+
+        closure = []
+        for cell in getattr(func, '__closure__', None) or []:
+            value = cell.cell_contents
+            value_fingerprint = IEFunction._get_implementation(value, seen_functions) if inspect.isfunction(value) \
+                else IEFunction._get_value_fingerprint(value)
+            if value_fingerprint is None:
+                return None
+            closure.append(value_fingerprint)
+        return "\n".join([name, implementation, *closure])
+
+    @staticmethod
+    def _get_code_fingerprint(code: CodeType) -> str:
+        # the names that the code uses (e.g. the functions it calls) are not a part of its bytecode
+        nested_code = [IEFunction._get_code_fingerprint(const) for const in code.co_consts if inspect.iscode(const)]
+        constants = [const for const in code.co_consts if not inspect.iscode(const)]
+        return repr((code.co_code, constants, code.co_names, code.co_varnames, code.co_freevars, nested_code))
+
+    @staticmethod
+    def _get_value_fingerprint(value: Any) -> Optional[str]:
+        # unlike reprs, pickles are not truncated and don't contain memory addresses, so they're the same across sessions
+        try:
+            return hashlib.sha256(pickle.dumps(value)).hexdigest()
+        except Exception:
+            return None
+
     def get_input_types(self) -> Sequence[DataTypes]:
         """
         @return: an iterable of the input types to the function.
@@ -65,4 +300,200 @@ class IEFunction:
         @return: metadata about the ie function.
         """
         metadata = f"""Input types: {self.in_types}.\nOutput types: {self.out_types}"""
+        if self.batched:
+            metadata += f"""\nBatched: up to {self.batch_size} inputs per call"""
+        if self.executor != IEFunction.EXECUTOR_SERIAL:
+            metadata += f"""\nExecutor: {self.executor} pool with {self.workers} workers"""
+        if self.is_async:
+            metadata += f"""\nAsync: up to {self.concurrency} concurrent calls"""
         return metadata
+
+def _is_async_callable(func: Callable) -> bool:
+    # callable objects are async if their __call__ method is
+    call = func if inspect.isfunction(func) or inspect.ismethod(func) else getattr(func, '__call__', func)
+    return inspect.iscoroutinefunction(call) or inspect.isasyncgenfunction(call)
+
+def _run_coroutine(coroutine: Any) -> Any:
+    # `asyncio.run` can't be called from a thread that already runs an event loop (e.g. inside jupyter),
+    # so in that case the coroutine runs on a new event loop in another thread
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coroutine).result()
+
+def _run_ie_function_batch(ie_func: IEFunction, inputs: Sequence[tuple]) -> List[Tuple[int, Any]]:
+    # runs inside the workers of a pool, so the outputs must be collected before they are sent back
+    return list(ie_func.ie_function_batch(inputs))
+
+# %% ../nbs/03b_ie_function.ipynb 23
+class IECache:
+    """
+    A memoization cache for the outputs of information extraction functions.
+
+    the outputs of each (ie function, input) pair are kept in a bounded in-memory LRU and, if a path is given,
+    also in an sqlite file, so they can be reused by later sessions.
+    an entry is keyed by the fingerprint and the version of the ie function (see `IEFunction.get_fingerprint`) and a
+    hash of the input, so a function that is edited or registered again is not served stale outputs. the fingerprint
+    doesn't cover the code that the function calls, so a function whose helpers change should get a new version.
+    functions that were created with `cacheable=False`, or that have no fingerprint, are never memoized.
+    the cache can be used by several threads, e.g. when rule relations are computed concurrently.
+    """
+
+    def __init__(self,
+                 max_size: int = DEFAULT_IE_CACHE_SIZE, # the maximal number of entries that are kept in memory
+                 path: Optional[Union[str, Path]] = None # an sqlite file in which all of the entries are persisted
+                 ):
+        if max_size < 0:
+            raise ValueError(f"cache size can't be negative, got {max_size}")
+        self.max_size = max_size
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, List] = OrderedDict()
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite.Connection] = None
+        if path is not None:
+            self._connection = sqlite.connect(str(path), check_same_thread=False)
+            self._connection.execute("CREATE TABLE IF NOT EXISTS ie_outputs (key TEXT PRIMARY KEY, outputs BLOB)")
+            self._connection.commit()
+
+    def __del__(self) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def is_enabled(self) -> bool:
+        """
+        @return: whether the cache stores anything.
+        """
+        return self.max_size > 0 or self._connection is not None
+
+    @staticmethod
+    def get_function_key(ie_func: IEFunction # an ie function
+                         ) -> str: # the prefix of the keys of the outputs of `ie_func`
+        return hashlib.sha256(repr((ie_func.get_fingerprint(), ie_func.version)).encode()).hexdigest()
+
+    @staticmethod
+    def get_key(ie_func: IEFunction, # an ie function
+                ie_input: Sequence # an input of the ie function
+                ) -> str: # the key of the outputs of `ie_func` on `ie_input`
+        return IECache._get_input_key(IECache.get_function_key(ie_func), ie_input)
+
+    @staticmethod
+    def _get_input_key(function_key: str, ie_input: Sequence) -> str:
+        # the repr of strings, integers and spans is deterministic, unlike their pickle
+        return f"{function_key}:{hashlib.sha256(repr(tuple(ie_input)).encode()).hexdigest()}"
+
+    def get(self, key: str # a key created by `get_key`
+            ) -> Optional[List]: # the memoized outputs, or None if the key is not in the cache
+        """
+        Looks a key up in memory and then on disk, moving it to the front of the LRU.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+            if self._connection is not None:
+                row = self._connection.execute("SELECT outputs FROM ie_outputs WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    outputs = pickle.loads(row[0])
+                    self._put_in_memory(key, outputs)
+                    self.hits += 1
+                    return outputs
+
+            self.misses += 1
+            return None
+
+    def put_many(self, entries: Dict[str, List] # maps keys created by `get_key` to the outputs of their inputs
+                 ) -> None:
+        """
+        Adds entries to the cache, evicting the least recently used entries from memory (but not from disk).
+        """
+        with self._lock:
+            for key, outputs in entries.items():
+                self._put_in_memory(key, outputs)
+
+            if self._connection is not None and len(entries) != 0:
+                self._connection.executemany("INSERT OR REPLACE INTO ie_outputs VALUES (?, ?)",
+                                             [(key, pickle.dumps(outputs)) for key, outputs in entries.items()])
+                self._connection.commit()
+
+    def _put_in_memory(self, key: str, outputs: List) -> None:
+        if self.max_size == 0:
+            return
+        self._entries[key] = outputs
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def run(self, ie_func: IEFunction, # the ie function to run
+            inputs: Sequence[tuple] # the input tuples of the function
+            ) -> Iterator[Tuple[int, Any]]: # pairs of an index into `inputs` and an output computed for that input
+        """
+        Same as `IEFunction.ie_function_batches`, but only runs the function on inputs whose outputs are not memoized.
+        """
+        if not ie_func.cacheable or not self.is_enabled() or ie_func.get_fingerprint() is None:
+            yield from ie_func.ie_function_batches(inputs)
+            return
+
+        function_key = IECache.get_function_key(ie_func)
+        keys = [IECache._get_input_key(function_key, ie_input) for ie_input in inputs]
+        missing_indexes = []
+        for index, key in enumerate(keys):
+            outputs = self.get(key)
+            if outputs is None:
+                missing_indexes.append(index)
+            else:
+                for output in outputs:
+                    yield index, output
+
+        if len(missing_indexes) == 0:
+            return
+
+        # the outputs of an input are memoized only once all of them were computed
+        computed_outputs: Dict[int, List] = {index: [] for index in missing_indexes}
+        missing_inputs = [inputs[index] for index in missing_indexes]
+        for missing_index, output in ie_func.ie_function_batches(missing_inputs):
+            computed_outputs[missing_indexes[missing_index]].append(output)
+
+        self.put_many({keys[index]: outputs for index, outputs in computed_outputs.items()})
+        for index, outputs in computed_outputs.items():
+            for output in outputs:
+                yield index, output
+
+    def remove_function(self, ie_func: IEFunction # an ie function
+                        ) -> int: # the number of removed entries
+        """
+        Removes the outputs of an ie function from memory, e.g. when another function is registered with its name.
+        the entries on disk are kept.
+        """
+        function_key_prefix = f"{IECache.get_function_key(ie_func)}:"
+        with self._lock:
+            function_keys = [key for key in self._entries if key.startswith(function_key_prefix)]
+            for key in function_keys:
+                del self._entries[key]
+        return len(function_keys)
+
+    def clear(self) -> None:
+        """
+        Removes all of the entries, both from memory and from disk.
+        """
+        with self._lock:
+            self._entries.clear()
+            if self._connection is not None:
+                self._connection.execute("DELETE FROM ie_outputs")
+                self._connection.commit()
+
+    def close(self) -> None:
+        """
+        Closes the connection to the sqlite file, if there is one.
+        """
+        connection = getattr(self, '_connection', None)
+        if connection is not None:
+            connection.close()
+            self._connection = None
@@ -14,13 +14,14 @@ from lark import Transformer, Token
 from lark import Tree as LarkNode
 from lark.visitors import Interpreter, Visitor_Recursive, Visitor
 from pathlib import Path
-from typing import no_type_check, Set, Sequence, Any
+from typing import no_type_check, Set, Sequence, Any, Optional
 
 from .ast_node_types import (Assignment, ReadAssignment, AddFact, RemoveFact, Query, Rule, IERelation, RelationDeclaration, Relation)
 from .primitive_types import Span, DataTypes, DataTypeMapping
 from .engine import RESERVED_RELATION_PREFIX
 from .graphs import NetxStateGraph
 from .symbol_table import SymbolTableBase
+from .document_store import DocumentStore
 from .general_utils import (get_free_var_names, get_output_free_var_names, get_input_free_var_names, fixed_point, check_properly_typed_relation, type_check_rule_free_vars)
 from .passes_utils import assert_expected_node_structure, unravel_lark_node, ParseNodeType
 
@@ -907,11 +908,14 @@ class ExecuteAssignments(InterpreterPass):
     executes assignments by saving variables' values and types in the symbol table <br>
     should be used only after variable references are resolved, meaning the assigned values and read() arguments
     are guaranteed to be literals.
+    files that are read with a document store are memory-mapped by it, and the variable is assigned a `Document` that
+    refers to the file, so its text is only decoded when it is used.
     """
 
-    def __init__(self, symbol_table: SymbolTableBase, **kw: Any) -> None:
+    def __init__(self, symbol_table: SymbolTableBase, document_store: Optional[DocumentStore] = None, **kw: Any) -> None:
         super().__init__()
         self.symbol_table = symbol_table
+        self.document_store = document_store
 
     @unravel_lark_node
     def assignment(self, assignment: Assignment) -> None:
@@ -922,7 +926,10 @@ class ExecuteAssignments(InterpreterPass):
     def read_assignment(self, assignment: ReadAssignment) -> None:
         # try to read the file and get its content as a single string. this string is the assigned value.
         try:
-            assigned_value = Path(assignment.read_arg).read_text()
+            if self.document_store is None:
+                assigned_value = Path(assignment.read_arg).read_text()
+            else:
+                assigned_value = self.document_store.read_file(assignment.read_arg)
         except Exception:
             raise Exception(f'could not open file "{assignment.read_arg}"')
 
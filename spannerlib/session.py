@@ -10,7 +10,8 @@ import logging
 import os
 import re
 from pathlib import Path
-from typing import Tuple, List, Union, Optional, Callable, Type, Iterable, no_type_check, Sequence
+from itertools import chain
+from typing import Tuple, List, Union, Optional, Callable, Type, Iterable, Iterator, no_type_check, Sequence
 
 # %% ../nbs/04a_session.ipynb 5
 from lark.lark import Lark
@@ -22,10 +23,10 @@ import os
 #| output: false
 from .utils import get_base_file_path
 from .primitive_types import Span
-from .engine import SqliteEngine
+from .engine import SqliteEngine, spannerlogEngineBase
 from .ast_node_types import AddFact, RelationDeclaration
 from .primitive_types import Span, DataTypes, DataTypeMapping
-from .engine import FALSE_VALUE, TRUE_VALUE
+from .engine import FALSE_VALUE, TRUE_VALUE, DEFAULT_QUERY_FETCH_SIZE, QueryCursor
 from .execution import (Query, FREE_VAR_PREFIX, naive_execution)
 from .adding_inference_rules_to_term_graph import AddRulesToTermGraph
 from .optimizations_passes import RemoveUselessRelationsFromRule
@@ -39,19 +40,22 @@ from .lark_passes import (RemoveTokens, FixStrings, CheckReservedRelationNames,
                                               ExecuteAssignments, AddStatementsToNetxParseGraph, GenericPass)
 from .graphs import TermGraph, NetxStateGraph, GraphBase, TermGraphBase
 from .symbol_table import SymbolTable, SymbolTableBase
+from .ie_function import DEFAULT_IE_BATCH_SIZE, DEFAULT_IE_CONCURRENCY, IECache, IEFunction
 from .general_utils import rule_to_relation_name, string_to_span, SPAN_PATTERN, QUERY_RESULT_PREFIX
 from .passes_utils import LarkNode
 from .ie_func.json_path import JsonPath, JsonPathFull
 from .ie_func.nlp import (Tokenize, SSplit, POS, Lemma, NER, EntityMentions, CleanXML, Parse, DepParse, Coref, OpenIE, KBP, Quote, Sentiment, TrueCase)
 from .ie_func.python_regex import PYRGX, PYRGX_STRING
+from .ie_func.lexicon import LEXICON, LEXICON_IGNORE_CASE
 from .ie_func.rust_spanner_regex import RGX, RGX_STRING, RGX_FROM_FILE, RGX_STRING_FROM_FILE
 from .utils import patch_method, get_base_file_path, get_lib_name
 
 # %% ../nbs/04a_session.ipynb 7
 CSV_DELIMITER = ";"
 
-# ordered by rgx, json, nlp, etc.
+# ordered by rgx, lexicon, json, nlp, etc.
 PREDEFINED_IE_FUNCS = [PYRGX, PYRGX_STRING, RGX, RGX_STRING, RGX_FROM_FILE, RGX_STRING_FROM_FILE,
+                       LEXICON, LEXICON_IGNORE_CASE,
                        JsonPath, JsonPathFull,
                        Tokenize, SSplit, POS, Lemma, NER, EntityMentions, CleanXML, Parse, DepParse, Coref, OpenIE, KBP, Quote, Sentiment,
                        TrueCase]
@@ -219,7 +223,11 @@ class Session:
     def __init__(self, 
                  symbol_table: Optional[SymbolTableBase] = None, # symbol table to help with all semantic checks
                  parse_graph: Optional[GraphBase] = None, # an AST that contains nodes which represent commands
-                 term_graph: Optional[TermGraphBase] = None): # a graph that holds all the connection between the relations
+                 term_graph: Optional[TermGraphBase] = None, # a graph that holds all the connection between the relations
+                 execution: Optional[Callable] = None, # the function that executes the parse graph (e.g. `semi_naive_execution`), defaults to `naive_execution`
+                 engine: Optional[spannerlogEngineBase] = None, # the engine that stores the relations (e.g. `ColumnarEngine`), defaults to `SqliteEngine`
+                 ie_cache: Optional[IECache] = None, # memoizes the outputs of ie functions, defaults to an in-memory `IECache` (use `IECache(max_size=0)` to disable it)
+                 workers: int = 1): # the number of threads that compute independent rule relations concurrently (see `naive_execution`)
         """
         A class that serves as the central connection point between various modules in the system.
 
@@ -237,8 +245,10 @@ class Session:
 
         self._parse_graph = NetxStateGraph() if parse_graph is None else parse_graph
         self._term_graph: TermGraphBase = TermGraph() if term_graph is None else term_graph
-        self._engine = SqliteEngine()
-        self._execution = naive_execution
+        self._engine: spannerlogEngineBase = SqliteEngine() if engine is None else engine
+        self._engine.ie_cache = IECache() if ie_cache is None else ie_cache
+        self._execution = naive_execution if execution is None else execution
+        self._workers = workers
 
         self._pass_stack: List[Type[GenericPass]] = [
             RemoveTokens,
@@ -289,7 +299,8 @@ def _run_passes(self: Session, lark_tree: LarkNode, pass_list: list) -> None:
     for curr_pass in pass_list:
         curr_pass_object = curr_pass(parse_graph=self._parse_graph,
                                         symbol_table=self._symbol_table,
-                                        term_graph=self._term_graph)
+                                        term_graph=self._term_graph,
+                                        document_store=self._engine.document_store)
         new_tree = curr_pass_object.run_pass(tree=lark_tree)
         if new_tree is not None:
             lark_tree = new_tree
@@ -341,28 +352,38 @@ def _remove_rule_relation_from_symbols_and_engine(self: Session, relation_name:
     """
     self._symbol_table.remove_rule_relation(relation_name)
     self._engine.remove_table(relation_name)
+    self._engine.collect_documents()
 
 # %% ../nbs/04a_session.ipynb 23
 @patch_method
 def _add_imported_relation_to_engine(self: Session, relation_table: Iterable, relation_name: str, relation_types: Sequence[DataTypes]) -> None:
     symbol_table = self._symbol_table
     engine = self._engine
-    # first make sure the types are legal, then we add them to the engine (to make sure
-    #  we don't add them in case of an error)
-    facts = []
+    engine.assert_no_open_cursor()
 
-    for row in relation_table:
-        _verify_relation_types(row, relation_types)
-        typed_line = _text_to_typed_data(row, relation_types)
-        facts.append(AddFact(relation_name, typed_line, relation_types))
+    def _get_typed_rows() -> Iterator[List[DataTypeMapping.term]]:
+        # the rows are verified while the engine reads them, so `relation_table` is read only once
+        for row in relation_table:
+            _verify_relation_types(row, relation_types)
+            yield _text_to_typed_data(row, relation_types)
 
     # declare relation if it does not exist
-    if not symbol_table.contains_relation(relation_name):
+    is_new_relation = not symbol_table.contains_relation(relation_name)
+    if is_new_relation:
         engine.declare_relation_table(RelationDeclaration(relation_name, relation_types))
+
+    # the engine adds all the rows or none of them, so in case of an error we only need to remove a new relation
+    try:
+        engine.add_facts(relation_name, _get_typed_rows(), relation_types)
+    except Exception:
+        if is_new_relation:
+            engine.remove_table(relation_name)
+        raise
+
+    if is_new_relation:
         symbol_table.add_relation_schema(relation_name, relation_types, False)
 
-    for fact in facts:
-        engine.add_fact(fact)
+    self._term_graph.invalidate_relation(relation_name)
 
 # %% ../nbs/04a_session.ipynb 24
 @patch_method
@@ -417,6 +438,8 @@ def run_commands(self: Session, query: str, # The user's input
     """
     Generates an AST and passes it through the pass stack.
     """
+    # checked before the passes run, so a failure doesn't leave the session half-updated
+    self._engine.assert_no_open_cursor()
     query_results = []
     parse_tree = self._parser.parse(query)
     for statement in parse_tree.children:
@@ -424,11 +447,14 @@ def run_commands(self: Session, query: str, # The user's input
         query_result = self._execution(parse_graph=self._parse_graph,
                                         symbol_table=self._symbol_table,
                                         spannerlog_engine=self._engine,
-                                        term_graph=self._term_graph)
+                                        term_graph=self._term_graph,
+                                        workers=self._workers)
         if query_result is not None:
             query_results.append(query_result)
             if print_results:
                 print(queries_to_string([query_result]))
+    # free the documents of removed facts and of reassigned variables
+    self._engine.collect_documents()
 
     if format_results:
         return [format_query_results(*query_result) for query_result in query_results]
@@ -438,53 +464,70 @@ def run_commands(self: Session, query: str, # The user's input
 # %% ../nbs/04a_session.ipynb 35
 @patch_method
 def register(self: Session, ie_function: Callable, ie_function_name: str, in_rel: List[DataTypes],
-            out_rel: Union[List[DataTypes], Callable[[int], Sequence[DataTypes]]]) -> None:
+            out_rel: Union[List[DataTypes], Callable[[int], Sequence[DataTypes]]],
+            batched: bool = False, batch_size: int = DEFAULT_IE_BATCH_SIZE, cacheable: bool = True,
+            executor: str = IEFunction.EXECUTOR_SERIAL, workers: Optional[int] = None,
+            concurrency: int = DEFAULT_IE_CONCURRENCY, timeout: Optional[float] = None,
+            version: Optional[Union[str, int]] = None) -> None:
     """
-    Registers an ie function.
+    Registers an ie function. the function can also be an `async def` function or an async generator.
 
     @see params in `IEFunction`'s __init__.
     """
-    self._symbol_table.register_ie_function(ie_function, ie_function_name, in_rel, out_rel)
+    # the memoized outputs of a replaced function are dropped, even if its fingerprint and version are the same
+    if self._symbol_table.contains_ie_function(ie_function_name) and self._engine.ie_cache is not None:
+        self._engine.ie_cache.remove_function(self._symbol_table.get_ie_func_data(ie_function_name))
+    self._symbol_table.register_ie_function(ie_function, ie_function_name, in_rel, out_rel, batched, batch_size, cacheable,
+                                            executor, workers, concurrency, timeout, version)
+    # the function might replace a function with the same name, so the rules that use it must be recomputed
+    self._term_graph.invalidate_relation(ie_function_name)
 
-# %% ../nbs/04a_session.ipynb 40
+# %% ../nbs/04a_session.ipynb 49
 @patch_method
 def remove_rule(self: Session, rule: str # The rule to be removed
                 ) -> None:
     """
     Remove a rule from the spannerlog's engine.
     """
+    self._engine.assert_no_open_cursor()
     is_last = self._term_graph.remove_rule(rule)
     if is_last:
         relation_name = rule_to_relation_name(rule)
         self._remove_rule_relation_from_symbols_and_engine(relation_name)
 
-# %% ../nbs/04a_session.ipynb 47
+# %% ../nbs/04a_session.ipynb 56
 @patch_method
 def remove_all_rules(self: Session, rule_head: Optional[str] = None # if rule head is not none we remove all rules with rule_head
                         ) -> None:
     """
     Removes all rules from the engine.
     """
+    self._engine.assert_no_open_cursor()
 
     if rule_head is None:
         self._term_graph = TermGraph()
         relations_names = self._symbol_table.remove_all_rule_relations()
         self._engine.remove_tables(relations_names)
+        self._engine.collect_documents()
     else:
         self._term_graph.remove_rules_with_head(rule_head)
         self._remove_rule_relation_from_symbols_and_engine(rule_head)
 
-# %% ../nbs/04a_session.ipynb 54
+# %% ../nbs/04a_session.ipynb 63
 @patch_method
 def clear_relation(self: Session, relation_name: str # The name of the relation to clear
                     ) -> None:
     # @raises: Exception if relation does not exist
+    self._engine.assert_no_open_cursor()
     if not self._engine.is_table_exists(relation_name):
         raise Exception(f"Relation {relation_name} does not exist")
 
     self._engine.clear_relation(relation_name)
+    self._term_graph.invalidate_relation(relation_name)
+    # the documents of the relation are freed unless they are referenced elsewhere
+    self._engine.collect_documents(force=True)
 
-# %% ../nbs/04a_session.ipynb 61
+# %% ../nbs/04a_session.ipynb 70
 @patch_method
 def send_commands_result_into_csv(self: Session, commands: str, # the commands to run
                                     csv_file_name: Path, # the file into which the output will be written
@@ -493,21 +536,31 @@ def send_commands_result_into_csv(self: Session, commands: str, # the commands t
     """
     run commands as usual and output their formatted results into a csv file (the commands should contain a query)
     """
-    commands_results = self.run_commands(commands, print_results=False)
-    if len(commands_results) != 1:
-        raise Exception("the commands must have exactly one output")
-
-    formatted_result = format_query_results(*commands_results[0])
-
-    if isinstance(formatted_result, DataFrame):
-        formatted_result.to_csv(csv_file_name, index=False, sep=delimiter)
+    statement_types = [statement.data for statement in self._parser.parse(commands).children]
+    if statement_types.count("query") == 1 and statement_types[-1] != "query":
+        # the statements after the query can't run while its result is streamed, so the result is computed as a whole
+        [(query, query_results)] = self.run_commands(commands, print_results=False)
+        query_cursor = QueryCursor(iter([query_results]))
     else:
-        # true or false
-        with open(csv_file_name, "w", newline="") as f:
+        query, query_cursor = self._stream_commands(commands)
+    query_free_vars = [term for term, term_type in zip(query.term_list, query.type_list)
+                       if term_type is DataTypes.free_var_name]
+
+    # the result is streamed into the file, so it is never held in memory as a whole
+    with query_cursor, open(csv_file_name, "w", newline="") as f:
+        if query_free_vars:
+            # written like `DataFrame.to_csv`, the free variables are the header (unless the result is false)
+            writer = csv.writer(f, delimiter=delimiter, lineterminator=os.linesep)
+            for batch_index, batch in enumerate(query_cursor.batches(DEFAULT_QUERY_FETCH_SIZE)):
+                if batch_index == 0:
+                    writer.writerow(query_free_vars)
+                writer.writerows(batch)
+        else:
+            # true or false
             writer = csv.writer(f, delimiter=delimiter)
-            writer.writerows(formatted_result)
+            writer.writerows(query_cursor)
 
-# %% ../nbs/04a_session.ipynb 63
+# %% ../nbs/04a_session.ipynb 72
 @patch_method
 def print_registered_ie_functions(self: Session) -> None:
     """
@@ -515,7 +568,7 @@ def print_registered_ie_functions(self: Session) -> None:
     """
     self._symbol_table.print_registered_ie_functions()
 
-# %% ../nbs/04a_session.ipynb 65
+# %% ../nbs/04a_session.ipynb 74
 @patch_method
 def remove_ie_function(self: Session, name: str # the name of the ie function to remove
                         ) -> None:
@@ -523,16 +576,20 @@ def remove_ie_function(self: Session, name: str # the name of the ie function to
     Removes a function from the symbol table.
     """
     self._symbol_table.remove_ie_function(name)
+    self._term_graph.invalidate_relation(name)
 
-# %% ../nbs/04a_session.ipynb 67
+# %% ../nbs/04a_session.ipynb 76
 @patch_method
 def remove_all_ie_functions(self: Session) -> None:
     """
     Removes all the ie functions from the symbol table.
     """
+    ie_function_names = list(self._symbol_table.get_all_registered_ie_funcs())
     self._symbol_table.remove_all_ie_functions()
+    for name in ie_function_names:
+        self._term_graph.invalidate_relation(name)
 
-# %% ../nbs/04a_session.ipynb 69
+# %% ../nbs/04a_session.ipynb 78
 @patch_method
 def print_all_rules(self: Session, head: Optional[str] = None # if specified it will print only rules with the given head relation name
                     ) -> None:
@@ -542,7 +599,7 @@ def print_all_rules(self: Session, head: Optional[str] = None # if specified it
 
     self._term_graph.print_all_rules(head)
 
-# %% ../nbs/04a_session.ipynb 74
+# %% ../nbs/04a_session.ipynb 83
 @patch_method
 def import_rel(self: Session, data: Union[DataFrame,Path], #Either a dataframe or a path to a csv file to import.
                              relation_name: str = None, #The name of the relation. If not provided when importing a csv, it will be derived from the file name.
@@ -589,3 +646,65 @@ def import_rel(self: Session, data: Union[DataFrame,Path], #Either a dataframe o
     return
 
 
+
+# %% ../nbs/04a_session.ipynb 88
+@patch_method
+def add_facts(self: Session, relation_name: str, # the name of the relation. it is declared if it doesn't exist
+              rows: Iterable[Sequence], # the facts' terms. can be any iterable, e.g. a generator
+              relation_types: Optional[Sequence[DataTypes]] = None # the relation's types. defaults to the declared types, or to the types of the first row
+              ) -> None:
+    """Adds many facts to a relation at once, using the engine's bulk insertion.
+    if one of the rows doesn't match the relation's types, none of the facts are added.
+    """
+    rows = iter(rows)
+    if relation_types is None:
+        if self._symbol_table.contains_relation(relation_name):
+            relation_types = self._symbol_table.get_relation_schema(relation_name)
+        else:
+            first_row = next(rows, None)
+            if first_row is None:
+                return
+            relation_types = _infer_relation_type(first_row)
+            rows = chain([first_row], rows)
+
+    self._add_imported_relation_to_engine(rows, relation_name, relation_types)
+
+# %% ../nbs/04a_session.ipynb 93
+@patch_method
+def _stream_commands(self: Session, commands: str # the commands to run
+                     ) -> Tuple[Query, QueryCursor]: # the query of the commands, and a cursor that streams its result
+    self._engine.assert_no_open_cursor()
+    parse_tree = self._parser.parse(commands)
+    # the statements are checked before they run, so the session isn't modified if they can't be streamed
+    statement_types = [statement.data for statement in parse_tree.children]
+    if statement_types.count("query") != 1:
+        raise Exception("the commands must have exactly one output")
+    if statement_types[-1] != "query":
+        # the engine can't be modified while the query's result is streamed
+        raise Exception("the query must be the last of the commands")
+
+    for statement in parse_tree.children:
+        self._run_passes(statement, self._pass_stack)
+        query_result = self._execution(parse_graph=self._parse_graph,
+                                        symbol_table=self._symbol_table,
+                                        spannerlog_engine=self._engine,
+                                        term_graph=self._term_graph,
+                                        stream_query=True,
+                                        workers=self._workers)
+    self._engine.collect_documents()
+
+    return query_result
+
+# %% ../nbs/04a_session.ipynb 94
+@patch_method
+def iter_query(self: Session, query: str # the commands to run (they should contain exactly one query)
+               ) -> QueryCursor: # a cursor that streams the result of the query
+    """
+    Runs commands like `run_commands`, but streams the result of their query instead of returning it as a list. <br>
+    iterating over the cursor yields the result's tuples, and `QueryCursor.batches` yields lists of a fixed size.
+    the tuples are read from the engine lazily, so the result is never held in memory as a whole.
+    the cursor must be exhausted or closed (it is also a context manager) before other commands are run, until then
+    they raise an exception.
+    """
+    _, query_cursor = self._stream_commands(query)
+    return query_cursor
@@ -6,9 +6,9 @@ __all__ = ['SymbolTableBase', 'SymbolTable']
 # %% ../nbs/01b_symbol_table.ipynb 5
 #| output: false
 from abc import ABC, abstractmethod
-from typing import Iterable, Dict, Set, Callable, List, Union, Sequence, Tuple
+from typing import Iterable, Dict, Set, Callable, List, Union, Sequence, Tuple, Optional
 from .primitive_types import DataTypes, DataTypeMapping
-from .ie_function import IEFunction
+from .ie_function import IEFunction, DEFAULT_IE_BATCH_SIZE, DEFAULT_IE_CONCURRENCY
 
 # %% ../nbs/01b_symbol_table.ipynb 6
 class SymbolTableBase(ABC):
@@ -94,7 +94,15 @@ class SymbolTableBase(ABC):
                              ie_function: Callable, 
                              ie_function_name: str, 
                              in_rel: Sequence[DataTypes],
-                             out_rel: Union[List[DataTypes], Callable[[int], Sequence[DataTypes]]]
+                             out_rel: Union[List[DataTypes], Callable[[int], Sequence[DataTypes]]],
+                             batched: bool = False,
+                             batch_size: int = DEFAULT_IE_BATCH_SIZE,
+                             cacheable: bool = True,
+                             executor: str = IEFunction.EXECUTOR_SERIAL,
+                             workers: Optional[int] = None,
+                             concurrency: int = DEFAULT_IE_CONCURRENCY,
+                             timeout: Optional[float] = None,
+                             version: Optional[Union[str, int]] = None
                              ) -> None:
         """
         Adds a new ie function to the symbol table.
@@ -268,8 +276,13 @@ class SymbolTable(SymbolTableBase):
         return relation_name in self._relation_to_schema
 
     def register_ie_function(self, ie_function: Callable, ie_function_name: str, in_rel: Sequence[DataTypes],
-                             out_rel: Union[List[DataTypes], Callable[[int], Sequence[DataTypes]]]) -> None:
-        self._registered_ie_functions[ie_function_name] = IEFunction(ie_function, in_rel, out_rel)
+                             out_rel: Union[List[DataTypes], Callable[[int], Sequence[DataTypes]]],
+                             batched: bool = False, batch_size: int = DEFAULT_IE_BATCH_SIZE, cacheable: bool = True,
+                             executor: str = IEFunction.EXECUTOR_SERIAL, workers: Optional[int] = None,
+                             concurrency: int = DEFAULT_IE_CONCURRENCY, timeout: Optional[float] = None,
+                             version: Optional[Union[str, int]] = None) -> None:
+        self._registered_ie_functions[ie_function_name] = IEFunction(ie_function, in_rel, out_rel, batched, batch_size, cacheable,
+                                                                     executor, workers, concurrency, timeout, version)
 
     def register_ie_function_object(self, ie_function_object: IEFunction, ie_function_name: str) -> None:
         self._registered_ie_functions[ie_function_name] = ie_function_object